@@ -0,0 +1,73 @@
+"""
+Benchmark bytes on wire and CPU time per response for rendered HTML with
+each available compression encoding, with and without a cached response.
+
+Usage:
+    poetry run python benchmarks/bench_compression.py
+"""
+
+import asyncio
+import time
+
+from rapidhtml.compression import COMPRESSORS, CompressionPolicy
+from rapidhtml.responses import RapidHTMLResponse
+from rapidhtml.tags import Html, Body, Table, Tbody, Tr, Td
+
+ROWS = 20_000
+
+
+def build_page() -> Html:
+    return Html(
+        Body(
+            Table(
+                Tbody(
+                    *(
+                        Tr(Td(f"Person {i}"), Td(i % 90), Td("Toronto"), Td("Engineer"))
+                        for i in range(ROWS)
+                    )
+                ),
+                class_="styled-table",
+            )
+        )
+    )
+
+
+async def send_response(response: RapidHTMLResponse, encoding: str) -> int:
+    sent = 0
+
+    async def send(message):
+        nonlocal sent
+        sent += len(message.get("body", b""))
+
+    scope = {
+        "type": "http",
+        "headers": [(b"accept-encoding", encoding.encode())],
+    }
+    await response(scope, None, send)
+    return sent
+
+
+async def main():
+    page = build_page()
+    encodings = ["identity", *COMPRESSORS]
+
+    print(
+        f"{'encoding':<10}{'bytes on wire':>16}{'cold CPU ms':>14}{'cached CPU ms':>16}"
+    )
+    for encoding in encodings:
+        policy = CompressionPolicy(encodings=(encoding,), threadpool_size=1 << 62)
+
+        start = time.process_time()
+        response = RapidHTMLResponse(page, compression=policy)
+        sent = await send_response(response, encoding)
+        cold = time.process_time() - start
+
+        start = time.process_time()
+        await send_response(response, encoding)
+        cached = time.process_time() - start
+
+        print(f"{encoding:<10}{sent:>16,}{cold * 1000:>14.2f}{cached * 1000:>16.3f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,60 @@
+"""
+Benchmark parsing a realistic ~50KB stylesheet with StyleSheet.from_style.
+
+Usage:
+    poetry run python benchmarks/bench_css_parse.py
+"""
+
+import timeit
+
+from rapidhtml.style import StyleSheet
+from rapidhtml.style.parser import clear_cache
+
+RULE = """
+/* Component {i} */
+.component-{i} > .item:hover, .component-{i} a[href^="http://"] {{
+    background: url(https://cdn.example.com/img/{i}.png) no-repeat center / cover;
+    color: rgba({r}, {g}, {b}, 0.8);
+    font-family: "Helvetica Neue", Arial, sans-serif;
+    transition: opacity 0.2s ease-in-out;
+}}
+@media (max-width: {w}px) {{
+    .component-{i} {{ display: none; }}
+}}
+"""
+
+
+def build_stylesheet(target_size: int = 50_000) -> str:
+    css = []
+    size = 0
+    i = 0
+    while size < target_size:
+        rule = RULE.format(i=i, r=i % 255, g=(i * 3) % 255, b=(i * 7) % 255, w=400 + i)
+        css.append(rule)
+        size += len(rule)
+        i += 1
+    return "".join(css)
+
+
+def main():
+    css = build_stylesheet()
+    print(f"Stylesheet size: {len(css) / 1024:.1f} KB")
+
+    def cold():
+        clear_cache()
+        StyleSheet.from_style(css)
+
+    def warm():
+        StyleSheet.from_style(css)
+
+    runs = 50
+    cold_time = timeit.timeit(cold, number=runs) / runs
+    warm()
+    warm_time = timeit.timeit(warm, number=runs) / runs
+
+    print(f"Cold parse:   {cold_time * 1000:8.3f} ms")
+    print(f"Cached parse: {warm_time * 1000:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
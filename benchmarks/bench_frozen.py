@@ -0,0 +1,65 @@
+"""
+Benchmark building and rendering a table full of repeated leaf tags, with
+new tags per cell against shared frozen tags.
+
+Usage:
+    poetry run python benchmarks/bench_frozen.py
+"""
+
+import time
+import tracemalloc
+
+from rapidhtml.tags import Table, Tbody, Tr, Td, Span, Br
+
+ROWS = 20_000
+
+
+def build(frozen: bool) -> Table:
+    def leaf(cls, *tags, **attrs):
+        return cls.frozen(*tags, **attrs) if frozen else cls(*tags, **attrs)
+
+    return Table(
+        Tbody(
+            *(
+                Tr(
+                    Td(f"Row {i}"),
+                    Td(leaf(Span, class_="icon icon-check")),
+                    leaf(Td),
+                    Td(leaf(Br)),
+                )
+                for i in range(ROWS)
+            )
+        )
+    )
+
+
+def main() -> None:
+    expected = build(frozen=False).render()
+
+    print(f"{ROWS:,} rows")
+    for frozen in (False, True):
+        start = time.perf_counter()
+        table = build(frozen)
+        built = time.perf_counter()
+        output = table.render()
+        rendered = time.perf_counter()
+        assert output == expected
+        del table
+
+        # Measured separately, as tracing allocations slows everything down
+        tracemalloc.start()
+        table = build(frozen)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        del table
+
+        label = "frozen" if frozen else "new tags"
+        print(
+            f"{label:>9}: build {(built - start) * 1000:7.1f} ms, "
+            f"render {(rendered - built) * 1000:6.1f} ms, "
+            f"peak memory {peak / 1024 / 1024:6.1f} MiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark parsing a multi-megabyte document into tags with parse_html, as a
+whole and in chunks, against the bare stdlib HTMLParser it is built on.
+
+Usage:
+    poetry run python benchmarks/bench_parse.py
+"""
+
+import io
+import time
+
+from html.parser import HTMLParser
+
+from rapidhtml.tags import parse_html
+
+ROWS = 40_000
+
+ROW = (
+    "<tr class='row-{i}'><td><a href='/people/{i}?tab=info&amp;page=1'>Person {i}"
+    "</a></td><td>{age}</td><td><span class='badge'>active</span></td>"
+    "<td><input type='checkbox' checked name='select-{i}'></td></tr>\n"
+)
+
+
+def build_document() -> str:
+    rows = "".join(ROW.format(i=i, age=20 + i % 50) for i in range(ROWS))
+    return (
+        "<!DOCTYPE html><html><head><title>People</title>"
+        "<style>td > a { color: red; }</style></head>"
+        f"<body><table><tbody>\n{rows}</tbody></table></body></html>"
+    )
+
+
+def timed(func) -> float:
+    start = time.perf_counter()
+    func()
+    return (time.perf_counter() - start) * 1000
+
+
+def main() -> None:
+    document = build_document()
+    encoded = document.encode()
+    print(f"{len(encoded) / 1024 / 1024:.1f} MiB, {ROWS:,} rows")
+
+    def bare():
+        parser = HTMLParser()
+        parser.feed(document)
+        parser.close()
+
+    results = {
+        "HTMLParser (no tree)": timed(bare),
+        "parse_html(str)": timed(lambda: parse_html(document)),
+        "parse_html(file, 64 KiB)": timed(lambda: parse_html(io.BytesIO(encoded))),
+    }
+    for label, elapsed in results.items():
+        print(f"{label:>26}: {elapsed:7.1f} ms")
+
+    _, page = parse_html(document)
+    start = time.perf_counter()
+    rendered = page.render()
+    print(f"{'render parsed tree':>26}: {(time.perf_counter() - start) * 1000:7.1f} ms")
+    assert rendered.count("<tr") == ROWS
+
+
+if __name__ == "__main__":
+    main()
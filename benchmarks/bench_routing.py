@@ -0,0 +1,89 @@
+"""
+Benchmark finding the route for a request with Starlette's linear scan, as
+done by `RapidHTMLRouter`, against the index of `RapidHTMLCompiledRouter`,
+for growing numbers of routes. Most of the routes are tag callbacks, with
+a page route per ten callbacks and a parameterized route per hundred.
+
+Usage:
+    poetry run python benchmarks/bench_routing.py
+"""
+
+import time
+
+from starlette.routing import Match
+
+from rapidhtml.compiled_routing import RapidHTMLCompiledRouter
+from rapidhtml.routing import RapidHTMLRouter
+from rapidhtml.tags import Raw
+
+ROUTE_COUNTS = (10, 100, 1_000, 10_000)
+LOOKUPS = 2_000
+
+
+def endpoint():
+    return Raw("")
+
+
+def add_routes(router, count: int) -> list[str]:
+    paths = []
+    for i in range(count):
+        if i % 100 == 0:
+            path = f"/section-{i}/{{item:int}}"
+            paths.append(f"/section-{i}/42")
+        elif i % 10 == 0:
+            path = f"/page-{i}"
+            paths.append(path)
+        else:
+            path = f"/python-callbacks/{140_000_000 + i}"
+            paths.append(path)
+        router.add_route(path, endpoint, methods=["GET"])
+    return paths
+
+
+def linear_match(router, scope):
+    partial = None
+    for route in router.routes:
+        match, child_scope = route.matches(scope)
+        if match == Match.FULL:
+            return route
+        if match == Match.PARTIAL and partial is None:
+            partial = route
+    return partial
+
+
+def compiled_match(router, scope):
+    return router.match(scope)[0]
+
+
+def time_lookups(match, router, scopes) -> float:
+    start = time.perf_counter()
+    for scope in scopes:
+        assert match(router, scope) is not None
+    return (time.perf_counter() - start) / len(scopes)
+
+
+def main() -> None:
+    print(f"mean match time over {LOOKUPS:,} lookups of random routes")
+    print(f"{'routes':>8} {'linear':>12} {'compiled':>12} {'speedup':>8}")
+    for count in ROUTE_COUNTS:
+        linear = RapidHTMLRouter()
+        compiled = RapidHTMLCompiledRouter()
+        paths = add_routes(linear, count)
+        add_routes(compiled, count)
+
+        # Spread the lookups evenly over the table
+        scopes = [
+            {"type": "http", "method": "GET", "path": paths[i * 7919 % len(paths)]}
+            for i in range(LOOKUPS)
+        ]
+        compiled.index  # built once, on the first request
+        linear_time = time_lookups(linear_match, linear, scopes)
+        compiled_time = time_lookups(compiled_match, compiled, scopes)
+        print(
+            f"{count:>8,} {linear_time * 1e6:>9.1f} us {compiled_time * 1e6:>9.1f} us"
+            f" {linear_time / compiled_time:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark building and rendering a large table with a tag per cell, as in
+`examples/modern_table`, against `Table.from_columns()` and
+`Table.from_records()`.
+
+Usage:
+    poetry run python benchmarks/bench_table.py
+"""
+
+import time
+import array
+
+from rapidhtml.tags import Table, Thead, Tbody, Tr, Th, Td
+
+ROWS = 100_000
+LABELS = ("Name", "Age", "City", "Profession")
+
+
+def build_records() -> list[dict]:
+    return [
+        {
+            "Name": f"Person {i}",
+            "Age": i % 90,
+            "City": "Toronto & Ottawa",
+            "Profession": "Engineer",
+        }
+        for i in range(ROWS)
+    ]
+
+
+def per_cell_tags(records: list[dict]) -> str:
+    table = Table(
+        Thead(Tr(*(Th(label) for label in LABELS))),
+        Tbody(
+            *(
+                Tr(
+                    Td(record["Name"]),
+                    Td(record["Age"]),
+                    Td(record["City"]),
+                    Td(record["Profession"]),
+                )
+                for record in records
+            )
+        ),
+        class_="styled-table",
+    )
+    return table.render()
+
+
+def from_records(records: list[dict]) -> str:
+    return Table.from_records(records, class_="styled-table").render()
+
+
+def from_columns(records: list[dict]) -> str:
+    columns = {label: [record[label] for record in records] for label in LABELS}
+    columns["Age"] = array.array("i", columns["Age"])
+    return Table.from_columns(columns, class_="styled-table").render()
+
+
+def main() -> None:
+    records = build_records()
+    expected = per_cell_tags(records)
+
+    print(f"{ROWS:,} rows, build and render")
+    for func in (per_cell_tags, from_records, from_columns):
+        start = time.perf_counter()
+        output = func(records)
+        elapsed = time.perf_counter() - start
+        assert output == expected, func.__name__
+        print(f"{func.__name__:>15}: {elapsed * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
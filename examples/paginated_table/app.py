@@ -0,0 +1,48 @@
+import bisect
+
+from rapidhtml import RapidHTML
+from rapidhtml.components import PaginatedTable
+from rapidhtml.tags import Html, Head, Style, Body, H1
+
+app = RapidHTML(compression=True)
+
+# A million rows, ordered by id. The first page of the table is the same
+# size whatever the number of rows.
+PEOPLE = [
+    {"id": i, "name": f"Person {i}", "age": 20 + i % 60, "city": "Toronto"}
+    for i in range(1, 1_000_001)
+]
+IDS = [person["id"] for person in PEOPLE]
+
+
+def load_people(after, limit):
+    # Keyset pagination: find the first row after the cursor, like
+    # `WHERE id > :after ORDER BY id LIMIT :limit` would in a database
+    start = bisect.bisect_right(IDS, int(after or 0))
+    return PEOPLE[start : start + limit]
+
+
+people = PaginatedTable(
+    load_people,
+    {"id": "#", "name": "Name", "age": "Age", "city": "City"},
+    key="id",
+    page_size=100,
+    formatters={"id": "{:,}".format},
+)
+
+styles = """
+table { border-collapse: collapse; width: 100%; font-family: sans-serif; }
+th, td { padding: 8px 12px; border-bottom: 1px solid #ddd; text-align: left; }
+"""
+
+
+@app.route("/")
+async def homepage():
+    return Html(
+        Head(Style(styles)),
+        Body(H1("People"), people.table()),
+    )
+
+
+if __name__ == "__main__":
+    app.serve()
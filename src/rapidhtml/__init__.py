@@ -1,3 +1,4 @@
 from rapidhtml.app import RapidHTML
+from rapidhtml.components import component
 
-__all__ = ["RapidHTML"]
+__all__ = ["RapidHTML", "component"]
@@ -3,17 +3,34 @@ from __future__ import annotations
 import typing
 import inspect
 import warnings
+import functools
+import importlib.util
 
 from pathlib import Path
 
 import uvicorn
 
 from starlette.applications import Starlette
-from starlette.responses import Response
+from starlette.requests import Request
+from starlette.routing import Match
 
-from rapidhtml.tags import Script, Title
-from rapidhtml.utils import get_default_favicon
-from rapidhtml.routing import RapidHTMLRouter, RapidHTMLWSEndpoint
+from rapidhtml.tags import Link, Script, Title
+from rapidhtml.compression import CompressionPolicy
+from rapidhtml.batch import BATCH_PATH, BatchEndpoint
+from rapidhtml.compiled_routing import RapidHTMLCompiledRouter
+from rapidhtml.metrics import RenderMetrics
+from rapidhtml.utils import (
+    HTMX_VERSION,
+    get_batch_extension_path,
+    get_default_favicon_path,
+    get_htmx_path,
+    get_ws_extension_path,
+)
+from rapidhtml.routing import RapidHTMLRoute, RapidHTMLRouter, RapidHTMLWSEndpoint
+from rapidhtml.reload import JS_HOT_RELOAD_SCRIPT, HotReloader
+from rapidhtml.sse import RapidHTMLSSEEndpoint
+from rapidhtml.ws import WSCompression
+from rapidhtml.staticfiles import RapidHTMLStaticFiles, StaticAsset
 
 
 JS_RELOAD_SCRIPT = """
@@ -32,6 +49,17 @@ class _ReloadSocket(RapidHTMLWSEndpoint):
     async def on_connect(self, websocket):
         await websocket.accept()
 
+    async def on_receive(self, websocket, data):
+        # Pages report their path when hot reloading
+        reloader = getattr(websocket.app, "hot_reloader", None)
+        if reloader is not None:
+            reloader.connections[websocket] = data
+
+    async def on_disconnect(self, websocket, close_code):
+        reloader = getattr(websocket.app, "hot_reloader", None)
+        if reloader is not None:
+            reloader.connections.pop(websocket, None)
+
 
 class RapidHTML(Starlette):
     """
@@ -40,7 +68,7 @@ class RapidHTML(Starlette):
     tags to be included in the response along with default head content.
 
     Default head content includes:
-        - HTMX
+        - HTMX, served from the package itself rather than a CDN
     """
 
     def __init__(
@@ -48,8 +76,21 @@ class RapidHTML(Starlette):
         *args,
         html_head: typing.Iterable = None,
         reload: bool = False,
+        hot_reload: bool = False,
         title: str = "RapidHTML",
         favicon_path: str | Path = None,
+        compression: bool | CompressionPolicy = False,
+        etag: bool = False,
+        minify: bool = False,
+        batch_callbacks: bool = False,
+        ws_compression: bool | WSCompression = True,
+        ws_binary_fragments: bool = False,
+        static_directory: str | Path = None,
+        static_path: str = "/static",
+        warm_up: typing.Iterable[str] = (),
+        compiled_router: bool = False,
+        metrics: bool | RenderMetrics = False,
+        metrics_path: str | None = "/metrics",
         **kwargs,
     ) -> None:
         """
@@ -59,6 +100,10 @@ class RapidHTML(Starlette):
                 html_head (typing.Iterable, optional): Tags to inject into each
                     page's <head>. Defaults to None.
                 reload (bool, optional): Enables live-reloading. Defaults to False.
+                hot_reload (bool, optional): Enables live-reloading without
+                    restarting the server. Changed modules are re-imported and
+                    their routes swapped into the running app, and pages only
+                    re-fetch what changed. Defaults to False.
                 title (str, optional): Title of the application. Can be overridden
                     on a per-page basis by adding a Title() tag to the response.
                     Defaults to "RapidHTML".
@@ -66,36 +111,160 @@ class RapidHTML(Starlette):
                     favicon. If no path is provided the default RapidHTML favicon
                     will be used instead.
                     Defaults to None.
+                compression (bool | CompressionPolicy, optional): Compress
+                    rendered HTML responses. Pass a CompressionPolicy to tune
+                    the encodings, levels and minimum size. Individual routes
+                    can override this. Defaults to False.
+                etag (bool, optional): Send ETags with responses and answer
+                    conditional requests with 304 Not Modified. Individual
+                    routes can override this. Defaults to False.
+                minify (bool, optional): Render minified HTML. Individual
+                    routes can override this, and
+                    `app.router.minify_stats()` reports the bytes saved per
+                    route. Defaults to False.
+                batch_callbacks (bool, optional): Serve the batch endpoint and
+                    the HTMX extension sending the requests of callbacks
+                    created with `batch=True` together, in one request per
+                    trigger. Defaults to False.
+                ws_compression (bool | WSCompression, optional): Compress
+                    WebSocket messages with permessage-deflate when served
+                    with `app.serve()`. Pass a WSCompression to tune the
+                    compression level and window size. Defaults to True.
+                ws_binary_fragments (bool, optional): Add the HTMX extension
+                    decoding the binary fragments sent by WebSocket endpoints
+                    with `binary_fragments` enabled to each page.
+                    Defaults to False.
+                static_directory (str | Path, optional): A directory of static
+                    assets to serve. Defaults to None.
+                static_path (str, optional): The URL path the static directory
+                    is served from. Defaults to "/static".
+                warm_up (typing.Iterable[str], optional): Paths of cached
+                    routes to render when the app starts, see `warm_up()`.
+                    Defaults to ().
+                compiled_router (bool, optional): Find the route for each
+                    request through an index of the routes rather than by
+                    trying every route in turn, for apps with thousands of
+                    routes. See RapidHTMLCompiledRouter. Defaults to False.
+                metrics (bool | RenderMetrics, optional): Record the time
+                    spent in each phase of rendering responses, per route.
+                    Pass a RenderMetrics to add hooks receiving each sample.
+                    Defaults to False.
+                metrics_path (str | None, optional): The URL path the metrics
+                    are served from in the Prometheus text format, None to
+                    not serve them. Defaults to "/metrics".
         """
         super().__init__(*args, **kwargs)
 
-        self.reload = reload
+        self.reload = reload or hot_reload
+        self.hot_reloader = None
+        if hot_reload:
+            self.hot_reloader = HotReloader(self, static_directory=static_directory)
         self.favicon_path = favicon_path
+        if compression is True:
+            compression = CompressionPolicy()
+        self.compression = compression or None
+        if ws_compression is True:
+            ws_compression = WSCompression()
+        self.ws_compression = ws_compression or None
+        if metrics is True:
+            metrics = RenderMetrics()
+        self.metrics = metrics or None
+
+        # HTMX is served from a fingerprinted URL, so it can be cached forever
+        self.htmx = StaticAsset.from_path(
+            get_htmx_path(), cache_control="public, max-age=31536000, immutable"
+        )
+        self.htmx_path = f"/_rapidhtml/htmx-{HTMX_VERSION}.{self.htmx.hash[:12]}.js"
+
         self.html_head = (
             Title(title),
-            Script(src="https://unpkg.com/htmx.org@2.0.1"),
+            Link(rel="preload", href=self.htmx_path, as_="script"),
+            Script(src=self.htmx_path),
         ) + tuple(html_head or ())
 
-        if reload:
+        if batch_callbacks:
+            self.batch_extension = StaticAsset.from_path(
+                get_batch_extension_path(),
+                cache_control="public, max-age=31536000, immutable",
+            )
+            self.batch_extension_path = (
+                f"/_rapidhtml/batch.{self.batch_extension.hash[:12]}.js"
+            )
+            self.html_head += (Script(src=self.batch_extension_path),)
+        if ws_binary_fragments:
+            self.ws_extension = StaticAsset.from_path(
+                get_ws_extension_path(),
+                cache_control="public, max-age=31536000, immutable",
+            )
+            self.ws_extension_path = f"/_rapidhtml/ws.{self.ws_extension.hash[:12]}.js"
+            self.html_head += (Script(src=self.ws_extension_path),)
+        if hot_reload:
+            self.html_head += (Script(JS_HOT_RELOAD_SCRIPT),)
+        elif reload:
             self.html_head += (Script(JS_RELOAD_SCRIPT),)
-            self.router = RapidHTMLRouter(html_head=self.html_head)
+        router_class = RapidHTMLCompiledRouter if compiled_router else RapidHTMLRouter
+        self.router = router_class(
+            html_head=self.html_head,
+            compression=self.compression,
+            etag=etag,
+            minify=minify,
+            early_hints=[f"<{self.htmx_path}>; rel=preload; as=script"],
+            metrics=self.metrics,
+        )
+        self.router.add_route(self.htmx_path, self.htmx, etag=False)
+        if batch_callbacks:
+            self.router.add_route(
+                self.batch_extension_path, self.batch_extension, etag=False
+            )
+            self.router.add_route(
+                BATCH_PATH, BatchEndpoint(self.router), methods=["POST"], etag=False
+            )
+        if ws_binary_fragments:
+            self.router.add_route(self.ws_extension_path, self.ws_extension, etag=False)
+        if self.reload:
             self.router.add_websocket_route("/live-reload", _ReloadSocket)
-        else:
-            self.router = RapidHTMLRouter(html_head=self.html_head)
+        if hot_reload:
+            self.router.on_startup.append(self.hot_reloader.start)
+            self.router.on_shutdown.append(self.hot_reloader.stop)
 
-        # Get the favicon and store it
-        if favicon_path is None:
-            self.favicon_data = get_default_favicon()
-        else:
-            with open(favicon_path, "rb") as f:
-                self.favicon_data = f.read()
+        # Serve the favicon with its detected media type and cache headers
+        self.favicon = StaticAsset.from_path(favicon_path or get_default_favicon_path())
+        self.favicon_data = self.favicon.data
+        self.router.add_route("/favicon.ico", self.favicon, etag=False)
 
-        @self.route("/favicon.ico")
-        async def favicon_route():
-            nonlocal self
-            return Response(self.favicon_data, media_type="image/svg+xml")
+        if self.metrics is not None and metrics_path is not None:
+            self.router.add_route(
+                metrics_path, self.metrics.endpoint, methods=["GET"], etag=False
+            )
+
+        self.warm_up_paths = list(warm_up)
+        if self.warm_up_paths:
+            self.router.on_startup.append(self._warm_up_on_startup)
+
+        if static_directory is not None:
+            self.router.mount(
+                static_path,
+                app=RapidHTMLStaticFiles(directory=static_directory),
+                name="static",
+            )
 
     def serve(self, appname=None, *args, **kwargs):
+        """
+        Serves the app with uvicorn.
+
+        Pass `workers=N` to serve it from N processes. Each worker imports
+        the app from the module calling `serve()`, or from `appname`, so the
+        app must be created at the module level and `serve()` called in its
+        `if __name__ == "__main__"` block. Use a SharedCache for routes to
+        share rendered pages between the workers.
+
+        Args:
+            appname (str | None, optional): The module the app is imported
+                from by workers and the reloader. Defaults to the module
+                calling `serve()`.
+            *args: Variable length argument list passed to `uvicorn.run`.
+            **kwargs: Arbitrary keyword arguments passed to `uvicorn.run`.
+        """
         if "reload" in kwargs:
             warnings.warn(
                 "`reload` should be passed as an argument when initializing the app, not when serving the app.",
@@ -104,8 +273,66 @@ class RapidHTML(Starlette):
             self.reload = kwargs.pop("reload")
 
         caller_file = Path(inspect.currentframe().f_back.f_globals.get("__file__", ""))
-        app = f"{appname or caller_file.stem}:app" if self.reload else self
-        uvicorn.run(app=app, reload=self.reload, *args, **kwargs)
+        # The hot reloader runs in the server process, so it needs the app
+        # itself rather than uvicorn's reloader
+        restart = self.reload and self.hot_reloader is None
+        # Restarting and spawning workers both import the app in a new process
+        import_app = restart or (kwargs.get("workers") or 1) > 1
+        app = f"{appname or caller_file.stem}:app" if import_app else self
+        if self.ws_compression is None:
+            kwargs.setdefault("ws_per_message_deflate", False)
+        elif "ws" not in kwargs and importlib.util.find_spec("websockets"):
+            from rapidhtml.ws_protocol import RapidHTMLWSProtocol
+
+            kwargs["ws"] = functools.partial(
+                RapidHTMLWSProtocol, compression=self.ws_compression
+            )
+        uvicorn.run(app=app, reload=restart, *args, **kwargs)
+
+    async def warm_up(self, paths: typing.Iterable[str]) -> int:
+        """
+        Renders the pages of cached routes into their caches, so the first
+        requests for them are served from the cache. Pages that are already
+        cached, e.g. in a DiskCache kept from a previous run, are not
+        rendered again.
+
+        Args:
+            paths (typing.Iterable[str]): The paths, with query strings, of
+                the pages to render.
+
+        Returns:
+            int: The number of pages that were rendered.
+        """
+        rendered = 0
+        for path in paths:
+            path, _, query = path.partition("?")
+            scope = {
+                "type": "http",
+                "method": "GET",
+                "path": path,
+                "raw_path": path.encode(),
+                "query_string": query.encode(),
+                "headers": [(b"accept", b"text/html")],
+                "app": self,
+                "router": self.router,
+            }
+            for route in self.router.routes:
+                if not isinstance(route, RapidHTMLRoute) or route.cache is None:
+                    continue
+                match, child_scope = route.matches(scope)
+                if match != Match.FULL:
+                    continue
+                scope.update(child_scope)
+                request = Request(scope)
+                version = await route.get_version(request)
+                if route.get_cache_key(request, version) not in route.cache:
+                    await route.get_response(request, version=version)
+                    rendered += 1
+                break
+        return rendered
+
+    async def _warm_up_on_startup(self) -> None:
+        await self.warm_up(self.warm_up_paths)
 
     def route(self, path, *args, **kwargs):
         def decorator(cls):
@@ -120,3 +347,35 @@ class RapidHTML(Starlette):
             return cls
 
         return decorator
+
+    def sse_route(self, path, name=None, **kwargs):
+        """
+        Serves server-sent events from an async generator function. Each tag
+        it yields is rendered and sent as an event, see RapidHTMLSSEEndpoint.
+
+        Example:
+
+        .. code-block:: python
+            @app.sse_route("/clock")
+            async def clock():
+                while True:
+                    yield P(datetime.now().strftime("%H:%M:%S"))
+                    await asyncio.sleep(1)
+
+        Args:
+            path (str): The URL path of the event stream.
+            name (str | None, optional): The name of the route. Defaults to
+                None.
+            **kwargs: Keyword arguments passed to RapidHTMLSSEEndpoint, such
+                as `ping_interval` and `replay_size`.
+        """
+
+        def decorator(func):
+            kwargs.setdefault("minify", self.router.minify)
+            endpoint = RapidHTMLSSEEndpoint(func, **kwargs)
+            self.router.add_route(
+                path, endpoint, methods=["GET"], name=name, etag=False
+            )
+            return func
+
+        return decorator
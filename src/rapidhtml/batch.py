@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import re
+import asyncio
+import typing
+import logging
+
+from starlette.exceptions import HTTPException
+from starlette.requests import Request
+from starlette.responses import HTMLResponse, Response
+from starlette.routing import Match, Router
+
+from rapidhtml.routing import RapidHTMLRoute
+
+logger = logging.getLogger("rapidhtml.batch")
+
+BATCH_PATH = "/_rapidhtml/batch"
+
+# Swap styles that can be done out of band with the fragment wrapped in a div
+BATCH_SWAP_STYLES = ("innerHTML", "afterbegin", "beforeend", "beforebegin", "afterend")
+
+# IDs that can be used in a selector without escaping
+ELEMENT_ID = re.compile(r"[A-Za-z_][\w-]*")
+
+
+class BatchEndpoint:
+    """
+    Serves several GET requests in one. Elements using the `rapidhtml-batch`
+    HTMX extension, e.g. widgets polling with `hx-trigger="every 2s"`, send
+    their requests here together rather than one at a time. The requested
+    routes are called concurrently and their fragments are returned as out of
+    band swaps of the elements' targets, all in one response.
+
+    The request body is a JSON list of `{"id": ..., "path": ..., "swap": ...}`
+    objects: the ID of the target element, the path and query of the request
+    and the swap style. Only RapidHTML routes are called, and fragments of
+    routes that fail, with an error status or an exception, are left out
+    without failing the rest of the batch.
+
+    The routes are called directly, so middleware only sees the request to
+    the batch endpoint, `/_rapidhtml/batch`, and not the batched paths.
+    Middleware that depends on the path, e.g. for authorization, has to
+    allow the batch endpoint or check the batched paths itself.
+
+    Args:
+        router (Router): The router whose routes are called.
+        max_requests (int, optional): The most requests a batch may contain.
+            Defaults to 100.
+    """
+
+    def __init__(self, router: Router, max_requests: int = 100) -> None:
+        self.router = router
+        self.max_requests = max_requests
+
+    async def __call__(self, request: Request) -> Response:
+        try:
+            items = await request.json()
+        except ValueError:
+            return Response("Invalid JSON", status_code=400)
+        if not isinstance(items, list) or len(items) > self.max_requests:
+            return Response("Invalid batch", status_code=400)
+
+        fragments = await asyncio.gather(
+            *(self.get_fragment(request, item) for item in items)
+        )
+        return HTMLResponse(
+            "".join(fragment for fragment in fragments if fragment is not None),
+            headers={"cache-control": "no-store"},
+        )
+
+    async def get_fragment(
+        self, request: Request, item: typing.Any
+    ) -> typing.Optional[str]:
+        """
+        Calls the route of a batched request and wraps its HTML in an out of
+        band swap.
+
+        Args:
+            request (Request): The batch request.
+            item (typing.Any): The batched request's ID, path and swap style.
+
+        Returns:
+            typing.Optional[str]: The out of band swap, or None if the request
+            is invalid or failed.
+        """
+        if not isinstance(item, dict):
+            return None
+        element_id, path = item.get("id"), item.get("path")
+        swap = item.get("swap", "innerHTML")
+        if (
+            not isinstance(element_id, str)
+            or not ELEMENT_ID.fullmatch(element_id)
+            or not isinstance(path, str)
+            or not path.startswith("/")
+            or swap not in BATCH_SWAP_STYLES
+        ):
+            return None
+
+        try:
+            html = await self.call(request, path)
+        except HTTPException:
+            return None
+        except Exception:
+            logger.exception("Batched request for %s failed", path)
+            return None
+        if html is None:
+            return None
+        return f"<div hx-swap-oob='{swap}:#{element_id}'>{html}</div>"
+
+    async def call(self, request: Request, path: str) -> typing.Optional[str]:
+        """
+        Calls the route matching a path with a GET request carrying the
+        batch request's headers, such as its cookies.
+
+        Args:
+            request (Request): The batch request.
+            path (str): The path and query string to request.
+
+        Returns:
+            typing.Optional[str]: The HTML of the response, or None if no
+            route matched or the response was not successful.
+        """
+        path, _, query = path.partition("?")
+        scope = {
+            **request.scope,
+            "method": "GET",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": query.encode(),
+        }
+        for route in self.router.routes:
+            if not isinstance(route, RapidHTMLRoute):
+                continue
+            match, child_scope = route.matches(scope)
+            if match != Match.FULL:
+                continue
+
+            scope.update(child_scope)
+            route_request = Request(scope)
+            response = await route.get_response(
+                route_request, version=await route.get_version(route_request)
+            )
+            body = getattr(response, "body", None)
+            if response.status_code != 200 or body is None:
+                return None
+            return body.decode(response.charset)
+        return None
@@ -0,0 +1,395 @@
+from __future__ import annotations
+
+import os
+import sys
+import json
+import shutil
+import typing
+import asyncio
+import logging
+import argparse
+import multiprocessing
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.routing import Mount, replace_params
+from starlette.staticfiles import StaticFiles
+from uvicorn.importer import import_from_string
+
+from rapidhtml.compression import CompressionPolicy
+from rapidhtml.routing import RapidHTMLRoute, call_with_request
+from rapidhtml.sse import RapidHTMLSSEEndpoint
+from rapidhtml.staticfiles import (
+    SIDECARS,
+    StaticAsset,
+    guess_media_type,
+    is_compressible,
+)
+from rapidhtml.tags import BaseTag, Raw
+
+logger = logging.getLogger("rapidhtml.build")
+
+# Content-Encoding -> suffix of the precompressed file, as read by
+# RapidHTMLStaticFiles and static file servers such as nginx
+SUFFIXES = {encoding: suffix for suffix, encoding in SIDECARS.items()}
+
+# The app rendered by the worker processes
+_app: Starlette | None = None
+
+
+def output_path(output_directory: Path, path: str) -> Path:
+    """
+    Returns the file a page is written to. Paths without a file extension
+    are written as `index.html` in a directory of their own, so they are
+    served at the same URL by static file servers.
+
+    Args:
+        output_directory (Path): The directory of the site.
+        path (str): The URL path of the page.
+
+    Returns:
+        Path: The file to write the page to.
+    """
+    relative = path.strip("/")
+    if not relative or not Path(relative).suffix:
+        relative = f"{relative}/index.html".lstrip("/")
+    return output_directory / relative
+
+
+def write_file(
+    destination: Path, data: bytes, compression: CompressionPolicy | None
+) -> list[Path]:
+    """
+    Writes a file along with its compressed variants, for each encoding that
+    makes it smaller.
+
+    Args:
+        destination (Path): The file to write.
+        data (bytes): The content of the file.
+        compression (CompressionPolicy | None): The encodings to compress the
+            file with, or None to only write the file.
+
+    Returns:
+        list[Path]: The files written.
+    """
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    destination.write_bytes(data)
+    written = [destination]
+    if compression is not None and len(data) >= compression.minimum_size:
+        for encoding in compression.available_encodings:
+            variant = compression.compress(data, encoding)
+            if len(variant) < len(data):
+                variant_path = Path(f"{destination}{SUFFIXES[encoding]}")
+                variant_path.write_bytes(variant)
+                written.append(variant_path)
+    return written
+
+
+async def render_page(
+    app: Starlette, route: RapidHTMLRoute, path: str, path_params: dict, minify: bool
+) -> bytes | None:
+    """
+    Calls a route's endpoint with a GET request for a path and renders the
+    page, with the app's head tags.
+
+    Args:
+        app (Starlette): The app.
+        route (RapidHTMLRoute): The route serving the page.
+        path (str): The URL path of the page.
+        path_params (dict): The path parameters of the request.
+        minify (bool): Render minified HTML.
+
+    Returns:
+        bytes | None: The HTML of the page, or None if the endpoint did not
+        return a tag or Raw HTML.
+    """
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "headers": [(b"accept", b"text/html")],
+        "path_params": path_params,
+        "app": app,
+        "router": app.router,
+    }
+    result = await call_with_request(route.endpoint_func, Request(scope))
+    if isinstance(result, BaseTag):
+        await result.resolve()
+        result.add_head(*(route.html_head or ()))
+        return result.render(minify=minify).encode("utf-8")
+    if isinstance(result, Raw):
+        return result.render().encode("utf-8")
+    return None
+
+
+def export_page(
+    route_index: int,
+    path: str,
+    path_params: dict,
+    output_directory: Path,
+    minify: bool,
+    compression: CompressionPolicy | None,
+) -> list[Path]:
+    """
+    Renders a page of the worker's app and writes it to the output directory.
+
+    Args:
+        route_index (int): The index of the route in the app's routes.
+        path (str): The URL path of the page.
+        path_params (dict): The path parameters of the request.
+        output_directory (Path): The directory of the site.
+        minify (bool): Render minified HTML.
+        compression (CompressionPolicy | None): The encodings to precompress
+            the page with.
+
+    Returns:
+        list[Path]: The files written, none if the route did not return HTML.
+    """
+    route = _app.router.routes[route_index]
+    html = asyncio.run(render_page(_app, route, path, path_params, minify))
+    if html is None:
+        logger.warning("Skipping %s, its route did not return HTML", path)
+        return []
+    return write_file(output_path(output_directory, path), html, compression)
+
+
+def export_file(
+    source: Path, destination: Path, compression: CompressionPolicy | None
+) -> list[Path]:
+    """
+    Copies a static file to the output directory, compressing it if it has a
+    compressible media type and no precompressed files of its own.
+
+    Args:
+        source (Path): The static file.
+        destination (Path): The file to write.
+        compression (CompressionPolicy | None): The encodings to compress the
+            file with.
+
+    Returns:
+        list[Path]: The files written.
+    """
+    if source.suffix in SIDECARS or any(
+        Path(f"{source}{suffix}").is_file() for suffix in SIDECARS
+    ):
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(source, destination)
+        return [destination]
+    data = source.read_bytes()
+    if not is_compressible(guess_media_type(source, data)):
+        compression = None
+    return write_file(destination, data, compression)
+
+
+def _init_worker(app: str | None) -> None:
+    global _app
+    if app is not None:
+        _app = import_from_string(app)
+
+
+def _get_params(
+    route: RapidHTMLRoute, params: typing.Mapping[str, typing.Iterable[dict]]
+) -> typing.Iterable[dict] | None:
+    if route.path in params:
+        return params[route.path]
+    if route.name in params:
+        return params[route.name]
+    return None
+
+
+def build(
+    app: Starlette | str,
+    output_directory: str | Path = "build",
+    params: typing.Mapping[str, typing.Iterable[dict]] | None = None,
+    minify: bool = True,
+    compression: CompressionPolicy | bool = True,
+    workers: int | None = None,
+) -> list[Path]:
+    """
+    Exports the pages of an app as static files, so they can be served by a
+    static file server without running the app.
+
+    Each GET route is called with a request for its path, and the page is
+    rendered with the app's head tags and written as `index.html` in the
+    directory of its path, along with its compressed variants. Routes with
+    path parameters are rendered once for each set of parameters listed in
+    `params` under the route's path or name, and skipped otherwise. Assets
+    served by the app, such as HTMX, the favicon and mounted static
+    directories, are copied alongside the pages.
+
+    Pages and assets are rendered and compressed in parallel across a pool
+    of processes. An app passed as an import string is imported by each
+    process; an app object is shared with processes started by forking, or
+    rendered in this process where forking is not available.
+
+    Tag callbacks and other routes added while rendering are not exported,
+    as they are served by the running app.
+
+    Args:
+        app (Starlette | str): The app, or an import string such as
+            `"main:app"`.
+        output_directory (str | Path, optional): The directory to write the
+            site to. Defaults to "build".
+        params (typing.Mapping[str, typing.Iterable[dict]] | None, optional):
+            The path parameters to render each parameterized route with,
+            keyed by the route's path or name, e.g.
+            `{"/posts/{slug}": [{"slug": "hello"}]}`. Defaults to None.
+        minify (bool, optional): Render minified HTML. Defaults to True.
+        compression (CompressionPolicy | bool, optional): Write compressed
+            variants of the pages and compressible assets. Pass a
+            CompressionPolicy to choose the encodings and levels. Defaults to
+            True.
+        workers (int | None, optional): The number of processes. Defaults to
+            the number of CPUs, 1 renders everything in this process.
+
+    Returns:
+        list[Path]: The files written.
+    """
+    global _app
+    import_string = app if isinstance(app, str) else None
+    if import_string is not None:
+        app = import_from_string(import_string)
+    if compression is True:
+        compression = CompressionPolicy(minimum_size=0)
+    compression = compression or None
+    output_directory = Path(output_directory)
+    output_directory.mkdir(parents=True, exist_ok=True)
+    params = params or {}
+
+    written: list[Path] = []
+    tasks: list[tuple[typing.Callable, tuple]] = []
+    for index, route in enumerate(app.router.routes):
+        if isinstance(route, Mount) and isinstance(route.app, StaticFiles):
+            directory = Path(route.app.directory)
+            for source in sorted(directory.rglob("*")):
+                if source.is_file():
+                    destination = output_directory / route.path.strip("/")
+                    destination = destination / source.relative_to(directory)
+                    tasks.append((export_file, (source, destination, compression)))
+            continue
+        if not isinstance(route, RapidHTMLRoute) or "GET" not in (route.methods or ()):
+            continue
+
+        endpoint = route.endpoint_func
+        if isinstance(endpoint, StaticAsset):
+            destination = output_directory / route.path.lstrip("/")
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            destination.write_bytes(endpoint.data)
+            written.append(destination)
+            for encoding, variant in endpoint.variants.items():
+                variant_path = Path(f"{destination}{SUFFIXES[encoding]}")
+                variant_path.write_bytes(variant)
+                written.append(variant_path)
+            continue
+        if isinstance(endpoint, RapidHTMLSSEEndpoint):
+            continue
+
+        if not route.param_convertors:
+            pages = [(route.path, {})]
+        else:
+            route_params = _get_params(route, params)
+            if route_params is None:
+                logger.warning("Skipping %s, no parameters were given", route.path)
+                continue
+            pages = []
+            for path_params in route_params:
+                path, _ = replace_params(
+                    route.path_format, route.param_convertors, dict(path_params)
+                )
+                pages.append((path, dict(path_params)))
+        for path, path_params in pages:
+            tasks.append(
+                (
+                    export_page,
+                    (index, path, path_params, output_directory, minify, compression),
+                )
+            )
+
+    _app = app
+    workers = workers or os.cpu_count() or 1
+    fork = "fork" in multiprocessing.get_all_start_methods()
+    if workers == 1 or len(tasks) <= 1 or (import_string is None and not fork):
+        for func, args in tasks:
+            written.extend(func(*args))
+        return written
+
+    if import_string is None:
+        # Forked workers inherit the app
+        context, initargs = multiprocessing.get_context("fork"), (None,)
+    else:
+        context, initargs = None, (import_string,)
+    executor = ProcessPoolExecutor(
+        max_workers=min(workers, len(tasks)),
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=initargs,
+    )
+    with executor:
+        futures = [executor.submit(func, *args) for func, args in tasks]
+        for future in futures:
+            written.extend(future.result())
+    return written
+
+
+def main(argv: typing.Sequence[str] | None = None) -> None:
+    """
+    The `rapidhtml` command line interface.
+
+    Usage:
+
+    .. code-block:: shell
+        rapidhtml build main:app --output build --params params.json
+
+    Args:
+        argv (typing.Sequence[str] | None, optional): The command line
+            arguments. Defaults to `sys.argv[1:]`.
+    """
+    parser = argparse.ArgumentParser(prog="rapidhtml")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build_parser = commands.add_parser(
+        "build", help="Export the pages of an app as static files."
+    )
+    build_parser.add_argument("app", help="The app's import string, e.g. main:app.")
+    build_parser.add_argument(
+        "-o", "--output", default="build", help="The directory to write the site to."
+    )
+    build_parser.add_argument(
+        "--params",
+        help="A JSON file mapping routes to lists of their path parameters.",
+    )
+    build_parser.add_argument(
+        "-w", "--workers", type=int, help="The number of processes."
+    )
+    build_parser.add_argument(
+        "--no-minify", action="store_true", help="Do not minify the pages."
+    )
+    build_parser.add_argument(
+        "--no-compression", action="store_true", help="Do not compress the files."
+    )
+    args = parser.parse_args(argv)
+
+    params = None
+    if args.params:
+        with open(args.params) as file:
+            params = json.load(file)
+    # Import the app from the current directory, as `python main.py` would
+    sys.path.insert(0, os.getcwd())
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    written = build(
+        args.app,
+        args.output,
+        params=params,
+        minify=not args.no_minify,
+        compression=not args.no_compression,
+        workers=args.workers,
+    )
+    logger.info("Wrote %d files to %s", len(written), args.output)
+
+
+if __name__ == "__main__":
+    main()
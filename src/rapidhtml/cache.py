@@ -0,0 +1,415 @@
+from __future__ import annotations
+
+import os
+import sys
+import mmap
+import time
+import atexit
+import pickle
+import struct
+import hashlib
+import tempfile
+import threading
+
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: nocover
+    fcntl = None
+
+# Workers find the file of a shared cache created by the serving process in
+# this environment variable, suffixed with the name of the cache
+SHARED_CACHE_ENV = "RAPIDHTML_SHARED_CACHE_"
+
+# Shared memory backed directory, if the platform has one
+SHARED_MEMORY_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+# magic, number of slots, arena size, next write offset, next sequence number
+_HEADER = struct.Struct("<8sQQQQ")
+_HEADER_SIZE = 64
+_MAGIC = b"RHCACHE1"
+# key digest, sequence number, arena offset, value length, expiry time
+_SLOT = struct.Struct("<16sQQQd")
+# key digest and sequence number, written before each value in the arena
+_ENTRY = struct.Struct("<16sQ")
+# Slots probed for a key before the oldest one is replaced
+_PROBES = 8
+
+# Number of shared caches created by each line without a name, minus one
+_call_sites: dict[str, int] = {}
+_call_sites_lock = threading.Lock()
+
+
+def get_size(value: Any) -> int:
+    """
+    Returns the size of a cached value in bytes. Values with a length, such as
+    strings, bytes and rendered fragments, are measured by their length.
+
+    Args:
+        value (Any): The cached value.
+
+    Returns:
+        int: The approximate size of the value.
+    """
+    try:
+        return len(value)
+    except TypeError:
+        return sys.getsizeof(value)
+
+
+class LRUCache:
+    """
+    A thread-safe least-recently-used cache.
+
+    Args:
+        maxsize (int, optional): The maximum number of entries to keep.
+            Defaults to 128.
+        max_bytes (int | None, optional): The maximum total size of the
+            entries, as measured by `sizeof`. Defaults to None, no limit.
+        ttl (float | None, optional): Seconds after which an entry expires.
+            Defaults to None, entries never expire.
+        sizeof (Callable[[Any], int], optional): Returns the size of a value.
+            Defaults to `get_size`.
+
+    Attributes:
+        hits (int): The number of lookups that found a value.
+        misses (int): The number of lookups that did not find a value.
+        nbytes (int): The total size of the cached values.
+
+    Methods:
+        get(key, default): Returns the cached value, marking it as recently used.
+        set(key, value): Stores a value, evicting the least recently used entry
+            if the cache is full.
+        pop(key, default): Removes and returns a cached value.
+        clear(): Removes every entry from the cache.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 128,
+        max_bytes: Optional[int] = None,
+        ttl: Optional[float] = None,
+        sizeof: Callable[[Any], int] = get_size,
+    ) -> None:
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.sizeof = sizeof
+        self.hits = 0
+        self.misses = 0
+        self.nbytes = 0
+        # key -> (value, size, expiry time)
+        self._data: OrderedDict[Hashable, tuple[Any, int, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        with self._lock:
+            try:
+                value, _, expires = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            if self.ttl is not None and expires <= time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        size = self.sizeof(value) if self.max_bytes is not None else 0
+        expires = time.monotonic() + self.ttl if self.ttl is not None else 0.0
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                # Would evict everything else and still not fit
+                return
+            self._data[key] = (value, size, expires)
+            self.nbytes += size
+            while len(self._data) > self.maxsize or (
+                self.max_bytes is not None and self.nbytes > self.max_bytes
+            ):
+                _, (_, evicted_size, _) = self._data.popitem(last=False)
+                self.nbytes -= evicted_size
+
+    def pop(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        with self._lock:
+            if key not in self._data:
+                return default
+            return self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.nbytes = 0
+
+    def _remove(self, key: Hashable) -> Any:
+        value, size, _ = self._data.pop(key)
+        self.nbytes -= size
+        return value
+
+    @property
+    def hit_rate(self) -> float:
+        """The fraction of lookups that found a value."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """The cache's hit, miss and size counters."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "entries": len(self._data),
+            "nbytes": self.nbytes,
+        }
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            item = self._data.get(key)
+            return item is not None and (self.ttl is None or item[2] > time.monotonic())
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SharedCache:
+    """
+    A cache shared by every worker process serving the app, so a page
+    rendered by one worker is served by all of them without rendering it
+    again. It has the same interface as LRUCache and can be passed as the
+    `cache` of a route.
+
+    Values are pickled into a memory mapped file, in shared memory where the
+    platform has it. The file is created by the process that creates the
+    cache first, usually the one calling `app.serve(workers=N)`, and workers
+    started afterwards attach to it through an environment variable. It is
+    deleted when that process exits.
+
+    The file holds a table of `maxsize` slots pointing into a ring buffer of
+    `max_bytes` bytes. New values overwrite the oldest ones once the buffer
+    is full, and values larger than half the buffer are not stored. The
+    `hits` and `misses` counters are per process.
+
+    Args:
+        max_bytes (int, optional): The size of the ring buffer holding the
+            values. Defaults to 64 MiB.
+        maxsize (int, optional): The maximum number of entries. Defaults to
+            4096.
+        ttl (float | None, optional): Seconds after which an entry expires.
+            Defaults to None, entries never expire.
+        name (str | None, optional): Identifies the cache across processes.
+            Caches with the same name share their values. Defaults to the
+            file and line creating the cache, and how many caches that line
+            created before.
+    """
+
+    shared = True
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        maxsize: int = 4096,
+        ttl: Optional[float] = None,
+        name: Optional[str] = None,
+    ) -> None:
+        self.ttl = ttl
+        if name is None:
+            # The line creating the cache is the same in every worker, and
+            # caches created by one line, in a loop, are created in the same
+            # order, so each gets its own file
+            caller = sys._getframe(1)
+            site = f"{caller.f_code.co_filename}:{caller.f_lineno}"
+            with _call_sites_lock:
+                count = _call_sites[site] = _call_sites.get(site, -1) + 1
+            name = hashlib.blake2b(
+                f"{site}:{count}".encode(), digest_size=8
+            ).hexdigest()
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        variable = SHARED_CACHE_ENV + self.name
+        path = os.environ.get(variable)
+        if path is not None and os.path.exists(path):
+            self.path = path
+            self._fd = os.open(path, os.O_RDWR)
+            size = os.fstat(self._fd).st_size
+            self._map = mmap.mmap(self._fd, size)
+            _, self.maxsize, self.max_bytes, _, _ = _HEADER.unpack_from(self._map)
+        else:
+            self.maxsize = maxsize
+            self.max_bytes = max_bytes
+            self._fd, self.path = tempfile.mkstemp(
+                prefix="rapidhtml-", suffix=".cache", dir=SHARED_MEMORY_DIR
+            )
+            size = self._arena_start + max_bytes
+            os.ftruncate(self._fd, size)
+            self._map = mmap.mmap(self._fd, size)
+            _HEADER.pack_into(self._map, 0, _MAGIC, maxsize, max_bytes, 0, 1)
+            # Workers inherit the environment of the process starting them
+            os.environ[variable] = self.path
+            atexit.register(self._unlink, os.getpid())
+
+    @property
+    def _arena_start(self) -> int:
+        return _HEADER_SIZE + self.maxsize * _SLOT.size
+
+    def _unlink(self, pid: int) -> None:
+        # Forked workers inherit the exit handler, only the creator deletes
+        if os.getpid() == pid and os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def _locked(self, exclusive: bool) -> "_FileLock":
+        return _FileLock(self._lock, self._fd, exclusive)
+
+    @staticmethod
+    def _digest(key: Hashable) -> bytes:
+        return hashlib.blake2b(repr(key).encode(), digest_size=16).digest()
+
+    def _slot_offset(self, index: int) -> int:
+        return _HEADER_SIZE + index * _SLOT.size
+
+    def _probe(self, digest: bytes) -> range:
+        start = int.from_bytes(digest[:8], "little") % self.maxsize
+        return range(start, start + min(_PROBES, self.maxsize))
+
+    def _find(self, digest: bytes) -> Optional[tuple[int, bytes]]:
+        """Returns the slot and pickled value of a live entry, if any."""
+        for index in self._probe(digest):
+            offset = self._slot_offset(index % self.maxsize)
+            slot_digest, seq, value_offset, length, expires = _SLOT.unpack_from(
+                self._map, offset
+            )
+            if slot_digest != digest or seq == 0:
+                continue
+            # The value may have been overwritten since, by newer entries
+            # wrapping around the ring buffer
+            start = self._arena_start + value_offset
+            if _ENTRY.unpack_from(self._map, start) != (digest, seq):
+                return None
+            if self.ttl is not None and expires <= time.time():
+                return None
+            data_start = start + _ENTRY.size
+            return offset, self._map[data_start : data_start + length]
+        return None
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        with self._locked(exclusive=False):
+            found = self._find(self._digest(key))
+        if found is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return pickle.loads(found[1])
+
+    def set(self, key: Hashable, value: Any) -> None:
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        size = _ENTRY.size + len(data)
+        if size > self.max_bytes // 2:
+            return
+        digest = self._digest(key)
+        expires = time.time() + self.ttl if self.ttl is not None else 0.0
+
+        with self._locked(exclusive=True):
+            magic, slots, arena, write_offset, seq = _HEADER.unpack_from(self._map)
+            if write_offset + size > arena:
+                write_offset = 0
+            start = self._arena_start + write_offset
+            _ENTRY.pack_into(self._map, start, digest, seq)
+            self._map[start + _ENTRY.size : start + size] = data
+
+            # Use the slot holding the key, or an empty one, or else the
+            # oldest one
+            slot, oldest = None, None
+            for index in self._probe(digest):
+                offset = self._slot_offset(index % self.maxsize)
+                slot_digest, slot_seq = _SLOT.unpack_from(self._map, offset)[:2]
+                if slot_digest == digest or slot_seq == 0:
+                    slot = offset
+                    break
+                if oldest is None or slot_seq < oldest[1]:
+                    oldest = (offset, slot_seq)
+            if slot is None:
+                slot = oldest[0]
+            _SLOT.pack_into(
+                self._map, slot, digest, seq, write_offset, len(data), expires
+            )
+            _HEADER.pack_into(
+                self._map, 0, magic, slots, arena, write_offset + size, seq + 1
+            )
+
+    def pop(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        with self._locked(exclusive=True):
+            found = self._find(self._digest(key))
+            if found is None:
+                return default
+            offset, data = found
+            self._map[offset : offset + _SLOT.size] = bytes(_SLOT.size)
+        return pickle.loads(data)
+
+    def clear(self) -> None:
+        with self._locked(exclusive=True):
+            magic, slots, arena, _, seq = _HEADER.unpack_from(self._map)
+            self._map[_HEADER_SIZE : self._arena_start] = bytes(
+                self._arena_start - _HEADER_SIZE
+            )
+            _HEADER.pack_into(self._map, 0, magic, slots, arena, 0, seq)
+
+    @property
+    def hit_rate(self) -> float:
+        """The fraction of lookups in this process that found a value."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """The cache's hit, miss and size counters."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "entries": len(self),
+            "nbytes": self.max_bytes,
+        }
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._locked(exclusive=False):
+            return self._find(self._digest(key)) is not None
+
+    def __len__(self) -> int:
+        count = 0
+        with self._locked(exclusive=False):
+            for index in range(self.maxsize):
+                digest, seq = _SLOT.unpack_from(self._map, self._slot_offset(index))[:2]
+                if seq and self._find(digest) is not None:
+                    count += 1
+        return count
+
+
+class _FileLock:
+    """
+    Locks a shared cache against the threads of this process and, where
+    `fcntl` is available, against other processes.
+    """
+
+    def __init__(self, lock: threading.Lock, fd: int, exclusive: bool) -> None:
+        self.lock = lock
+        self.fd = fd
+        self.exclusive = exclusive
+
+    def __enter__(self) -> None:
+        self.lock.acquire()
+        if fcntl is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_EX if self.exclusive else fcntl.LOCK_SH)
+
+    def __exit__(self, *exc_info) -> None:
+        if fcntl is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+        self.lock.release()
@@ -1,16 +1,40 @@
+from __future__ import annotations
+
 import json
 
-from typing import Literal, Optional, Callable
+from types import MappingProxyType
+from typing import Any, Literal, Mapping, Optional, Callable, TYPE_CHECKING
+from weakref import WeakKeyDictionary
+from functools import cached_property
 
 from dataclasses import dataclass
 
+if TYPE_CHECKING:
+    from starlette.applications import Starlette
+
+# The HTMX extension batching requests, see rapidhtml.batch
+BATCH_EXTENSION = "rapidhtml-batch"
+
+# The paths of callback routes start with this, followed by the function's ID
+CALLBACK_ROUTE_PREFIX = "/python-callbacks/"
+
+# App -> the callback routes registered with it and their functions
+_registered_routes: WeakKeyDictionary[Starlette, dict[str, Callable]] = (
+    WeakKeyDictionary()
+)
+
 
-@dataclass
+# Compared and hashed by identity, as the attributes include dicts
+@dataclass(frozen=True, eq=False)
 class RapidHTMLCallback:
     """
     A class to represent a callback function. Abstracts away most of the
     HTMX attributes and provides a more Pythonic interface.
 
+    Callbacks are immutable. Their attributes are computed and rendered once,
+    and their route is registered once per app, so the same callback can be
+    used by any number of tags, e.g. one per table row, at almost no cost.
+
 
     Attributes:
 
@@ -32,7 +56,8 @@ class RapidHTMLCallback:
 
         swap (Optional[Literal["innerHTML", "outerHTML", "textContent",
             "beforebegin", "afterbegin", "beforeend", "afterend", "delete",
-            "none"]]): Controls how content will swap in.
+            "none"]]): Controls how content will swap in. Left to HTMX, which
+            swaps the inner HTML, when not set.
 
         swap_oob (Optional[Literal["innerHTML", "outerHTML", "textContent",
             "beforebegin", "afterbegin", "beforeend", "afterend", "delete",
@@ -97,6 +122,11 @@ class RapidHTMLCallback:
         validate (Optional[bool]): Force elements to validate themselves before a
             request.
 
+        batch (bool): Send the request together with the requests of other
+            elements made at the same time, see `RapidHTML(batch_callbacks=True)`.
+            Only GET requests swapping the inner HTML of, or inserting content
+            next to, their target are batched.
+
     More information on the HTMX attributes can be found here:
         https://htmx.org/reference/
 
@@ -121,7 +151,7 @@ class RapidHTMLCallback:
             "delete",
             "none",
         ]
-    ] = "innerHTML"
+    ] = None
     swap_oob: Optional[
         Literal[
             "innerHTML",
@@ -168,14 +198,16 @@ class RapidHTMLCallback:
         ]
     ] = None
     validate: Optional[bool] = None
+    batch: bool = False
 
-    def get_data(self) -> tuple[Callable, str, dict]:
-        """Get the data of the callback.
+    @property
+    def route(self) -> str:
+        """The path of the route calling the function."""
+        return f"{CALLBACK_ROUTE_PREFIX}{id(self.func)}"
 
-        Returns:
-            tuple[Callable, str, dict]: The function, method, and attributes of
-            the callback.
-        """
+    @cached_property
+    def attrs(self) -> Mapping[str, Any]:
+        """The HTMX attributes of the callback, except for the route."""
         attrs = {}
         if self.on is not None:
             event = self.on[0]
@@ -195,7 +227,7 @@ class RapidHTMLCallback:
         if self.trigger is not None:
             attrs["hx_trigger"] = self.trigger
         if self.vals is not None:
-            attrs["hx_vals"] = json.dump(self.vals)
+            attrs["hx_vals"] = json.dumps(self.vals)
         if self.boost is not None:
             attrs["hx_boost"] = "true" if self.boost else "false"
         if self.confirm is not None:
@@ -208,10 +240,13 @@ class RapidHTMLCallback:
             attrs["hx_disinherit"] = self.disinherit
         if self.encoding is not None:
             attrs["hx_encoding"] = self.encoding
-        if self.ext is not None:
-            attrs["hx_ext"] = self.ext
+        if self.ext is not None or self.batch:
+            extensions = [self.ext] if self.ext is not None else []
+            if self.batch:
+                extensions.append(BATCH_EXTENSION)
+            attrs["hx_ext"] = ", ".join(extensions)
         if self.headers is not None:
-            attrs["hx_headers"] = json.dump(self.headers)
+            attrs["hx_headers"] = json.dumps(self.headers)
         if self.history is not None:
             attrs["hx_history"] = "true" if self.history else "false"
         if self.history_elt is not None:
@@ -234,10 +269,63 @@ class RapidHTMLCallback:
             attrs["hx_request"] = (
                 self.request
                 if isinstance(self.request, str)
-                else json.dump(self.request)
+                else json.dumps(self.request)
             )
         if self.sync is not None:
             attrs["hx_sync"] = self.sync
         if self.validate is not None:
             attrs["hx_validate"] = "true" if self.validate else "false"
-        return self.func, self.method, attrs
+        return MappingProxyType(attrs)
+
+    @cached_property
+    def attr_names(self) -> frozenset[str]:
+        """
+        The names of the attributes of the callback as they are rendered,
+        route included, e.g. `hx-target`. They take the place of the tag's
+        own attributes of the same name.
+        """
+        return frozenset(
+            key.replace("_", "-") for key in (*self.attrs, f"hx_{self.method}")
+        )
+
+    @cached_property
+    def html_attrs(self) -> str:
+        """
+        The attributes of the callback, including the route, rendered once
+        and placed as they are into the opening tag of tags using it. Each
+        attribute is followed by a space.
+        """
+        attrs = {**self.attrs, f"hx_{self.method}": self.route}
+        html = ""
+        for key, value in attrs.items():
+            if value in (None, True, False):
+                value = str(value).lower()
+            html += f"{key.replace('_', '-')}='{value}' "
+        return html
+
+    def register(self, app: Starlette) -> str:
+        """
+        Adds the route calling the function to an app, unless it has already
+        been added.
+
+        Args:
+            app (Starlette): The app to add the route to.
+
+        Returns:
+            str: The path of the route.
+        """
+        routes = _registered_routes.setdefault(app, {})
+        route = self.route
+        if routes.get(route) != self.func:
+            app.add_route(route, self.func, [self.method])
+            routes[route] = self.func
+        return route
+
+    def get_data(self) -> tuple[Callable, str, dict]:
+        """Get the data of the callback.
+
+        Returns:
+            tuple[Callable, str, dict]: The function, method, and attributes of
+            the callback.
+        """
+        return self.func, self.method, dict(self.attrs)
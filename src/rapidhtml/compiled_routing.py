@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+import typing
+import functools
+
+from starlette._utils import get_route_path
+from starlette.convertors import (
+    FloatConvertor,
+    IntegerConvertor,
+    StringConvertor,
+    UUIDConvertor,
+)
+from starlette.datastructures import URL
+from starlette.responses import RedirectResponse
+from starlette.routing import BaseRoute, Match
+from starlette.types import Receive, Scope, Send
+
+from rapidhtml.routing import RapidHTMLRouter
+
+# Convertors whose values never contain a slash. Any other convertor, such
+# as `path` or a registered one, may match several segments
+SEGMENT_CONVERTORS = (StringConvertor, IntegerConvertor, FloatConvertor, UUIDConvertor)
+
+
+class _Node:
+    """A node of the route tree, for one path segment."""
+
+    __slots__ = ("children", "param", "routes", "catch_all")
+
+    def __init__(self) -> None:
+        # Literal segment -> node
+        self.children: dict[str, _Node] = {}
+        # The node for a parameter segment, such as `{id}` or `{id}.json`
+        self.param: _Node | None = None
+        # Indexes of the routes whose paths end at this node
+        self.routes: list[int] = []
+        # Indexes of the routes whose paths continue with a parameter that
+        # may match any number of segments, e.g. mounts
+        self.catch_all: list[int] = []
+
+
+class RouteIndex:
+    """
+    Finds the routes that can match a path without trying each of them.
+    Routes without path parameters are looked up in a dict by their path.
+    Routes with parameters are kept in a tree of path segments, in which
+    parameter segments match any segment and a `path` parameter, or one with
+    a convertor other than Starlette's single segment ones, matches the rest
+    of the path. Routes without a path, such as Host routes, are
+    candidates for every path.
+
+    The index only narrows the routes down, the candidates are still matched
+    in full with their own `matches()`.
+
+    Args:
+        routes (typing.Sequence[BaseRoute]): The routes to index.
+    """
+
+    def __init__(self, routes: typing.Sequence[BaseRoute]) -> None:
+        self.static: dict[str, list[int]] = {}
+        self.tree = _Node()
+        self.unindexed: list[int] = []
+        for index, route in enumerate(routes):
+            self.add(index, route)
+
+    def add(self, index: int, route: BaseRoute) -> None:
+        """
+        Adds a route to the index.
+
+        Args:
+            index (int): The position of the route in the router's routes.
+            route (BaseRoute): The route.
+        """
+        path_format = getattr(route, "path_format", None)
+        convertors = getattr(route, "param_convertors", None)
+        if not isinstance(path_format, str) or not path_format.startswith("/"):
+            self.unindexed.append(index)
+            return
+        if not convertors:
+            self.static.setdefault(path_format, []).append(index)
+            return
+
+        node = self.tree
+        for segment in path_format.split("/")[1:]:
+            if "{" not in segment:
+                node = node.children.setdefault(segment, _Node())
+            elif any(
+                type(convertor) not in SEGMENT_CONVERTORS
+                for name, convertor in convertors.items()
+                if f"{{{name}}}" in segment
+            ):
+                node.catch_all.append(index)
+                return
+            else:
+                if node.param is None:
+                    node.param = _Node()
+                node = node.param
+        node.routes.append(index)
+
+    def candidates(self, path: str) -> list[int]:
+        """
+        Returns the routes that can match a path.
+
+        Args:
+            path (str): The path to match.
+
+        Returns:
+            list[int]: The indexes of the routes, in order.
+        """
+        found = list(self.static.get(path, ()))
+        if path.startswith("/"):
+            self._walk(self.tree, path.split("/")[1:], 0, found)
+        found.extend(self.unindexed)
+        found.sort()
+        return found
+
+    def _walk(
+        self, node: _Node, segments: list[str], depth: int, found: list[int]
+    ) -> None:
+        found.extend(node.catch_all)
+        if depth == len(segments):
+            found.extend(node.routes)
+            return
+        child = node.children.get(segments[depth])
+        if child is not None:
+            self._walk(child, segments, depth + 1, found)
+        if node.param is not None:
+            self._walk(node.param, segments, depth + 1, found)
+
+
+class _RouteList(list):
+    """A list of routes that drops its router's index whenever it changes."""
+
+    def __init__(self, router: RapidHTMLCompiledRouter, routes=()) -> None:
+        super().__init__(routes)
+        self.router = router
+
+
+def _invalidating(name: str) -> typing.Callable:
+    method = getattr(list, name)
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        self.router._index = None
+        return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+for _name in (
+    "append",
+    "extend",
+    "insert",
+    "remove",
+    "pop",
+    "clear",
+    "sort",
+    "reverse",
+    "__setitem__",
+    "__delitem__",
+    "__iadd__",
+    "__imul__",
+):
+    setattr(_RouteList, _name, _invalidating(_name))
+
+
+class RapidHTMLCompiledRouter(RapidHTMLRouter):
+    """
+    A RapidHTMLRouter that finds the route for a request through a
+    RouteIndex, rather than by matching the path against every route in
+    turn, so matching stays fast with thousands of routes such as those of
+    tag callbacks.
+
+    Requests are routed exactly as by Starlette's Router: the first route
+    that fully matches handles the request, otherwise the first partial
+    match, e.g. for 405 Method Not Allowed, and otherwise a redirect to the
+    path with or without its trailing slash is tried. The index is rebuilt
+    after the routes change, whether through `add_route()`, by modifying
+    `routes` or by replacing it.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        self._index: RouteIndex | None = None
+        super().__init__(*args, **kwargs)
+
+    @property
+    def routes(self) -> list[BaseRoute]:
+        return self._routes
+
+    @routes.setter
+    def routes(self, routes: typing.Iterable[BaseRoute]) -> None:
+        self._routes = _RouteList(self, routes)
+        self._index = None
+
+    @property
+    def index(self) -> RouteIndex:
+        """The index of the current routes, built when first needed."""
+        if self._index is None:
+            self._index = RouteIndex(self._routes)
+        return self._index
+
+    def match(self, scope: Scope) -> tuple[BaseRoute | None, Match, Scope]:
+        """
+        Finds the route for a request.
+
+        Args:
+            scope (Scope): The ASGI scope of the request.
+
+        Returns:
+            tuple[BaseRoute | None, Match, Scope]: The first fully matching
+            route, or else the first partially matching route, with the kind
+            of match and the child scope. The route is None if nothing
+            matched.
+        """
+        routes = self._routes
+        partial = None
+        for index in self.index.candidates(get_route_path(scope)):
+            route = routes[index]
+            match, child_scope = route.matches(scope)
+            if match == Match.FULL:
+                return route, match, child_scope
+            if match == Match.PARTIAL and partial is None:
+                partial = (route, match, child_scope)
+        return partial or (None, Match.NONE, {})
+
+    async def app(self, scope: Scope, receive: Receive, send: Send) -> None:
+        assert scope["type"] in ("http", "websocket", "lifespan")
+
+        if "router" not in scope:
+            scope["router"] = self
+
+        if scope["type"] == "lifespan":
+            await self.lifespan(scope, receive, send)
+            return
+
+        route, _, child_scope = self.match(scope)
+        if route is not None:
+            scope.update(child_scope)
+            await route.handle(scope, receive, send)
+            return
+
+        route_path = get_route_path(scope)
+        if scope["type"] == "http" and self.redirect_slashes and route_path != "/":
+            redirect_scope = dict(scope)
+            if route_path.endswith("/"):
+                redirect_scope["path"] = redirect_scope["path"].rstrip("/")
+            else:
+                redirect_scope["path"] = redirect_scope["path"] + "/"
+
+            route, _, _ = self.match(redirect_scope)
+            if route is not None:
+                redirect_url = URL(scope=redirect_scope)
+                response = RedirectResponse(url=str(redirect_url))
+                await response(scope, receive, send)
+                return
+
+        await self.default(scope, receive, send)
@@ -0,0 +1,387 @@
+from __future__ import annotations
+
+import html
+import pickle
+import typing
+import inspect
+import functools
+
+from operator import attrgetter, itemgetter
+from urllib.parse import quote
+
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.exceptions import HTTPException
+from starlette.requests import Request
+
+from rapidhtml.bases import Renderable
+from rapidhtml.cache import LRUCache
+from rapidhtml.callbacks import RapidHTMLCallback
+from rapidhtml.tags import (
+    Await,
+    BaseTag,
+    Raw,
+    Table,
+    TableRows,
+    Tbody,
+    Td,
+    Th,
+    Thead,
+    Tr,
+)
+from rapidhtml.utils import content_hash, get_app
+
+# Returns up to `limit` records that come after the `after` cursor, in order.
+# The cursor is None for the first page.
+PageSource = typing.Callable[
+    [typing.Optional[str], int],
+    typing.Union[typing.Sequence, typing.Awaitable[typing.Sequence]],
+]
+
+
+def _typed(value: typing.Hashable) -> typing.Hashable:
+    # Types are part of the key as 1, 1.0 and True are equal but render
+    # differently, including within tuples and frozensets
+    if isinstance(value, tuple):
+        return (type(value), tuple(map(_typed, value)))
+    if isinstance(value, frozenset):
+        return (type(value), frozenset(map(_typed, value)))
+    return (type(value), value)
+
+
+def make_cache_key(args: tuple, kwargs: dict) -> typing.Hashable:
+    """
+    Returns a cache key for a function call. Hashable arguments are used as
+    they are, along with their types and those of the items of tuples and
+    frozensets, anything else, such as lists or model instances, is hashed by
+    its pickled content.
+
+    Args:
+        args (tuple): The positional arguments of the call.
+        kwargs (dict): The keyword arguments of the call.
+
+    Raises:
+        TypeError: If the arguments can neither be hashed nor pickled.
+
+    Returns:
+        typing.Hashable: The cache key.
+    """
+    items = tuple(sorted(kwargs.items()))
+    key = (args, items)
+    try:
+        hash(key)
+    except TypeError:
+        try:
+            data = pickle.dumps(key, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError) as error:
+            raise TypeError(f"Unable to hash the arguments: {error}") from None
+        return content_hash(data)
+    return _typed(key)
+
+
+def render_fragment(result: typing.Any) -> Raw:
+    if isinstance(result, Raw):
+        return result
+    if isinstance(result, Renderable):
+        return Raw(result.render())
+    return Raw(html.escape(str(result)))
+
+
+def component(
+    func: typing.Callable | None = None,
+    *,
+    cache: bool | LRUCache = True,
+    key: typing.Callable[..., typing.Hashable] | None = None,
+) -> typing.Callable:
+    """
+    Memoizes a function returning tags. The rendered HTML is cached by the
+    function's arguments and returned as a Raw node, which is placed
+    into parent tags as it is. A component used on many pages is only built
+    and rendered once per distinct set of arguments.
+
+    Arguments are hashed by value, falling back to hashing their pickled
+    content, or by the `key` function if one is given. Async functions are
+    supported, and their async children are resolved before rendering.
+
+    The decorated function has a `cache` attribute, an LRUCache exposing
+    `hits`, `misses` and `hit_rate`, and a `cache_clear()` method.
+
+    Example:
+
+    .. code-block:: python
+        @component(cache=LRUCache(max_bytes=10 * 1024 * 1024, ttl=60))
+        def people_table(*people):
+            return Table.from_records(people, class_="styled-table")
+
+        Body(H1("People"), people_table(*load_database()))
+
+    Args:
+        func (typing.Callable | None, optional): The function to decorate.
+        cache (bool | LRUCache, optional): The cache of rendered fragments.
+            Pass an LRUCache to set its size, byte limit and TTL. Defaults to
+            True, an LRUCache with the default settings.
+        key (typing.Callable | None, optional): Called with the function's
+            arguments to compute the cache key. Defaults to hashing the
+            arguments.
+
+    Returns:
+        typing.Callable: The decorated function.
+    """
+
+    def decorator(func: typing.Callable) -> typing.Callable:
+        fragments: LRUCache | None = None
+        if cache is True:
+            fragments = LRUCache()
+        elif cache is not False:
+            fragments = cache
+
+        def get_key(args: tuple, kwargs: dict) -> typing.Hashable:
+            return (
+                key(*args, **kwargs)
+                if key is not None
+                else make_cache_key(args, kwargs)
+            )
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs) -> Raw:
+                cache_key = get_key(args, kwargs) if fragments is not None else None
+                if cache_key is not None:
+                    fragment = fragments.get(cache_key)
+                    if fragment is not None:
+                        return fragment
+
+                result = await func(*args, **kwargs)
+                if isinstance(result, BaseTag):
+                    await result.resolve()
+                fragment = render_fragment(result)
+                if cache_key is not None:
+                    fragments.set(cache_key, fragment)
+                return fragment
+
+        else:
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs) -> Raw:
+                cache_key = get_key(args, kwargs) if fragments is not None else None
+                if cache_key is not None:
+                    fragment = fragments.get(cache_key)
+                    if fragment is not None:
+                        return fragment
+
+                fragment = render_fragment(func(*args, **kwargs))
+                if cache_key is not None:
+                    fragments.set(cache_key, fragment)
+                return fragment
+
+        wrapper.cache = fragments
+        wrapper.cache_clear = fragments.clear if fragments is not None else lambda: None
+        return wrapper
+
+    if func is not None:
+        return decorator(func)
+    return decorator
+
+
+class PaginatedTable:
+    """
+    A table that loads its rows a page at a time as the user scrolls. Only the
+    first page is rendered into the page, so its size does not depend on the
+    size of the dataset. The last row of each page is a placeholder that
+    fetches the next page with HTMX when it is revealed.
+
+    The rows come from `source`, either a sequence (paginated by offset) or a
+    function implementing keyset pagination: it is called with the `key` of
+    the last record shown, as a string, or None for the first page, and
+    returns up to `limit` records that come after it. The function may be
+    sync or async. Sync functions are run in a worker thread.
+
+    A single route serving the row pages is registered with the app when the
+    table is created. Rendered pages are cached with LRU eviction, call
+    `cache.clear()` when the data changes.
+
+    Example:
+
+    .. code-block:: python
+        def load_people(after, limit):
+            if after is not None and not (after.isascii() and after.isdigit()):
+                raise HTTPException(400, "Invalid cursor")
+            return db.query(
+                "SELECT * FROM people WHERE id > ? ORDER BY id LIMIT ?",
+                int(after or 0), limit,
+            )
+
+        people = PaginatedTable(load_people, {"name": "Name", "age": "Age"})
+
+        @app.route("/")
+        def homepage():
+            return Html(Body(people.table(class_="styled-table")))
+
+    Args:
+        source (PageSource | Sequence): The data source.
+        columns (Sequence[str] | Mapping[str, str]): The keys or attributes
+            to show, or a mapping of them to header labels.
+        key (str, optional): The field that orders the records, used as the
+            keyset cursor. Ignored for sequence sources. Defaults to "id".
+        page_size (int, optional): The number of rows per page. Defaults to
+            50.
+        formatters (Mapping[str, Callable] | None, optional): Keys or
+            attributes mapped to functions converting a value to text.
+            Defaults to None.
+        cache (bool | LRUCache, optional): Cache rendered pages by cursor.
+            Pass an LRUCache to control its size. Defaults to True.
+        loading (str, optional): The text shown while the next page loads.
+            Defaults to "Loading...".
+        app (Starlette | None, optional): The app to register the page route
+            with. Defaults to the current app.
+    """
+
+    def __init__(
+        self,
+        source: PageSource | typing.Sequence,
+        columns: typing.Sequence[str] | typing.Mapping[str, str],
+        *,
+        key: str = "id",
+        page_size: int = 50,
+        formatters: typing.Mapping[str, typing.Callable[[typing.Any], str]]
+        | None = None,
+        cache: bool | LRUCache = True,
+        loading: str = "Loading...",
+        app: Starlette | None = None,
+    ) -> None:
+        self.source = source
+        if not isinstance(columns, typing.Mapping):
+            columns = {name: name for name in columns}
+        self.columns = dict(columns)
+        self.key = key
+        self.page_size = page_size
+        self.formatters = formatters
+        self.loading = loading
+        if cache is True:
+            cache = LRUCache()
+        self.cache: LRUCache | None = cache if cache is not False else None
+
+        self.callback = RapidHTMLCallback(
+            self.page_endpoint, trigger="revealed", swap="outerHTML"
+        )
+        self.route = self.callback.register(app or get_app())
+
+    def table(self, header: bool = True, **attrs) -> Table:
+        """
+        Returns the table with its first page of rows. The first page is
+        loaded when the page is resolved, before it is rendered.
+
+        Args:
+            header (bool, optional): Add a header row with the column labels.
+                Defaults to True.
+            **attrs: Keyword arguments representing table attributes.
+
+        Returns:
+            Table: The table.
+        """
+        tags = []
+        if header:
+            tags.append(Thead(Tr(*(Th(label) for label in self.columns.values()))))
+        tags.append(Tbody(Await(self.get_page(None))))
+        return Table(*tags, **attrs)
+
+    async def page_endpoint(self, request: Request) -> Raw:
+        """
+        Serves the page of rows after the request's `after` cursor.
+
+        Args:
+            request (Request): The incoming request object.
+
+        Returns:
+            Raw: The rendered rows.
+        """
+        return await self.get_page(request.query_params.get("after"))
+
+    async def get_page(self, after: str | None) -> Raw:
+        """
+        Returns the rendered page of rows after a cursor, using the cache if
+        possible.
+
+        Args:
+            after (str | None): The cursor, or None for the first page.
+
+        Returns:
+            Raw: The rows of the page, followed by the placeholder
+            row loading the next page if there may be one.
+        """
+        if self.cache is not None:
+            page = self.cache.get(after)
+            if page is not None:
+                return page
+
+        records, cursor = await self.fetch(after)
+        page = Raw(self.render_rows(records, cursor))
+        if self.cache is not None:
+            self.cache.set(after, page)
+        return page
+
+    async def fetch(self, after: str | None) -> tuple[typing.Sequence, str | None]:
+        """
+        Fetches a page of records from the source.
+
+        Args:
+            after (str | None): The cursor, or None for the first page.
+
+        Raises:
+            HTTPException: 400 Bad Request, if the cursor of a sequence source
+                is not an offset.
+
+        Returns:
+            tuple[Sequence, str | None]: The records and the cursor of the
+            next page, or None if this is the last page.
+        """
+        if not callable(self.source):
+            if not after:
+                offset = 0
+            elif after.isascii() and after.isdigit():
+                offset = int(after)
+            else:
+                raise HTTPException(400, "Invalid cursor")
+            records = self.source[offset : offset + self.page_size]
+            next_offset = offset + len(records)
+            has_more = next_offset < len(self.source)
+            return records, str(next_offset) if has_more else None
+
+        if inspect.iscoroutinefunction(self.source):
+            records = self.source(after, self.page_size)
+        else:
+            records = await run_in_threadpool(self.source, after, self.page_size)
+        if inspect.isawaitable(records):
+            records = await records
+
+        if len(records) < self.page_size:
+            return records, None
+        last = records[-1]
+        getter = itemgetter if isinstance(last, typing.Mapping) else attrgetter
+        return records, str(getter(self.key)(last))
+
+    def render_rows(self, records: typing.Sequence, cursor: str | None) -> str:
+        """
+        Renders a page of records, followed by the placeholder row that
+        loads the next page.
+
+        Args:
+            records (Sequence): The records of the page.
+            cursor (str | None): The cursor of the next page, or None if this
+                is the last page.
+
+        Returns:
+            str: The rendered rows.
+        """
+        names = list(self.columns)
+        html = TableRows.from_records(records, names, self.formatters).render()
+
+        if cursor is not None:
+            placeholder = Tr(
+                Td(self.loading, colspan=str(len(names))),
+                hx_get=f"{self.route}?after={quote(cursor)}",
+                **self.callback.attrs,
+            )
+            html += placeholder.render()
+        return html
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import gzip
+import typing
+
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+try:
+    import brotli
+except ImportError:  # pragma: nocover
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: nocover
+    zstandard = None
+
+
+def _compress_gzip(data: bytes, level: int) -> bytes:
+    # A fixed mtime keeps the output deterministic, so identical pages
+    # produce identical compressed bytes
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def _compress_brotli(data: bytes, level: int) -> bytes:
+    return brotli.compress(data, quality=level, mode=brotli.MODE_TEXT)
+
+
+def _compress_zstd(data: bytes, level: int) -> bytes:
+    return zstandard.ZstdCompressor(level=level).compress(data)
+
+
+# Content-Encoding token -> compression function. Only encodings whose
+# libraries are importable are registered.
+COMPRESSORS: dict[str, Callable[[bytes, int], bytes]] = {"gzip": _compress_gzip}
+if brotli is not None:  # pragma: nocover
+    COMPRESSORS["br"] = _compress_brotli
+if zstandard is not None:  # pragma: nocover
+    COMPRESSORS["zstd"] = _compress_zstd
+
+DEFAULT_LEVELS = {"br": 5, "zstd": 3, "gzip": 6}
+
+
+def parse_accept_encoding(header: str) -> dict[str, float]:
+    """
+    Parses an Accept-Encoding header into a mapping of encoding to q-value.
+
+    Args:
+        header (str): The raw Accept-Encoding header value.
+
+    Returns:
+        dict[str, float]: The accepted encodings and their weights.
+    """
+    accepted = {}
+    for item in header.split(","):
+        encoding, _, params = item.partition(";")
+        encoding = encoding.strip().lower()
+        if not encoding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[encoding] = quality
+    return accepted
+
+
+def negotiate_encoding(
+    accept_encoding: str, encodings: typing.Iterable[str]
+) -> Optional[str]:
+    """
+    Picks the encoding to respond with, preferring the client's weights and
+    then the order of the given encodings.
+
+    Args:
+        accept_encoding (str): The request's Accept-Encoding header.
+        encodings (typing.Iterable[str]): The encodings that can be sent, in
+            order of server preference.
+
+    Returns:
+        Optional[str]: The chosen encoding or None if the response should
+        be sent uncompressed.
+    """
+    accepted = parse_accept_encoding(accept_encoding)
+    wildcard = accepted.get("*", 0.0)
+
+    best, best_quality = None, 0.0
+    for encoding in encodings:
+        quality = accepted.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+@dataclass(frozen=True)
+class CompressionPolicy:
+    """
+    Describes how rendered responses should be compressed.
+
+    Attributes:
+
+        minimum_size (int): Responses smaller than this many bytes are sent
+            uncompressed. Defaults to 500.
+
+        encodings (tuple[str, ...]): Content-Encodings in order of server
+            preference. Encodings whose libraries are not installed are
+            skipped. Defaults to ("br", "zstd", "gzip").
+
+        levels (dict[str, int]): Compression level per encoding.
+
+        threadpool_size (int): Bodies at least this many bytes are compressed
+            in a worker thread so the event loop is not blocked. Defaults to
+            256 KiB.
+    """
+
+    minimum_size: int = 500
+    encodings: tuple[str, ...] = ("br", "zstd", "gzip")
+    levels: dict[str, int] = field(default_factory=lambda: dict(DEFAULT_LEVELS))
+    threadpool_size: int = 256 * 1024
+
+    @property
+    def available_encodings(self) -> tuple[str, ...]:
+        """The preferred encodings that can be produced in this environment."""
+        return tuple(encoding for encoding in self.encodings if encoding in COMPRESSORS)
+
+    def select_encoding(self, accept_encoding: str) -> Optional[str]:
+        """
+        Picks the best encoding for a request.
+
+        Args:
+            accept_encoding (str): The request's Accept-Encoding header.
+
+        Returns:
+            Optional[str]: The chosen encoding or None if the response should
+            be sent uncompressed.
+        """
+        return negotiate_encoding(accept_encoding, self.available_encodings)
+
+    def compress(self, data: bytes, encoding: str) -> bytes:
+        """
+        Compresses data with the given encoding at the configured level.
+
+        Args:
+            data (bytes): The data to compress.
+            encoding (str): A Content-Encoding token from COMPRESSORS.
+
+        Returns:
+            bytes: The compressed data.
+        """
+        level = self.levels.get(encoding, DEFAULT_LEVELS[encoding])
+        return COMPRESSORS[encoding](data, level)
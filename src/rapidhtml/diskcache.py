@@ -0,0 +1,381 @@
+from __future__ import annotations
+
+import os
+import mmap
+import time
+import pickle
+import hashlib
+import tempfile
+import threading
+
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Hashable, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+from rapidhtml.compression import negotiate_encoding
+from rapidhtml.utils import content_hash
+
+# Headers that depend on the encoding being sent
+ENCODING_HEADERS = (b"content-encoding", b"content-length")
+
+
+def _open_map(path: str) -> mmap.mmap | bytes:
+    with open(path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _close_map(data: mmap.mmap | bytes) -> None:
+    if isinstance(data, mmap.mmap):
+        try:
+            data.close()
+        except BufferError:
+            # Still held by a response, closed once the last one is released
+            pass
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    # Readers in other processes see either no file or the whole file
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+class DiskCachedResponse(Response):
+    """
+    A rendered response read from a DiskCache. The body and its compressed
+    variants are memory mapped, and sent with the ASGI
+    `http.response.pathsend` extension where the server supports it, so the
+    operating system sends the file directly.
+
+    Args:
+        status_code (int): The response status code.
+        raw_headers (list[tuple[bytes, bytes]]): The response headers, apart
+            from the Content-Encoding and Content-Length.
+        path (str): The file of the body.
+        variants (dict[str, str]): Content-Encoding mapped to the file of the
+            body compressed with it.
+        maps (typing.Callable[[str], memoryview]): Returns a view of the
+            memory map of a file.
+    """
+
+    def __init__(
+        self,
+        status_code: int,
+        raw_headers: list[tuple[bytes, bytes]],
+        path: str,
+        variants: dict[str, str],
+        maps: Any,
+    ) -> None:
+        self.status_code = status_code
+        self.background = None
+        self.path = path
+        self.variants = variants
+        self.maps = maps
+        self.body = maps(path)
+        self.raw_headers = [
+            *raw_headers,
+            (b"content-length", str(len(self.body)).encode("latin-1")),
+        ]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        path, body = self.path, self.body
+        headers = MutableHeaders(raw=list(self.raw_headers))
+        encoding = negotiate_encoding(
+            Headers(scope=scope).get("accept-encoding", ""), self.variants
+        )
+        if encoding is not None:
+            path = self.variants[encoding]
+            body = self.maps(path)
+            headers["content-encoding"] = encoding
+            headers["content-length"] = str(len(body))
+
+        await send(
+            {
+                "type": "http.response.start",
+                "status": self.status_code,
+                "headers": headers.raw,
+            }
+        )
+        if scope.get("method") == "HEAD":
+            await send({"type": "http.response.body", "body": b""})
+        elif "http.response.pathsend" in (scope.get("extensions") or {}):
+            await send({"type": "http.response.pathsend", "path": path})
+        else:
+            await send({"type": "http.response.body", "body": memoryview(body)})
+
+
+class DiskCache:
+    """
+    A persistent cache of rendered responses, kept across restarts and
+    shared by every process using the same directory. It has the same
+    interface as LRUCache and can be passed as the `cache` of a route, so
+    pages rendered before a deploy are served straight away after it.
+
+    Each response body is stored once as an immutable file named by its
+    content hash, next to its compressed variants. Responses are compressed
+    with every available encoding before they are stored. Cached responses
+    are memory mapped rather than read into memory, see DiskCachedResponse.
+
+    Entries are evicted least recently used first once the stored files
+    take up more than `max_bytes`. Each memory map holds a file descriptor,
+    so only the `max_maps` most recently used files are kept mapped.
+
+    Args:
+        directory (str | Path): The directory to store the cache in.
+        max_bytes (int, optional): The maximum total size of the stored
+            files. Defaults to 1 GiB.
+        ttl (float | None, optional): Seconds after which an entry expires.
+            Defaults to None, entries never expire.
+        max_maps (int, optional): The maximum number of files kept memory
+            mapped. Defaults to 64.
+
+    Attributes:
+        hits (int): The number of lookups in this process that found a value.
+        misses (int): The number of lookups in this process that did not.
+        nbytes (int): The total size of the stored files.
+    """
+
+    shared = True
+
+    def __init__(
+        self,
+        directory: str | Path,
+        max_bytes: int = 1024 * 1024 * 1024,
+        ttl: Optional[float] = None,
+        max_maps: int = 64,
+    ) -> None:
+        self.directory = Path(directory)
+        self.keys_directory = self.directory / "keys"
+        self.objects_directory = self.directory / "objects"
+        self.keys_directory.mkdir(parents=True, exist_ok=True)
+        self.objects_directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.max_maps = max_maps
+        self.hits = 0
+        self.misses = 0
+        self.nbytes = 0
+        # Reentrant, as responses created under it read their maps
+        self._lock = threading.RLock()
+        # key digest -> entry, least recently used first
+        self._entries: OrderedDict[str, dict] = OrderedDict()
+        # content hash -> (number of entries using it, size of its files)
+        self._objects: dict[str, list[int]] = {}
+        # File -> memory map, least recently used first
+        self._maps: OrderedDict[str, mmap.mmap | bytes] = OrderedDict()
+        self._load()
+
+    def _load(self) -> None:
+        paths = sorted(self.keys_directory.iterdir(), key=os.path.getmtime)
+        for path in paths:
+            if path.name.startswith("."):
+                continue
+            entry = self._read_entry(path.name)
+            if entry is not None:
+                self._add_entry(path.name, entry)
+
+    @staticmethod
+    def _digest(key: Hashable) -> str:
+        return hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+
+    def _object_path(self, body_hash: str, encoding: Optional[str] = None) -> str:
+        name = body_hash if encoding is None else f"{body_hash}.{encoding}"
+        return os.path.join(self.objects_directory, body_hash[:2], name)
+
+    def _read_entry(self, digest: str) -> Optional[dict]:
+        try:
+            with open(self.keys_directory / digest, "rb") as file:
+                return pickle.load(file)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+    def _add_entry(self, digest: str, entry: dict) -> None:
+        self._entries[digest] = entry
+        body_hash = entry["hash"]
+        if body_hash in self._objects:
+            self._objects[body_hash][0] += 1
+        else:
+            self._objects[body_hash] = [1, entry["size"]]
+            self.nbytes += entry["size"]
+
+    def _remove_entry(self, digest: str) -> None:
+        entry = self._entries.pop(digest)
+        try:
+            os.unlink(self.keys_directory / digest)
+        except FileNotFoundError:
+            pass
+
+        body_hash = entry["hash"]
+        self._objects[body_hash][0] -= 1
+        if self._objects[body_hash][0] == 0:
+            _, size = self._objects.pop(body_hash)
+            self.nbytes -= size
+            for encoding in [None, *entry["encodings"]]:
+                path = self._object_path(body_hash, encoding)
+                data = self._maps.pop(path, None)
+                if data is not None:
+                    _close_map(data)
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+
+    def _get_map(self, path: str) -> memoryview:
+        with self._lock:
+            data = self._maps.get(path)
+            if data is None:
+                data = self._maps[path] = _open_map(path)
+                while len(self._maps) > self.max_maps:
+                    _close_map(self._maps.popitem(last=False)[1])
+            else:
+                self._maps.move_to_end(path)
+            # The view keeps the map open while a response holds it
+            return memoryview(data)
+
+    def _expired(self, entry: dict) -> bool:
+        return self.ttl is not None and entry["stored"] + self.ttl <= time.time()
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        digest = self._digest(key)
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                # Another process may have stored it
+                entry = self._read_entry(digest)
+                if entry is not None:
+                    self._add_entry(digest, entry)
+            if entry is None or self._expired(entry):
+                self.misses += 1
+                return default
+            self._entries.move_to_end(digest)
+            try:
+                # Keeps the order of use for the next process loading the cache
+                os.utime(self.keys_directory / digest)
+            except OSError:
+                pass
+
+            body_hash = entry["hash"]
+            try:
+                response = DiskCachedResponse(
+                    entry["status"],
+                    entry["headers"],
+                    self._object_path(body_hash),
+                    {
+                        encoding: self._object_path(body_hash, encoding)
+                        for encoding in entry["encodings"]
+                    },
+                    self._get_map,
+                )
+            except OSError:
+                # Evicted by another process
+                self._remove_entry(digest)
+                self.misses += 1
+                return default
+        self.hits += 1
+        return response
+
+    def set(self, key: Hashable, value: Response) -> None:
+        """
+        Stores a rendered response.
+
+        Args:
+            key (Hashable): The key to store the response under.
+            value (Response): The response. Its `variants`, if any, are
+                stored as its compressed bodies.
+
+        Raises:
+            TypeError: If the value is not a response with a body.
+        """
+        body = getattr(value, "body", None)
+        if not isinstance(body, (bytes, bytearray, memoryview, mmap.mmap)):
+            raise TypeError("DiskCache only stores responses with a body")
+        variants = getattr(value, "variants", None) or {}
+        size = len(body) + sum(len(variant) for variant in variants.values())
+        if size > self.max_bytes:
+            return
+
+        body_hash = content_hash(body)
+        entry = {
+            "status": value.status_code,
+            "headers": [
+                (name, header)
+                for name, header in value.raw_headers
+                if name not in ENCODING_HEADERS
+            ],
+            "hash": body_hash,
+            "encodings": list(variants),
+            "size": size,
+            "stored": time.time(),
+        }
+        digest = self._digest(key)
+        with self._lock:
+            if digest in self._entries:
+                self._remove_entry(digest)
+
+            object_path = Path(self._object_path(body_hash))
+            object_path.parent.mkdir(exist_ok=True)
+            if not object_path.exists():
+                for encoding, variant in variants.items():
+                    path = Path(self._object_path(body_hash, encoding))
+                    _write_atomic(path, variant)
+                # The body is written last, marking the object as complete
+                _write_atomic(object_path, bytes(body))
+            _write_atomic(
+                self.keys_directory / digest,
+                pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL),
+            )
+
+            self._add_entry(digest, entry)
+            while self.nbytes > self.max_bytes and len(self._entries) > 1:
+                self._remove_entry(next(iter(self._entries)))
+
+    def pop(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        value = self.get(key)
+        if value is None:
+            return default
+        with self._lock:
+            digest = self._digest(key)
+            if digest in self._entries:
+                self._remove_entry(digest)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            for digest in list(self._entries):
+                self._remove_entry(digest)
+
+    @property
+    def hit_rate(self) -> float:
+        """The fraction of lookups in this process that found a value."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """The cache's hit, miss and size counters."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "entries": len(self._entries),
+            "nbytes": self.nbytes,
+        }
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._entries.get(self._digest(key))
+            return entry is not None and not self._expired(entry)
+
+    def __len__(self) -> int:
+        return len(self._entries)
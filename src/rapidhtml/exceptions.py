@@ -1,2 +1,10 @@
 class CyclicalTagError(ValueError):
     pass
+
+
+class CSSParseError(ValueError):
+    pass
+
+
+class FrozenTagError(TypeError):
+    pass
@@ -0,0 +1,333 @@
+from __future__ import annotations
+
+import time
+import bisect
+import typing
+import logging
+
+from dataclasses import dataclass, field
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+logger = logging.getLogger("rapidhtml.metrics")
+
+# The phases of producing a rendered response, in order
+PHASES = ("endpoint", "resolve", "head", "render", "encode", "compress")
+
+# Histogram buckets, in seconds for phases
+DEFAULT_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+)
+NODE_BUCKETS = (10, 100, 1_000, 10_000, 100_000, 1_000_000)
+BYTE_BUCKETS = (1_024, 10_240, 102_400, 1_048_576, 10_485_760, 104_857_600)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def count_elements(html: str) -> int:
+    """
+    Counts the elements in rendered HTML by their opening tags. Text is
+    escaped when rendered, so every `<` that does not start a closing tag, a
+    comment or a doctype opens an element, apart from those in scripts and
+    Raw HTML.
+
+    Args:
+        html (str): The rendered HTML.
+
+    Returns:
+        int: The number of elements.
+    """
+    return html.count("<") - html.count("</") - html.count("<!")
+
+
+@dataclass
+class RenderSample:
+    """
+    The measurements of rendering one response, passed to the hooks of
+    RenderMetrics.
+
+    Attributes:
+
+        route (str): The path of the route, e.g. `/users/{id}`.
+
+        phases (dict[str, float]): Seconds spent in each phase the response
+            went through, see PHASES.
+
+        nodes (Optional[int]): The number of elements rendered, for HTML
+            responses.
+
+        size (Optional[int]): The size of the rendered body in bytes, for
+            HTML responses.
+    """
+
+    route: str
+    phases: dict[str, float] = field(default_factory=dict)
+    nodes: typing.Optional[int] = None
+    size: typing.Optional[int] = None
+
+
+class Histogram:
+    """
+    A cumulative histogram, as exported to Prometheus.
+
+    Args:
+        buckets (typing.Sequence[float]): The upper bounds of the buckets, in
+            increasing order. Values above the last one are only counted in
+            the `+Inf` bucket.
+    """
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: typing.Sequence[float]) -> None:
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative_counts(self) -> list[tuple[str, int]]:
+        """
+        Returns the number of values in each bucket and the buckets below it.
+
+        Returns:
+            list[tuple[str, int]]: The upper bound of each bucket, ending with
+            `+Inf`, and its count.
+        """
+        counts = []
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            counts.append((_format_number(bound), total))
+        counts.append(("+Inf", self.count))
+        return counts
+
+
+def _format_number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _get_histogram(
+    histograms: dict, key: typing.Hashable, buckets: typing.Sequence[float]
+) -> Histogram:
+    histogram = histograms.get(key)
+    if histogram is None:
+        histogram = histograms[key] = Histogram(buckets)
+    return histogram
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class RenderTimer:
+    """
+    Times the phases of rendering one response. Each mark records the time
+    since the previous one.
+
+    Args:
+        metrics (RenderMetrics): The metrics to record the sample in.
+        route (str): The path of the route.
+    """
+
+    enabled = True
+
+    def __init__(self, metrics: RenderMetrics, route: str) -> None:
+        self.metrics = metrics
+        self.sample = RenderSample(route)
+        self.last = time.perf_counter()
+
+    def mark(self, phase: str) -> None:
+        """
+        Records the end of a phase.
+
+        Args:
+            phase (str): The phase that ended.
+        """
+        now = time.perf_counter()
+        self.sample.phases[phase] = now - self.last
+        self.last = now
+
+    def finish(
+        self, nodes: typing.Optional[int] = None, size: typing.Optional[int] = None
+    ) -> None:
+        """
+        Records the sample.
+
+        Args:
+            nodes (typing.Optional[int], optional): The number of elements
+                rendered. Defaults to None.
+            size (typing.Optional[int], optional): The size of the body in
+                bytes. Defaults to None.
+        """
+        self.sample.nodes = nodes
+        self.sample.size = size
+        self.metrics.record(self.sample)
+
+
+class _NullTimer:
+    # Used by routes without metrics, so timing costs a no-op call per phase
+    enabled = False
+
+    def mark(self, phase: str) -> None:
+        pass
+
+    def finish(
+        self, nodes: typing.Optional[int] = None, size: typing.Optional[int] = None
+    ) -> None:
+        pass
+
+
+NULL_TIMER = _NullTimer()
+
+
+class RenderMetrics:
+    """
+    Records where the time goes while responses are rendered: per route
+    histograms of the seconds spent in each phase (the endpoint, resolving
+    async children, injecting the head, rendering, encoding and compressing)
+    and of the elements and bytes of each rendered page.
+
+    The histograms are exported in the Prometheus text format by
+    `render_prometheus()`, and served by `endpoint`. Each sample is also
+    passed to the hooks, e.g. to add the timings to a trace. Responses served
+    from a route's cache are not rendered, so they are not recorded.
+
+    Args:
+        buckets (typing.Sequence[float], optional): The buckets of the phase
+            histograms, in seconds. Defaults to DEFAULT_BUCKETS.
+        hooks (typing.Iterable[typing.Callable[[RenderSample], None]], optional):
+            Functions called with each sample. Defaults to ().
+    """
+
+    def __init__(
+        self,
+        buckets: typing.Sequence[float] = DEFAULT_BUCKETS,
+        hooks: typing.Iterable[typing.Callable[[RenderSample], None]] = (),
+    ) -> None:
+        self.buckets = tuple(buckets)
+        self.hooks = list(hooks)
+        # (route, phase) -> histogram
+        self.phases: dict[tuple[str, str], Histogram] = {}
+        # route -> histogram
+        self.nodes: dict[str, Histogram] = {}
+        self.sizes: dict[str, Histogram] = {}
+
+    def add_hook(self, hook: typing.Callable[[RenderSample], None]) -> None:
+        """
+        Adds a function to call with each sample.
+
+        Args:
+            hook (typing.Callable[[RenderSample], None]): The function.
+        """
+        self.hooks.append(hook)
+
+    def timer(self, route: str) -> RenderTimer:
+        """
+        Starts timing the rendering of a response.
+
+        Args:
+            route (str): The path of the route.
+
+        Returns:
+            RenderTimer: The timer, recording its sample when finished.
+        """
+        return RenderTimer(self, route)
+
+    def record(self, sample: RenderSample) -> None:
+        """
+        Adds a sample to the histograms and passes it to the hooks. Errors
+        raised by hooks are logged rather than failing the request.
+
+        Args:
+            sample (RenderSample): The sample.
+        """
+        for phase, seconds in sample.phases.items():
+            _get_histogram(self.phases, (sample.route, phase), self.buckets).observe(
+                seconds
+            )
+        if sample.nodes is not None:
+            _get_histogram(self.nodes, sample.route, NODE_BUCKETS).observe(sample.nodes)
+        if sample.size is not None:
+            _get_histogram(self.sizes, sample.route, BYTE_BUCKETS).observe(sample.size)
+
+        for hook in self.hooks:
+            try:
+                hook(sample)
+            except Exception:
+                logger.exception("Render metrics hook %r failed", hook)
+
+    def render_prometheus(self) -> str:
+        """
+        Exports the histograms in the Prometheus text exposition format.
+
+        Returns:
+            str: The metrics.
+        """
+        lines: list[str] = []
+        self._render_histograms(
+            lines,
+            "rapidhtml_render_phase_seconds",
+            "Seconds spent in each phase of rendering a response.",
+            {
+                (("route", route), ("phase", phase)): histogram
+                for (route, phase), histogram in sorted(
+                    self.phases.items(),
+                    key=lambda item: (item[0][0], PHASES.index(item[0][1])),
+                )
+            },
+        )
+        self._render_histograms(
+            lines,
+            "rapidhtml_render_nodes",
+            "Elements in each rendered page.",
+            {(("route", route),): self.nodes[route] for route in sorted(self.nodes)},
+        )
+        self._render_histograms(
+            lines,
+            "rapidhtml_render_bytes",
+            "Bytes in each rendered page, before compression.",
+            {(("route", route),): self.sizes[route] for route in sorted(self.sizes)},
+        )
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _render_histograms(
+        lines: list[str],
+        name: str,
+        description: str,
+        histograms: dict[tuple[tuple[str, str], ...], Histogram],
+    ) -> None:
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} histogram")
+        for labels, histogram in histograms.items():
+            label_text = ",".join(
+                f'{key}="{_escape_label(value)}"' for key, value in labels
+            )
+            for bound, count in histogram.cumulative_counts():
+                lines.append(f'{name}_bucket{{{label_text},le="{bound}"}} {count}')
+            lines.append(f"{name}_sum{{{label_text}}} {_format_number(histogram.sum)}")
+            lines.append(f"{name}_count{{{label_text}}} {histogram.count}")
+
+    async def endpoint(self, request: Request) -> Response:
+        """Serves the metrics to Prometheus."""
+        return Response(self.render_prometheus(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,444 @@
+from __future__ import annotations
+
+import os
+import sys
+import json
+import types
+import typing
+import asyncio
+import inspect
+import logging
+import importlib
+
+from pathlib import Path
+
+from starlette.applications import Starlette
+from starlette.routing import BaseRoute, Match, Route
+from starlette.websockets import WebSocket
+
+from rapidhtml.callbacks import CALLBACK_ROUTE_PREFIX
+
+try:
+    import watchfiles
+except ImportError:  # pragma: nocover
+    watchfiles = None
+
+logger = logging.getLogger("rapidhtml.reload")
+
+# Injected into pages when hot reloading. Tells the server which page it is
+# on, then swaps in updated pages and fragments, refreshes changed
+# stylesheets, and falls back to a full reload when the server restarts.
+JS_HOT_RELOAD_SCRIPT = """
+const sock = new WebSocket(`ws://${window.location.host}/live-reload`);
+sock.onopen = () => sock.send(window.location.pathname);
+sock.onmessage = (event) => {
+    const message = JSON.parse(event.data);
+    if (message.type === "page") {
+        htmx.ajax("GET", window.location.href, {target: "body", select: "body", swap: "outerHTML"});
+    } else if (message.type === "fragments") {
+        for (const path of message.paths) {
+            for (const elt of document.querySelectorAll(`[hx-get^="${path}"]`)) {
+                htmx.ajax("GET", elt.getAttribute("hx-get"), {source: elt});
+            }
+        }
+    } else if (message.type === "css") {
+        for (const link of document.querySelectorAll("link[rel=stylesheet]")) {
+            const url = new URL(link.href);
+            if (message.paths.some((path) => url.pathname.endsWith(path))) {
+                url.searchParams.set("v", Date.now());
+                link.href = url.href;
+            }
+        }
+    } else {
+        location.reload();
+    }
+};
+sock.onclose = () => {
+    console.log(`disconnected... reloading.`);
+    location.reload();
+};
+"""
+
+
+def route_key(route: BaseRoute) -> tuple:
+    """
+    Returns what identifies a route when swapping in reloaded routes: its
+    type, path and methods.
+
+    Args:
+        route (BaseRoute): The route.
+
+    Returns:
+        tuple: The key of the route.
+    """
+    return (
+        type(route).__name__,
+        getattr(route, "path", None),
+        tuple(sorted(getattr(route, "methods", None) or ())),
+    )
+
+
+def _code_key(code: types.CodeType) -> tuple:
+    # Leaves out line numbers, so moving a function does not change it
+    return (
+        code.co_code,
+        code.co_names,
+        code.co_varnames,
+        code.co_freevars,
+        tuple(
+            _code_key(const) if isinstance(const, types.CodeType) else const
+            for const in code.co_consts
+        ),
+    )
+
+
+def _endpoint(route: BaseRoute) -> typing.Any:
+    endpoint = getattr(route, "endpoint_func", None) or getattr(route, "endpoint", None)
+    return inspect.unwrap(getattr(endpoint, "__func__", endpoint))
+
+
+def defined_in(route: BaseRoute, files: typing.Collection[Path]) -> bool:
+    """
+    Returns whether a route was added by one of the given Python files, i.e.
+    its endpoint function is defined in one of them. Callback routes are left
+    out, as pages that are not re-fetched still call them.
+
+    Args:
+        route (BaseRoute): The route.
+        files (typing.Collection[Path]): The resolved paths of the files.
+
+    Returns:
+        bool: Whether the route was added by one of the files.
+    """
+    if getattr(route, "path", "").startswith(CALLBACK_ROUTE_PREFIX):
+        return False
+    code = getattr(_endpoint(route), "__code__", None)
+    return code is not None and Path(code.co_filename).resolve() in files
+
+
+def same_endpoint(route: BaseRoute, other: BaseRoute) -> bool:
+    """
+    Returns whether two routes call the same code. A reloaded module defines
+    new functions and objects, so the endpoints are compared by their code
+    or state rather than by identity.
+
+    Args:
+        route (BaseRoute): A route.
+        other (BaseRoute): The other route.
+
+    Returns:
+        bool: Whether the endpoints have the same code.
+    """
+    first, second = _endpoint(route), _endpoint(other)
+    if hasattr(first, "__code__") and hasattr(second, "__code__"):
+        return _code_key(first.__code__) == _code_key(second.__code__)
+    # Endpoint objects, such as static assets, are compared by their state
+    return first is second or (
+        first is not None
+        and type(first) is type(second)
+        and getattr(first, "__dict__", None) is not None
+        and vars(first) == vars(second)
+    )
+
+
+def merge_routes(
+    routes: typing.Sequence[BaseRoute],
+    new_routes: typing.Sequence[BaseRoute],
+    files: typing.Collection[Path] = (),
+) -> list[BaseRoute]:
+    """
+    Replaces routes with the new routes of the same path and methods, keeping
+    their position. New routes for other paths are added at the end. Routes
+    added by the reloaded files that have no new route were deleted from
+    them, and are dropped.
+
+    Args:
+        routes (typing.Sequence[BaseRoute]): The current routes.
+        new_routes (typing.Sequence[BaseRoute]): The reloaded routes.
+        files (typing.Collection[Path], optional): The resolved paths of the
+            reloaded Python files. Defaults to none.
+
+    Returns:
+        list[BaseRoute]: The merged routes.
+    """
+    replacements = {route_key(route): route for route in new_routes}
+    merged = []
+    seen = set()
+    for route in [*routes, *new_routes]:
+        key = route_key(route)
+        if key in seen:
+            continue
+        if key not in replacements and defined_in(route, files):
+            continue
+        seen.add(key)
+        merged.append(replacements.get(key, route))
+    return merged
+
+
+class HotReloader:
+    """
+    Reloads changed modules in the running process and swaps their routes
+    into the app, without restarting the server.
+
+    Python files are re-imported along with the modules that import from
+    them. The routes they define, whether on the app or on a new app created
+    by re-running the module, replace the app's routes with the same path,
+    and the routes deleted from the module are removed.
+    Pages connected to the live-reload socket are then told to re-fetch the
+    page, or just the fragments, served by the routes whose endpoint's code
+    changed. When no endpoint changed, e.g. after editing a helper, the pages
+    are re-fetched. Changed stylesheets are refreshed in place, and changes to
+    other static files reload the page once the modules are reloaded. A
+    module that fails to import is logged and its old routes are kept.
+
+    Args:
+        app (Starlette): The app to reload the routes of.
+        paths (typing.Sequence[str | Path] | None, optional): The directories
+            to watch. Only modules in them are reloaded. Defaults to the
+            current directory.
+        static_directory (str | Path | None, optional): The directory of
+            static files, used to find the URL of changed stylesheets.
+            Defaults to None.
+    """
+
+    def __init__(
+        self,
+        app: Starlette,
+        paths: typing.Sequence[str | Path] | None = None,
+        static_directory: str | Path | None = None,
+    ) -> None:
+        self.app = app
+        self.paths = [Path(path).resolve() for path in paths or [os.getcwd()]]
+        self.static_directory = (
+            Path(static_directory).resolve() if static_directory is not None else None
+        )
+        # Connected pages -> the path of the page
+        self.connections: dict[WebSocket, str] = {}
+        self._task: asyncio.Task | None = None
+        self._stop: asyncio.Event | None = None
+
+    async def start(self) -> None:
+        """Starts watching for changes."""
+        if watchfiles is None:  # pragma: nocover
+            raise RuntimeError("Hot reloading requires the watchfiles package")
+        self._stop = asyncio.Event()
+        self._task = asyncio.ensure_future(self.watch())
+
+    async def stop(self) -> None:
+        """Stops watching for changes."""
+        if self._task is not None:
+            self._stop.set()
+            await self._task
+            self._task = None
+
+    async def watch(self) -> None:
+        async for changes in watchfiles.awatch(*self.paths, stop_event=self._stop):
+            await self.reload_files([Path(path) for _, path in changes])
+
+    def is_watched(self, path: Path) -> bool:
+        return any(path == root or root in path.parents for root in self.paths)
+
+    async def reload_files(self, paths: typing.Iterable[Path]) -> None:
+        """
+        Reloads changed files and notifies the connected pages.
+
+        Args:
+            paths (typing.Iterable[Path]): The changed files.
+        """
+        paths = [Path(path).resolve() for path in paths]
+        python_files = [path for path in paths if path.suffix == ".py"]
+        stylesheets = [path for path in paths if path.suffix == ".css"]
+        # Other static files, such as scripts and images, need a full reload
+        reload = any(
+            path.suffix not in (".py", ".css") and self.is_static(path)
+            for path in paths
+        )
+
+        routes: list[BaseRoute] = []
+        refresh = False
+        if python_files:
+            changed = self.reload_modules(python_files)
+            if changed is None and not reload:
+                return
+            routes = changed or []
+            # Only code the endpoints call changed, such as a helper
+            refresh = changed == []
+        css_paths = [self.css_path(path) for path in stylesheets]
+
+        for websocket, page in list(self.connections.items()):
+            try:
+                messages = self.get_messages(page, routes, css_paths, reload, refresh)
+                for message in messages:
+                    await websocket.send_text(json.dumps(message))
+            except Exception:
+                self.connections.pop(websocket, None)
+
+    def reload_modules(self, paths: typing.Sequence[Path]) -> list[BaseRoute] | None:
+        """
+        Re-imports the modules of changed files and the modules depending on
+        them, then swaps the routes they define into the app.
+
+        Args:
+            paths (typing.Sequence[Path]): The changed Python files.
+
+        Returns:
+            list[BaseRoute] | None: The routes that were added or whose
+            endpoint's code changed, or None if a module failed to import.
+        """
+        router = self.app.router
+        old_routes = list(router.routes)
+        new_routes: list[BaseRoute] = []
+        files: set[Path] = set()
+
+        try:
+            for module in self.find_modules(paths):
+                files.add(Path(module.__file__).resolve())
+                namespace = self.reload_module(module)
+                for value in list(vars(namespace).values()):
+                    if isinstance(value, type(self.app)) and value is not self.app:
+                        new_routes.extend(value.router.routes)
+        except Exception:
+            logger.exception("Failed to reload, keeping the previous routes")
+            router.routes = old_routes
+            return None
+
+        # Routes added to the running app while its modules were re-run
+        new_routes = router.routes[len(old_routes) :] + new_routes
+        merged = merge_routes(old_routes, new_routes, files)
+        # Swap the whole list at once, so requests never see a partial update
+        router.routes = merged
+        previous = {route_key(route): route for route in old_routes}
+        return [
+            route
+            for route in merged
+            if route not in old_routes
+            and (
+                route_key(route) not in previous
+                or not same_endpoint(previous[route_key(route)], route)
+            )
+        ]
+
+    def find_modules(self, paths: typing.Sequence[Path]) -> list[types.ModuleType]:
+        """
+        Finds the modules of changed files, followed by the watched modules
+        that import from them, in the order they should be reloaded.
+
+        Args:
+            paths (typing.Sequence[Path]): The changed Python files.
+
+        Returns:
+            list[types.ModuleType]: The modules to reload.
+        """
+        watched = {}
+        for module in list(sys.modules.values()):
+            file = getattr(module, "__file__", None)
+            if file is not None and self.is_watched(Path(file).resolve()):
+                watched[Path(file).resolve()] = module
+
+        modules = [watched[path] for path in paths if path in watched]
+        names = {module.__name__ for module in modules}
+        for module in modules:
+            for dependent in watched.values():
+                if dependent.__name__ not in names and self.imports_from(
+                    dependent, names
+                ):
+                    modules.append(dependent)
+                    names.add(dependent.__name__)
+        return modules
+
+    @staticmethod
+    def imports_from(module: types.ModuleType, names: set[str]) -> bool:
+        for value in list(vars(module).values()):
+            name = (
+                value.__name__
+                if isinstance(value, types.ModuleType)
+                else getattr(value, "__module__", None)
+            )
+            if name in names:
+                return True
+        return False
+
+    @staticmethod
+    def reload_module(module: types.ModuleType) -> types.ModuleType:
+        """
+        Re-runs a module. The script being run as `__main__` is run in a new
+        module, so its `if __name__ == "__main__"` block is skipped.
+
+        Args:
+            module (types.ModuleType): The module to reload.
+
+        Returns:
+            types.ModuleType: The reloaded module.
+        """
+        # Editors can save twice within the timestamp resolution of the
+        # bytecode cache, so always compile from the source
+        cached = getattr(module, "__cached__", None)
+        if cached is not None and os.path.exists(cached):
+            os.remove(cached)
+
+        if module.__name__ != "__main__":
+            return importlib.reload(module)
+
+        namespace = types.ModuleType("__rapidhtml_reload__")
+        namespace.__file__ = module.__file__
+        with open(module.__file__, "rb") as file:
+            code = compile(file.read(), module.__file__, "exec")
+        exec(code, vars(namespace))
+        return namespace
+
+    @staticmethod
+    def get_messages(
+        page: str,
+        routes: typing.Sequence[BaseRoute],
+        css_paths: typing.Sequence[str],
+        reload: bool = False,
+        refresh: bool = False,
+    ) -> list[dict]:
+        """
+        Returns the messages telling a page what to update: the whole page if
+        its route changed, otherwise the fragments loaded from the changed
+        routes, and the changed stylesheets.
+
+        Args:
+            page (str): The path of the page.
+            routes (typing.Sequence[BaseRoute]): The changed routes.
+            css_paths (typing.Sequence[str]): The URL paths of the changed
+                stylesheets.
+            reload (bool, optional): Reload the page, for changes that cannot
+                be applied in place. Defaults to False.
+            refresh (bool, optional): Re-fetch the page, for changes that
+                cannot be traced to its routes. Defaults to False.
+
+        Returns:
+            list[dict]: The messages.
+        """
+        if reload:
+            return [{"type": "reload"}]
+
+        messages = []
+        routes = [route for route in routes if isinstance(route, Route)]
+        scope = {"type": "http", "method": "GET", "path": page}
+        if refresh or any(
+            route.matches(scope)[0] == Match.FULL
+            # Fragments are found by the start of their URL, which is not
+            # known for routes with path parameters
+            or route.param_convertors
+            for route in routes
+        ):
+            messages.append({"type": "page"})
+        elif routes:
+            paths = [route.path for route in routes]
+            messages.append({"type": "fragments", "paths": paths})
+        if css_paths:
+            messages.append({"type": "css", "paths": list(css_paths)})
+        return messages
+
+    def is_static(self, path: Path) -> bool:
+        return (
+            self.static_directory is not None and self.static_directory in path.parents
+        )
+
+    def css_path(self, path: Path) -> str:
+        if self.is_static(path):
+            return "/" + path.relative_to(self.static_directory).as_posix()
+        return "/" + path.name
@@ -2,24 +2,108 @@ from __future__ import annotations
 
 import typing
 
-from starlette.responses import Response
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response, StreamingResponse
+from starlette.types import Receive, Scope, Send
 
-from rapidhtml.tags import BaseTag
+from rapidhtml.tags import BaseTag, Raw
+from rapidhtml.utils import content_hash
+from rapidhtml.compression import CompressionPolicy
+
+# Headers that must be repeated on a 304 Not Modified response
+NOT_MODIFIED_HEADERS = ("cache-control", "content-location", "etag", "expires", "vary")
+
+# Rendered chunks are buffered up to this many characters before being sent
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def make_etag(data: bytes) -> str:
+    """
+    Creates a weak ETag for some content. The ETag is weak because the same
+    content may be sent with different Content-Encodings.
+
+    Args:
+        data (bytes): The content to create the ETag for.
+
+    Returns:
+        str: The ETag header value.
+    """
+    return f'W/"{content_hash(data)}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Checks an If-None-Match header against an ETag using weak comparison.
+
+    Args:
+        if_none_match (str | None): The request's If-None-Match header.
+        etag (str): The current ETag of the resource.
+
+    Returns:
+        bool: True if the client's copy is still current.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque_tag = etag.removeprefix("W/")
+    return any(
+        tag.strip().removeprefix("W/") == opaque_tag for tag in if_none_match.split(",")
+    )
+
+
+class NotModifiedResponse(Response):
+    """
+    A 304 Not Modified response. Only the caching related headers of the full
+    response are sent.
+    """
+
+    def __init__(self, headers: Headers) -> None:
+        super().__init__(status_code=304)
+        self.raw_headers = [
+            (key, value)
+            for key, value in headers.raw
+            if key.decode("latin-1") in NOT_MODIFIED_HEADERS
+        ]
 
 
 class RapidHTMLResponse(Response):
     """
     RapidHTML Response. Renders the RapidHTML tags to HTML and sends the
     response to the client.
+
+    If a compression policy is given, the body is compressed with the best
+    encoding the client accepts. Compressed variants are stored on the
+    response alongside the raw bytes, so a response that is cached and sent
+    again does no compression work.
     """
 
     media_type = "text/html"
 
+    def __init__(
+        self,
+        content: typing.Any = None,
+        status_code: int = 200,
+        headers: typing.Mapping[str, str] | None = None,
+        media_type: str | None = None,
+        background: BackgroundTask | None = None,
+        compression: CompressionPolicy | None = None,
+    ) -> None:
+        super().__init__(content, status_code, headers, media_type, background)
+        self.compression = compression
+        self.variants: dict[str, bytes] = {}
+
+        if self._is_compressible:
+            self.headers.add_vary_header("Accept-Encoding")
+
     def render(self, content: typing.Any) -> bytes:
         """
         Override the render method to render the RapidHTML tags to HTML.
         First check if the content is an instance of BaseTag, if so, render the
-        content to HTML and encode it with the charset.
+        content to HTML and encode it with the charset. Raw HTML is sent as it
+        is, using its encoded bytes if it already has them.
 
         Args:
             content (typing.Any): The content to render.
@@ -29,4 +113,143 @@ class RapidHTMLResponse(Response):
         """
         if isinstance(content, BaseTag):
             return content.render().encode(self.charset)
-        return content
+        if isinstance(content, Raw):
+            return content.encode(self.charset)
+        return super().render(content)
+
+    @property
+    def _is_compressible(self) -> bool:
+        return (
+            self.compression is not None
+            and len(self.body) >= self.compression.minimum_size
+            and "content-encoding" not in self.headers
+        )
+
+    async def get_variant(self, encoding: str) -> bytes:
+        """
+        Returns the body compressed with the given encoding, compressing it
+        only the first time a variant is requested.
+
+        Args:
+            encoding (str): The Content-Encoding to compress the body with.
+
+        Returns:
+            bytes: The compressed body.
+        """
+        variant = self.variants.get(encoding)
+        if variant is None:
+            if len(self.body) >= self.compression.threadpool_size:
+                variant = await run_in_threadpool(
+                    self.compression.compress, self.body, encoding
+                )
+            else:
+                variant = self.compression.compress(self.body, encoding)
+            self.variants[encoding] = variant
+        return variant
+
+    async def precompress(self) -> None:
+        """
+        Compresses the body with every available encoding, so copies of the
+        response, such as those in a cache shared between processes, never
+        compress it again.
+        """
+        if self._is_compressible:
+            for encoding in self.compression.available_encodings:
+                await self.get_variant(encoding)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        encoding = None
+        if self._is_compressible:
+            request_headers = Headers(scope=scope)
+            encoding = self.compression.select_encoding(
+                request_headers.get("accept-encoding", "")
+            )
+
+        if encoding is None:
+            await super().__call__(scope, receive, send)
+            return
+
+        body = await self.get_variant(encoding)
+
+        # Build the headers per send so a cached response can be reused for
+        # clients that accept different encodings
+        headers = MutableHeaders(raw=list(self.raw_headers))
+        headers["content-encoding"] = encoding
+        headers["content-length"] = str(len(body))
+
+        await send(
+            {
+                "type": "http.response.start",
+                "status": self.status_code,
+                "headers": headers.raw,
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+        if self.background is not None:
+            await self.background()
+
+
+class RapidHTMLStreamingResponse(StreamingResponse):
+    """
+    RapidHTML Streaming Response. Renders the RapidHTML tags while the
+    response is being sent, consuming lazy children (such as generators of
+    table rows) one at a time, so the full page is never held in memory.
+
+    Rendering runs in a worker thread. Small chunks are buffered and sent
+    once at least `chunk_size` characters have been rendered.
+
+    Args:
+        content (BaseTag): The tag to render.
+        status_code (int, optional): The response status code. Defaults to 200.
+        headers (typing.Mapping[str, str] | None, optional): Additional
+            response headers. Defaults to None.
+        media_type (str | None, optional): The response media type. Defaults
+            to text/html.
+        background (BackgroundTask | None, optional): A task to run after the
+            response is sent. Defaults to None.
+        chunk_size (int, optional): The number of characters to buffer
+            before sending. Defaults to 64 KiB.
+        minify (bool, optional): Render minified HTML, see
+            `BaseTag.render_minified()`. Defaults to False.
+    """
+
+    media_type = "text/html"
+
+    def __init__(
+        self,
+        content: BaseTag,
+        status_code: int = 200,
+        headers: typing.Mapping[str, str] | None = None,
+        media_type: str | None = None,
+        background: BackgroundTask | None = None,
+        chunk_size: int = STREAM_CHUNK_SIZE,
+        minify: bool = False,
+    ) -> None:
+        self.chunk_size = chunk_size
+        self.minify = minify
+        super().__init__(
+            self.iter_chunks(content), status_code, headers, media_type, background
+        )
+
+    def iter_chunks(self, content: BaseTag) -> typing.Iterator[bytes]:
+        """
+        Renders the tag into encoded chunks of roughly `chunk_size`
+        characters.
+
+        Args:
+            content (BaseTag): The tag to render.
+
+        Yields:
+            bytes: The encoded chunks of the rendered tag.
+        """
+        buffer: list[str] = []
+        buffered = 0
+        for chunk in content.iter_render(minify=self.minify):
+            buffer.append(chunk)
+            buffered += len(chunk)
+            if buffered >= self.chunk_size:
+                yield "".join(buffer).encode(self.charset)
+                buffer, buffered = [], 0
+        if buffer:
+            yield "".join(buffer).encode(self.charset)
@@ -1,31 +1,191 @@
 from __future__ import annotations
 
 import typing
+import asyncio
 import inspect
 
+from starlette.datastructures import Headers, MutableHeaders
 from starlette.requests import Request
 from starlette.routing import Route, Router, WebSocketRoute
 from starlette.responses import JSONResponse, PlainTextResponse, Response
+from starlette.types import Receive, Scope, Send
 from starlette.websockets import WebSocket
 from starlette.endpoints import WebSocketEndpoint
 
-from rapidhtml.tags import BaseTag
-from rapidhtml.responses import RapidHTMLResponse
+from rapidhtml.tags import BaseTag, Raw
+from rapidhtml.cache import LRUCache
+from rapidhtml.compression import CompressionPolicy
+from rapidhtml.metrics import NULL_TIMER, RenderMetrics, count_elements
+from rapidhtml.responses import (
+    NotModifiedResponse,
+    RapidHTMLResponse,
+    RapidHTMLStreamingResponse,
+    etag_matches,
+    make_etag,
+)
+
+# Returns a version key for a request, e.g. a database revision
+VersionKeyFunc = typing.Callable[..., typing.Union[str, typing.Awaitable[str]]]
+
+
+async def call_with_request(func: typing.Callable, request: Request) -> typing.Any:
+    """
+    Calls a sync or async function, passing the request only if the function
+    accepts a `request` argument.
+
+    Args:
+        func (typing.Callable): The function to call.
+        request (Request): The incoming request object.
+
+    Returns:
+        typing.Any: The function's (awaited) result.
+    """
+    # I hate having to include `request` in every route, so let's give
+    # the option to not
+    if "request" in inspect.signature(func).parameters:
+        result = func(request=request)
+    else:
+        result = func()
+    if inspect.isawaitable(result):
+        result = await result
+    return result
 
 
 class RapidHTMLRoute(Route):
     """
     RapidHTML Route. Extends the Starlette Route to include an endpoint
     override that will render the response to HTML if the response is an
-    instance of BaseTag. If the response is a dict, it will be converted to a
-    JSONResponse. If the response is a string, it will be converted to a
-    PlainTextResponse.
+    instance of BaseTag. Raw HTML is sent as it is. If the response is a dict,
+    it will be converted to a JSONResponse. If the response is a string, it
+    will be converted to a PlainTextResponse.
+
+    Rendered responses can optionally be cached per URL and compressed. A
+    cached response keeps its compressed variants, so a cache hit does no
+    rendering or compression work.
+
+    If the server supports the ASGI early hints extension, a 103 Early Hints
+    response with the `early_hints` links is sent before the endpoint runs.
+
+    With `etag` enabled, responses carry an ETag and conditional requests
+    are answered with 304 Not Modified. The ETag is either a hash of the
+    rendered body or, if `etag` is a function, a hash of the version key it
+    returns, in which case the endpoint is not called at all for a match.
+
+    Awaitable children of returned tags are resolved concurrently before the
+    tags are rendered.
+
+    With `stream` enabled, tags are rendered while the response is sent, so
+    lazy children such as generators of rows are consumed one at a time.
+    Streamed responses are not cached, compressed or given a body ETag.
+
+    With `minify` enabled, tags are rendered to minified HTML. The number of
+    responses minified and the UTF-8 bytes saved are counted in
+    `minify_stats`.
+
+    With `metrics`, the time spent in each phase of rendering a response and
+    the size of each rendered page are recorded in the RenderMetrics.
     """
 
-    def __init__(self, *args, html_head: typing.Iterable = None, **kwargs) -> None:
+    def __init__(
+        self,
+        *args,
+        html_head: typing.Iterable = None,
+        cache: bool | LRUCache = False,
+        compression: CompressionPolicy | None = None,
+        etag: bool | VersionKeyFunc = False,
+        early_hints: typing.Sequence[str] = (),
+        stream: bool = False,
+        minify: bool = False,
+        metrics: RenderMetrics | None = None,
+        **kwargs,
+    ) -> None:
         self.endpoint_func = kwargs.pop("endpoint", None)
         super().__init__(*args, endpoint=self.endpoint_override, **kwargs)
         self.html_head = html_head
+        self.compression = compression
+        self.etag = etag
+        self.early_hints = [link.encode("latin-1") for link in early_hints]
+        self.stream = stream
+        self.minify = minify
+        self.metrics = metrics
+        self.minified_responses = 0
+        self.bytes_saved = 0
+        if cache is True:
+            cache = LRUCache()
+        self.cache: LRUCache | None = cache if cache is not False else None
+
+    @property
+    def minify_stats(self) -> dict[str, int]:
+        """The number of minified responses and the bytes saved by minifying."""
+        return {"responses": self.minified_responses, "bytes_saved": self.bytes_saved}
+
+    async def handle(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # Let the browser start fetching page assets while the endpoint runs.
+        # Only page navigations need them, HTMX requests swap fragments into
+        # a page that already has them.
+        if self.early_hints and "http.response.early_hint" in scope.get(
+            "extensions", {}
+        ):
+            headers = Headers(scope=scope)
+            if "text/html" in headers.get("accept", "") and (
+                "hx-request" not in headers
+            ):
+                await send(
+                    {"type": "http.response.early_hint", "links": self.early_hints}
+                )
+        await super().handle(scope, receive, send)
+
+    def get_cache_key(self, request: Request, version: str | None = None) -> str:
+        """
+        Returns the key a rendered response is cached under.
+
+        Args:
+            request (Request): The incoming request object.
+            version (str | None, optional): The version ETag of the request,
+                see `get_version()`. Defaults to None.
+
+        Returns:
+            str: The cache key for the request.
+        """
+        key = f"{request.url.path}?{request.url.query}"
+        if "hx-request" in request.headers:
+            key += "#hx"
+        if version is not None:
+            key += f"#{version}"
+        return key
+
+    async def get_version(self, request: Request) -> str | None:
+        """
+        Returns the version ETag a request's response is cached under, for
+        routes whose `etag` is a version key function. Requests for the
+        route's pages made other than through its endpoint, such as batched
+        requests and warm ups, pass it to `get_response()`.
+
+        Args:
+            request (Request): The incoming request object.
+
+        Returns:
+            str | None: The version ETag, or None if the route has no version
+            key function.
+        """
+        if callable(self.etag):
+            return await self.get_version_etag(request)
+        return None
+
+    async def get_version_etag(self, request: Request) -> str:
+        """
+        Returns the ETag for the version key supplied by the route's `etag`
+        function. HTMX requests get a different ETag than full page loads.
+
+        Args:
+            request (Request): The incoming request object.
+
+        Returns:
+            str: The ETag header value.
+        """
+        version = await call_with_request(self.etag, request)
+        is_htmx = request.headers.get("hx-request", "")
+        return make_etag(f"{version}|{is_htmx}".encode())
 
     async def endpoint_override(self, request: Request) -> Response:
         """
@@ -37,25 +197,136 @@ class RapidHTMLRoute(Route):
         Returns:
             Response: The modified response object.
         """
-        # I hate having to include `request` in every route, so let's give
-        # the option to not
-        if "request" in inspect.signature(self.endpoint_func).parameters:
-            response = await self.endpoint_func(request=request)
-        else:
-            response = await self.endpoint_func()
+        if not self.etag:
+            return await self.get_response(request)
+
+        # The version key is known up front, so a matching request skips the
+        # endpoint and rendering entirely
+        etag = await self.get_version(request)
+        if etag is not None and etag_matches(
+            request.headers.get("if-none-match"), etag
+        ):
+            headers = MutableHeaders({"etag": etag, "cache-control": "no-cache"})
+            headers.add_vary_header("HX-Request")
+            return NotModifiedResponse(headers)
+
+        response = await self.get_response(request, version=etag)
+
+        body = getattr(response, "body", None)
+        if response.status_code != 200 or body is None:
+            return response
+
+        # Cached responses keep the ETag from their first request
+        if "etag" not in response.headers:
+            response.headers["etag"] = etag or make_etag(body)
+            response.headers.setdefault("cache-control", "no-cache")
+            response.headers.add_vary_header("HX-Request")
+
+        if etag_matches(request.headers.get("if-none-match"), response.headers["etag"]):
+            return NotModifiedResponse(response.headers)
+        return response
+
+    async def cache_response(self, cache_key: str, response: Response) -> None:
+        """
+        Caches a rendered response. Responses put in a cache shared with
+        other processes are compressed first, as the variants compressed
+        later on would only be kept by the process that sent them.
+
+        Args:
+            cache_key (str): The key to cache the response under.
+            response (Response): The rendered response.
+        """
+        if getattr(self.cache, "shared", False):
+            await response.precompress()
+        self.cache.set(cache_key, response)
+
+    async def get_response(
+        self, request: Request, version: str | None = None
+    ) -> Response:
+        """
+        Calls the endpoint, or returns a cached response, and converts the
+        result into a Response.
+
+        Args:
+            request (Request): The incoming request object.
+            version (str | None, optional): The version ETag of the request,
+                added to the cache key. Defaults to None.
+
+        Returns:
+            Response: The response object.
+        """
+        if self.cache is not None:
+            cache_key = self.get_cache_key(request, version)
+            cached_response = self.cache.get(cache_key)
+            if cached_response is not None:
+                return cached_response
+
+        timer = NULL_TIMER if self.metrics is None else self.metrics.timer(self.path)
+        nodes = size = None
+        response = await call_with_request(self.endpoint_func, request)
+        timer.mark("endpoint")
 
         # Handle different response types
         if isinstance(response, BaseTag):
+            await response.resolve()
+            timer.mark("resolve")
+
+        if isinstance(response, BaseTag) and self.stream:
             response.add_head(*self.html_head)
-            response = RapidHTMLResponse(response)
+            timer.mark("head")
+            response = RapidHTMLStreamingResponse(response, minify=self.minify)
+        elif isinstance(response, (BaseTag, Raw)):
+            if isinstance(response, BaseTag):
+                response.add_head(*self.html_head)
+                timer.mark("head")
+                if self.minify:
+                    html, saved = response.render_minified()
+                    self.minified_responses += 1
+                    self.bytes_saved += saved
+                    response = Raw(html)
+                elif timer.enabled:
+                    # Render ahead of the response to time it apart from encoding
+                    response = Raw(response.render())
+                timer.mark("render")
+            content = response
+            response = RapidHTMLResponse(content, compression=self.compression)
+            timer.mark("encode")
+            if timer.enabled:
+                nodes = count_elements(content.html)
+                size = len(response.body)
+                await self.compress_for(request, response)
+                timer.mark("compress")
+            if self.cache is not None:
+                await self.cache_response(cache_key, response)
+        elif isinstance(response, Response):
+            # Nothing was rendered, e.g. by a static asset or the metrics
+            return response
         elif isinstance(response, dict):
             response = JSONResponse(response)
         elif isinstance(response, str):
             response = PlainTextResponse(response)
         elif response is None:
             response = Response()
+        timer.finish(nodes=nodes, size=size)
         return response
 
+    async def compress_for(self, request: Request, response: RapidHTMLResponse) -> None:
+        """
+        Compresses a response with the encoding it will be sent with, ahead
+        of sending it, so the compression can be timed.
+
+        Args:
+            request (Request): The incoming request object.
+            response (RapidHTMLResponse): The rendered response.
+        """
+        if not response._is_compressible:
+            return
+        encoding = response.compression.select_encoding(
+            request.headers.get("accept-encoding", "")
+        )
+        if encoding is not None:
+            await response.get_variant(encoding)
+
 
 class RapidHTMLRouter(Router):
     """
@@ -69,18 +340,43 @@ class RapidHTMLRouter(Router):
 
     Attributes:
         html_head (typing.Iterable): An iterable containing HTML head elements.
+        compression (CompressionPolicy | None): The default compression policy
+            for rendered responses.
+        etag (bool): Whether routes send ETags and answer conditional
+            requests by default.
+        early_hints (typing.Sequence[str]): Link header values sent as 103
+            Early Hints before each page is rendered.
+        minify (bool): Whether routes render minified HTML by default.
+        metrics (RenderMetrics | None): The metrics routes record their
+            rendering in.
 
     Methods:
         add_route: Add a route to the router.
+        minify_stats: The bytes saved by minifying, per route.
 
     Inherits:
         Router: The base router class.
 
     """
 
-    def __init__(self, *args, html_head: typing.Iterable = None, **kwargs) -> None:
+    def __init__(
+        self,
+        *args,
+        html_head: typing.Iterable = None,
+        compression: CompressionPolicy | None = None,
+        etag: bool = False,
+        early_hints: typing.Sequence[str] = (),
+        minify: bool = False,
+        metrics: RenderMetrics | None = None,
+        **kwargs,
+    ) -> None:
         super().__init__(*args, **kwargs)
         self.html_head = html_head
+        self.compression = compression
+        self.etag = etag
+        self.early_hints = early_hints
+        self.minify = minify
+        self.metrics = metrics
 
     def add_route(
         self,
@@ -89,6 +385,11 @@ class RapidHTMLRouter(Router):
         methods: list[str] | None = None,
         name: str | None = None,
         include_in_schema: bool = True,
+        cache: bool | LRUCache = False,
+        compression: CompressionPolicy | bool | None = None,
+        etag: bool | VersionKeyFunc | None = None,
+        stream: bool = False,
+        minify: bool | None = None,
     ) -> None:  # pragma: nocover
         """
         Add a route to the routing table.
@@ -102,10 +403,28 @@ class RapidHTMLRouter(Router):
             name (str | None, optional): The name of the route. Defaults to None.
             include_in_schema (bool, optional): Whether to include the route in the API schema.
                 Defaults to True.
+            cache (bool | LRUCache, optional): Cache rendered responses per URL.
+                Pass an LRUCache to control its size, or a SharedCache to
+                share it between worker processes. Defaults to False.
+            compression (CompressionPolicy | bool | None, optional): The
+                compression policy for this route. None uses the router's
+                default and False disables compression. Defaults to None.
+            etag (bool | VersionKeyFunc | None, optional): Send ETags and answer
+                conditional requests with 304 Not Modified. Pass a function
+                returning a version key to skip the endpoint on a match. None
+                uses the router's default. Defaults to None.
+            stream (bool, optional): Render tags while the response is sent,
+                consuming lazy children one at a time. Defaults to False.
+            minify (bool | None, optional): Render minified HTML. None uses
+                the router's default. Defaults to None.
 
         Returns:
             None: This method does not return anything.
         """
+        if compression is None or compression is True:
+            compression = self.compression or (
+                CompressionPolicy() if compression else None
+            )
         route = RapidHTMLRoute(
             path,
             html_head=self.html_head,
@@ -113,10 +432,31 @@ class RapidHTMLRouter(Router):
             methods=methods,
             name=name,
             include_in_schema=include_in_schema,
+            cache=cache,
+            compression=compression or None,
+            etag=self.etag if etag is None else etag,
+            early_hints=self.early_hints,
+            stream=stream,
+            minify=self.minify if minify is None else minify,
+            metrics=self.metrics,
         )
 
         self.routes.append(route)
 
+    def minify_stats(self) -> dict[str, dict[str, int]]:
+        """
+        Returns the number of minified responses and the bytes saved by
+        minifying them, for each route that minifies its responses.
+
+        Returns:
+            dict[str, dict[str, int]]: The stats of each route by path.
+        """
+        return {
+            route.path: route.minify_stats
+            for route in self.routes
+            if isinstance(route, RapidHTMLRoute) and route.minify
+        }
+
     def add_routes(
         self,
         routes: list[
@@ -181,7 +521,80 @@ class RapidHTMLWSEndpoint(WebSocketEndpoint):
     """
     RapidHTML WebSocket Endpoint. Extends the Starlette WebSocketEndpoint to
     include custom handling for WebSocket connections.
+
+    Fragments sent with `send_fragments()` within the same event loop tick,
+    e.g. by several tasks updating different parts of a page, are sent
+    together in one message. The HTMX WebSocket extension swaps each
+    top-level element of a message into the element with the same ID.
+
+    With `binary_fragments` enabled, fragments are sent as binary messages of
+    encoded HTML. Raw fragments keep their encoded bytes, so a Raw sent to
+    every connection is only encoded once. Pages need the `rapidhtml-ws`
+    HTMX extension to decode them, see `RapidHTML(ws_binary_fragments=True)`.
     """
 
     encoding: str = "text"
-    ...
+    binary_fragments: bool = False
+    _pending_fragments: list | None = None
+    _flushed: asyncio.Future | None = None
+
+    async def send_fragments(
+        self, websocket: WebSocket, *fragments: BaseTag | Raw | str
+    ) -> None:
+        """
+        Sends tags or Raw HTML to the client, together with any other
+        fragments sent to it in the same event loop tick. Every caller
+        returns once the message is sent, and raises if sending it failed.
+
+        Args:
+            websocket (WebSocket): The connection to send the fragments on.
+            *fragments (BaseTag | Raw | str): The fragments to send. Strings
+                are sent as they are.
+        """
+        payloads = [await self.encode_fragment(fragment) for fragment in fragments]
+        if self._pending_fragments is not None:
+            # A message is already being gathered for this tick
+            self._pending_fragments.extend(payloads)
+            # Shielded, so a cancelled caller does not cancel the others
+            await asyncio.shield(self._flushed)
+            return
+
+        self._pending_fragments = payloads
+        self._flushed = flushed = asyncio.get_running_loop().create_future()
+        try:
+            try:
+                await asyncio.sleep(0)
+            finally:
+                pending, self._pending_fragments = self._pending_fragments, None
+                self._flushed = None
+            if self.binary_fragments:
+                await websocket.send_bytes(b"".join(pending))
+            else:
+                await websocket.send_text("".join(pending))
+        except BaseException as error:
+            if isinstance(error, asyncio.CancelledError):
+                flushed.cancel()
+            else:
+                flushed.set_exception(error)
+                # Marks the error as retrieved, it is raised here anyway
+                flushed.exception()
+            raise
+        flushed.set_result(None)
+
+    async def encode_fragment(self, fragment: BaseTag | Raw | str) -> str | bytes:
+        """
+        Renders a fragment, encoding it if `binary_fragments` is enabled.
+
+        Args:
+            fragment (BaseTag | Raw | str): The fragment.
+
+        Returns:
+            str | bytes: The HTML of the fragment.
+        """
+        if isinstance(fragment, BaseTag):
+            await fragment.resolve()
+            fragment = fragment.render()
+        if not self.binary_fragments:
+            return str(fragment)
+        # Raw fragments cache their encoded bytes
+        return fragment.encode()
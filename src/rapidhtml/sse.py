@@ -0,0 +1,298 @@
+from __future__ import annotations
+
+import re
+import html
+import typing
+import asyncio
+import secrets
+
+from collections import deque
+from dataclasses import dataclass
+
+import anyio
+
+from starlette.requests import Request
+from starlette.responses import StreamingResponse
+from starlette.types import Send
+
+from rapidhtml.bases import Renderable
+from rapidhtml.cache import LRUCache
+from rapidhtml.routing import call_with_request
+from rapidhtml.tags import BaseTag
+
+# A comment line, ignored by EventSource, that keeps idle connections open
+PING = ": ping\n\n"
+
+# The line endings of the event stream format, other line breaks are data
+LINE_BREAK = re.compile(r"\r\n|\r|\n")
+
+EventSource = typing.Callable[..., typing.AsyncIterator[typing.Any]]
+
+
+@dataclass(frozen=True)
+class ServerSentEvent:
+    """
+    An event with a name, for content that should be swapped into the
+    elements listening for that event, e.g. `sse-swap="update"` with the HTMX
+    SSE extension. Anything else yielded by an SSE route is sent as a
+    `message` event.
+
+    Attributes:
+
+        data (Any): The tag, Raw HTML or text to send.
+
+        event (Optional[str]): The name of the event. Defaults to None, a
+            `message` event.
+    """
+
+    data: typing.Any
+    event: typing.Optional[str] = None
+
+
+def format_event(
+    data: str,
+    event: typing.Optional[str] = None,
+    id: typing.Optional[str] = None,
+    retry: typing.Optional[int] = None,
+) -> str:
+    """
+    Frames data as a server-sent event. Each line of the data is sent as its
+    own `data:` field, which EventSource joins back together.
+
+    Args:
+        data (str): The data of the event.
+        event (typing.Optional[str], optional): The name of the event.
+            Defaults to None.
+        id (typing.Optional[str], optional): The ID of the event, sent back by
+            the client as Last-Event-ID when it reconnects. Defaults to None.
+        retry (typing.Optional[int], optional): The reconnection delay, in
+            milliseconds. Defaults to None.
+
+    Returns:
+        str: The event, ending with a blank line.
+
+    Raises:
+        ValueError: If the name or ID of the event has a line break.
+    """
+    for field, value in (("event", event), ("id", id)):
+        if value is not None and LINE_BREAK.search(value):
+            raise ValueError(f"Event {field} cannot contain line breaks: {value!r}")
+
+    frame = ""
+    if event is not None:
+        frame += f"event: {event}\n"
+    if id is not None:
+        frame += f"id: {id}\n"
+    if retry is not None:
+        frame += f"retry: {retry}\n"
+    for line in LINE_BREAK.split(data):
+        frame += f"data: {line}\n"
+    return frame + "\n"
+
+
+class RapidHTMLEventStreamResponse(StreamingResponse):
+    """
+    Streams server-sent events. A ping comment is sent whenever no event has
+    been sent for `ping_interval` seconds, so proxies do not close the idle
+    connection and a client that went away is noticed. The events are closed
+    as soon as the client disconnects.
+
+    Args:
+        content (typing.AsyncIterator[str]): The framed events.
+        headers (typing.Mapping[str, str] | None, optional): Additional
+            response headers. Defaults to None.
+        ping_interval (float | None, optional): Seconds of silence after
+            which a ping is sent. Defaults to 15, None disables pings.
+    """
+
+    media_type = "text/event-stream"
+
+    def __init__(
+        self,
+        content: typing.AsyncIterator[str],
+        headers: typing.Mapping[str, str] | None = None,
+        ping_interval: float | None = 15.0,
+    ) -> None:
+        self.events = content
+        self.ping_interval = ping_interval
+        super().__init__(
+            self.iter_frames(),
+            headers={
+                "cache-control": "no-store",
+                # Stop nginx from buffering the events
+                "x-accel-buffering": "no",
+                **(headers or {}),
+            },
+        )
+
+    async def iter_frames(self) -> typing.AsyncIterator[str]:
+        """
+        Yields the events, with pings in between whenever the next event
+        takes longer than `ping_interval` seconds.
+
+        Yields:
+            str: The framed events and pings.
+        """
+        next_event: asyncio.Future | None = None
+        try:
+            while True:
+                if next_event is None:
+                    next_event = asyncio.ensure_future(self.events.__anext__())
+                # Waiting on the future rather than with a timeout keeps the
+                # events running through a ping
+                done, _ = await asyncio.wait({next_event}, timeout=self.ping_interval)
+                if not done:
+                    yield PING
+                    continue
+                event, next_event = next_event, None
+                try:
+                    frame = event.result()
+                except StopAsyncIteration:
+                    return
+                yield frame
+        finally:
+            with anyio.CancelScope(shield=True):
+                if next_event is not None:
+                    next_event.cancel()
+                    await asyncio.wait({next_event})
+                await self.events.aclose()
+
+    async def stream_response(self, send: Send) -> None:
+        try:
+            await super().stream_response(send)
+        finally:
+            # Starlette only cancels the stream when the client disconnects,
+            # close it so the events stop right away
+            with anyio.CancelScope(shield=True):
+                await self.body_iterator.aclose()
+
+
+class RapidHTMLSSEEndpoint:
+    """
+    Serves server-sent events from an async generator yielding tags, Raw
+    HTML, text or ServerSentEvents. Each item is rendered and sent as an event
+    that the HTMX SSE extension swaps into the page. The generator is called
+    for each connection, with the request if it accepts a `request` argument,
+    and is closed when the client disconnects.
+
+    Every event has an ID, and the last `replay_size` events of each stream
+    are kept. When a client reconnects with a Last-Event-ID header, the events
+    it missed are sent again before the generator is called, and the stream
+    continues with the same IDs. Streams are forgotten, least recently used
+    first, once there are more than `max_streams`.
+
+    Args:
+        func (EventSource): The async generator function.
+        ping_interval (float | None, optional): Seconds of silence after
+            which a ping is sent. Defaults to 15, None disables pings.
+        replay_size (int, optional): The number of events of each stream to
+            keep for resuming it. Defaults to 100.
+        max_streams (int, optional): The number of streams to keep events
+            for. Defaults to 1024.
+        retry (int | None, optional): The client's reconnection delay, in
+            milliseconds. Defaults to None, the browser's default.
+        minify (bool, optional): Render minified HTML. Defaults to False.
+    """
+
+    def __init__(
+        self,
+        func: EventSource,
+        ping_interval: float | None = 15.0,
+        replay_size: int = 100,
+        max_streams: int = 1024,
+        retry: int | None = None,
+        minify: bool = False,
+    ) -> None:
+        self.func = func
+        self.ping_interval = ping_interval
+        self.replay_size = replay_size
+        self.retry = retry
+        self.minify = minify
+        # Stream ID -> deque of (event number, framed event)
+        self.streams = LRUCache(maxsize=max_streams)
+
+    async def __call__(self, request: Request) -> RapidHTMLEventStreamResponse:
+        stream_id, replay, number = self.resume(request.headers.get("last-event-id"))
+        events = self.iter_events(request, stream_id, replay, number)
+        return RapidHTMLEventStreamResponse(events, ping_interval=self.ping_interval)
+
+    def resume(self, last_event_id: str | None) -> tuple[str, list[str], int]:
+        """
+        Finds the stream a client is reconnecting to and the events it
+        missed.
+
+        Args:
+            last_event_id (str | None): The request's Last-Event-ID header.
+
+        Returns:
+            tuple[str, list[str], int]: The stream ID, the events to replay
+            and the number of the stream's last event.
+        """
+        stream_id, _, number = (last_event_id or "").rpartition("-")
+        events = self.streams.get(stream_id) if stream_id else None
+        if events is None or not number.isdigit():
+            return secrets.token_hex(8), [], 0
+
+        last_number = int(number)
+        replay = [frame for number, frame in events if number > last_number]
+        return stream_id, replay, max(events[-1][0] if events else 0, last_number)
+
+    async def iter_events(
+        self, request: Request, stream_id: str, replay: list[str], number: int
+    ) -> typing.AsyncIterator[str]:
+        """
+        Yields the missed events and then renders and frames the events of
+        the generator, keeping the latest ones for resuming the stream.
+
+        Args:
+            request (Request): The incoming request object.
+            stream_id (str): The ID of the stream.
+            replay (list[str]): The framed events to send again.
+            number (int): The number of the stream's last event.
+
+        Yields:
+            str: The framed events.
+        """
+        events = self.streams.get(stream_id)
+        if events is None:
+            events = deque(maxlen=self.replay_size)
+            self.streams.set(stream_id, events)
+
+        if self.retry is not None:
+            yield f"retry: {self.retry}\n\n"
+        for frame in replay:
+            yield frame
+
+        source = await call_with_request(self.func, request)
+        try:
+            async for item in source:
+                event = None
+                if isinstance(item, ServerSentEvent):
+                    item, event = item.data, item.event
+
+                number += 1
+                frame = format_event(
+                    await self.render(item), event=event, id=f"{stream_id}-{number}"
+                )
+                events.append((number, frame))
+                yield frame
+        finally:
+            with anyio.CancelScope(shield=True):
+                await source.aclose()
+
+    async def render(self, item: typing.Any) -> str:
+        """
+        Renders an item yielded by the generator to HTML.
+
+        Args:
+            item (typing.Any): A tag, Raw HTML or text.
+
+        Returns:
+            str: The HTML of the item. Text is escaped.
+        """
+        if isinstance(item, BaseTag):
+            await item.resolve()
+            return item.render(minify=self.minify)
+        if isinstance(item, Renderable):
+            return item.render()
+        return html.escape(str(item))
@@ -0,0 +1,55 @@
+// HTMX extension sending the GET requests of elements using it together.
+// Requests made within `htmx.config.batchDelay` milliseconds (default 10) of
+// each other are posted to the batch endpoint in one request, which answers
+// with an out of band swap for every element.
+(function () {
+  const BATCH_PATH = "/_rapidhtml/batch";
+  const SWAP_STYLES = ["innerHTML", "afterbegin", "beforeend", "beforebegin", "afterend"];
+  const ELEMENT_ID = /^[A-Za-z_][\w-]*$/;
+
+  let queue = [];
+  let timer = null;
+  let counter = 0;
+
+  function flush() {
+    const batch = queue;
+    queue = [];
+    timer = null;
+    fetch(BATCH_PATH, {
+      method: "POST",
+      headers: { "Content-Type": "application/json", "HX-Request": "true" },
+      body: JSON.stringify(batch),
+    })
+      .then((response) => (response.ok ? response.text() : ""))
+      .then((html) => {
+        if (html) {
+          htmx.swap(document.body, html, { swapStyle: "none" });
+        }
+      });
+  }
+
+  htmx.defineExtension("rapidhtml-batch", {
+    onEvent: function (name, event) {
+      if (name !== "htmx:beforeRequest" || event.detail.requestConfig.verb !== "get") {
+        return true;
+      }
+      const target = event.detail.target;
+      const swap = (event.detail.elt.getAttribute("hx-swap") || htmx.config.defaultSwapStyle)
+        .split(" ")[0];
+      if (!SWAP_STYLES.includes(swap) || (target.id && !ELEMENT_ID.test(target.id))) {
+        // Send the request as usual
+        return true;
+      }
+      if (!target.id) {
+        target.id = `rapidhtml-batch-${++counter}`;
+      }
+
+      queue.push({ id: target.id, path: event.detail.pathInfo.finalRequestPath, swap: swap });
+      if (timer === null) {
+        timer = setTimeout(flush, htmx.config.batchDelay ?? 10);
+      }
+      // Cancel the element's own request
+      return false;
+    },
+  });
+})();
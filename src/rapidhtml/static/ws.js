@@ -0,0 +1,16 @@
+// HTMX extension decoding the binary fragments sent by RapidHTML WebSocket
+// endpoints with `binary_fragments` enabled. Use it alongside the WebSocket
+// extension, e.g. `hx-ext="ws, rapidhtml-ws"`.
+(function () {
+  const decoder = new TextDecoder();
+
+  htmx.defineExtension("rapidhtml-ws", {
+    init: function () {
+      // Binary messages arrive as ArrayBuffers, which can be decoded in place
+      htmx.config.wsBinaryType = "arraybuffer";
+    },
+    transformResponse: function (text) {
+      return text instanceof ArrayBuffer ? decoder.decode(text) : text;
+    },
+  });
+})();
@@ -0,0 +1,366 @@
+from __future__ import annotations
+
+import os
+import re
+import stat
+import mimetypes
+
+from pathlib import Path
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.requests import Request
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Receive, Scope, Send
+
+from rapidhtml.cache import LRUCache
+from rapidhtml.compression import CompressionPolicy, negotiate_encoding
+from rapidhtml.responses import etag_matches
+from rapidhtml.utils import content_hash
+
+# Media types that mimetypes gets wrong or does not know on some platforms
+MEDIA_TYPES = {
+    ".css": "text/css",
+    ".ico": "image/x-icon",
+    ".js": "text/javascript",
+    ".json": "application/json",
+    ".map": "application/json",
+    ".mjs": "text/javascript",
+    ".svg": "image/svg+xml",
+    ".wasm": "application/wasm",
+    ".webmanifest": "application/manifest+json",
+    ".webp": "image/webp",
+    ".woff": "font/woff",
+    ".woff2": "font/woff2",
+}
+
+# Leading bytes of common favicon formats, used when the extension is missing
+MAGIC_NUMBERS = (
+    (b"\x00\x00\x01\x00", "image/x-icon"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF8", "image/gif"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"<svg", "image/svg+xml"),
+    (b"<?xml", "image/svg+xml"),
+)
+
+# Media types worth compressing. Everything else (images, fonts, archives)
+# is already compressed.
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "image/svg+xml",
+    "image/x-icon",
+    "application/json",
+    "application/javascript",
+    "application/manifest+json",
+    "application/wasm",
+)
+
+# Precompressed sidecar file extension -> Content-Encoding
+SIDECARS = {".br": "br", ".zst": "zstd", ".gz": "gzip"}
+
+# File names containing a content hash, e.g. `app.3f2a9c1d.js`
+FINGERPRINT_PATTERN = re.compile(r"[.-][0-9a-f]{8,}\.[^/]+$")
+
+ONE_YEAR = 365 * 24 * 60 * 60
+
+
+def guess_media_type(path: str | Path, data: bytes | None = None) -> str:
+    """
+    Guesses the media type of a file from its extension, falling back to the
+    file's leading bytes.
+
+    Args:
+        path (str | Path): The path of the file.
+        data (bytes | None, optional): The file's content, used when the
+            extension is not recognised. Defaults to None.
+
+    Returns:
+        str: The media type of the file.
+    """
+    suffix = Path(path).suffix.lower()
+    if suffix in MEDIA_TYPES:
+        return MEDIA_TYPES[suffix]
+
+    media_type = mimetypes.guess_type(str(path))[0]
+    if media_type is not None:
+        return media_type
+
+    if data is not None:
+        head = data[:64].lstrip()
+        for magic, media_type in MAGIC_NUMBERS:
+            if head.startswith(magic):
+                return media_type
+    return "application/octet-stream"
+
+
+def is_compressible(media_type: str) -> bool:
+    return media_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class StaticFileResponse(FileResponse):
+    """
+    A FileResponse that hands the file to the server when it supports the
+    ASGI `http.response.pathsend` or `http.response.zerocopysend` extensions,
+    so the file is sent with sendfile rather than read into Python.
+    """
+
+    extensions: dict = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.extensions = scope.get("extensions") or {}
+        await super().__call__(scope, receive, send)
+
+    async def _handle_simple(self, send: Send, send_header_only: bool) -> None:
+        if not send_header_only and self._zero_copy_supported:
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": self.status_code,
+                    "headers": self.raw_headers,
+                }
+            )
+            await self._send_zero_copy(send)
+            return
+        await super()._handle_simple(send, send_header_only)
+
+    async def _handle_single_range(
+        self, send: Send, start: int, end: int, file_size: int, send_header_only: bool
+    ) -> None:
+        if send_header_only or "http.response.zerocopysend" not in self.extensions:
+            await super()._handle_single_range(
+                send, start, end, file_size, send_header_only
+            )
+            return
+
+        self.headers["content-range"] = f"bytes {start}-{end - 1}/{file_size}"
+        self.headers["content-length"] = str(end - start)
+        await send(
+            {"type": "http.response.start", "status": 206, "headers": self.raw_headers}
+        )
+        await self._send_zero_copy(send, offset=start, count=end - start)
+
+    @property
+    def _zero_copy_supported(self) -> bool:
+        return (
+            "http.response.pathsend" in self.extensions
+            or "http.response.zerocopysend" in self.extensions
+        )
+
+    async def _send_zero_copy(
+        self, send: Send, offset: int | None = None, count: int | None = None
+    ) -> None:
+        if offset is None and "http.response.pathsend" in self.extensions:
+            await send({"type": "http.response.pathsend", "path": os.fspath(self.path)})
+            return
+
+        with open(self.path, "rb") as file:
+            message = {"type": "http.response.zerocopysend", "file": file}
+            if offset is not None:
+                message["offset"] = offset
+                message["count"] = count
+            await send(message)
+
+
+class RapidHTMLStaticFiles(StaticFiles):
+    """
+    RapidHTML static files. Extends the Starlette StaticFiles to send strong,
+    content based ETags, long-lived Cache-Control headers and precompressed
+    `.br`/`.gz` sidecar files, and to use zero-copy sends where the server
+    supports them. Range requests are supported for every file.
+
+    Args:
+        *args: Variable length argument list passed to StaticFiles.
+        max_age (int, optional): The max-age of the Cache-Control header, in
+            seconds. Defaults to one day.
+        immutable_max_age (int, optional): The max-age used for fingerprinted
+            file names such as `app.3f2a9c1d.js`, which are also marked
+            immutable. Defaults to one year.
+        max_files (int, optional): The number of files whose ETag and
+            sidecars are kept, the least recently served are hashed again.
+            Defaults to 4096.
+        **kwargs: Arbitrary keyword arguments passed to StaticFiles.
+    """
+
+    def __init__(
+        self,
+        *args,
+        max_age: int = 24 * 60 * 60,
+        immutable_max_age: int = ONE_YEAR,
+        max_files: int = 4096,
+        **kwargs,
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.max_age = max_age
+        self.immutable_max_age = immutable_max_age
+        # (path, mtime, size) -> strong ETag and sidecars, filled in from a
+        # worker thread. Bounded, as every version of a changed file has its
+        # own entry.
+        self._file_infos = LRUCache(maxsize=max_files)
+
+    def lookup_path(self, path: str) -> tuple[str, os.stat_result | None]:
+        full_path, stat_result = super().lookup_path(path)
+        if stat_result is not None and stat.S_ISREG(stat_result.st_mode):
+            # lookup_path runs in a worker thread, so hash the file and find
+            # its sidecars here rather than on the event loop
+            self._file_info(full_path, stat_result)
+        return full_path, stat_result
+
+    def _file_info(
+        self, full_path: str, stat_result: os.stat_result
+    ) -> tuple[str, dict[str, tuple[str, os.stat_result]]]:
+        key = (full_path, stat_result.st_mtime_ns, stat_result.st_size)
+        info = self._file_infos.get(key)
+        if info is None:
+            etag = f'"{self._hash_file(full_path)}"'
+            sidecars = {}
+            for suffix, encoding in SIDECARS.items():
+                sidecar_path = full_path + suffix
+                if os.path.isfile(sidecar_path):
+                    sidecars[encoding] = (sidecar_path, os.stat(sidecar_path))
+            info = (etag, sidecars)
+            self._file_infos.set(key, info)
+        return info
+
+    @staticmethod
+    def _hash_file(full_path: str) -> str:
+        with open(full_path, "rb") as file:
+            return content_hash(file.read())
+
+    def get_cache_control(self, full_path: str) -> str:
+        """
+        Returns the Cache-Control header for a file.
+
+        Args:
+            full_path (str): The path of the file.
+
+        Returns:
+            str: The Cache-Control header value.
+        """
+        if FINGERPRINT_PATTERN.search(os.path.basename(full_path)):
+            return f"public, max-age={self.immutable_max_age}, immutable"
+        return f"public, max-age={self.max_age}"
+
+    def file_response(
+        self,
+        full_path: str,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        etag, sidecars = self._file_info(full_path, stat_result)
+        media_type = guess_media_type(full_path)
+
+        headers = {"cache-control": self.get_cache_control(full_path), "etag": etag}
+        path, path_stat = full_path, stat_result
+        if sidecars:
+            headers["vary"] = "Accept-Encoding"
+            encoding = negotiate_encoding(
+                request_headers.get("accept-encoding", ""), sidecars
+            )
+            if encoding is not None:
+                path, path_stat = sidecars[encoding]
+                headers["content-encoding"] = encoding
+                # Each encoding is a different representation, so it needs
+                # its own strong ETag
+                headers["etag"] = f'"{etag[1:-1]}-{encoding}"'
+
+        response = StaticFileResponse(
+            path,
+            status_code=status_code,
+            headers=headers,
+            media_type=media_type,
+            stat_result=path_stat,
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+class StaticAsset:
+    """
+    A single in-memory static asset, such as the favicon, served with a strong
+    ETag, Cache-Control header and precompressed variants. Instances are
+    endpoints and can be added directly as a route.
+
+    Args:
+        data (bytes): The content of the asset.
+        media_type (str): The media type of the asset.
+        cache_control (str, optional): The Cache-Control header to send.
+            Defaults to one day.
+        compression (CompressionPolicy | None, optional): The policy used to
+            precompress the asset. Defaults to a CompressionPolicy for
+            compressible media types.
+        variants (dict[str, bytes] | None, optional): Precompressed variants
+            keyed by Content-Encoding. If given, the asset is not compressed
+            at startup. Defaults to None.
+    """
+
+    def __init__(
+        self,
+        data: bytes,
+        media_type: str,
+        cache_control: str = "public, max-age=86400",
+        compression: CompressionPolicy | None = None,
+        variants: dict[str, bytes] | None = None,
+    ) -> None:
+        self.data = data
+        self.media_type = media_type
+        self.cache_control = cache_control
+        self.hash = content_hash(data)
+        self.etag = f'"{self.hash}"'
+
+        if compression is None and is_compressible(media_type):
+            compression = CompressionPolicy(minimum_size=0)
+        self.variants: dict[str, bytes] = variants or {}
+        if compression is not None and not self.variants:
+            for encoding in compression.available_encodings:
+                variant = compression.compress(data, encoding)
+                if len(variant) < len(data):
+                    self.variants[encoding] = variant
+
+    @classmethod
+    def from_path(cls, path: str | Path, **kwargs) -> "StaticAsset":
+        """
+        Loads an asset from a file, detecting its media type. Precompressed
+        `.br`, `.zst` and `.gz` sidecar files next to it are used as its
+        variants.
+
+        Args:
+            path (str | Path): The path of the file.
+            **kwargs: Keyword arguments passed to StaticAsset.
+
+        Returns:
+            StaticAsset: The loaded asset.
+        """
+        with open(path, "rb") as f:
+            data = f.read()
+        kwargs.setdefault("media_type", guess_media_type(path, data))
+
+        variants = {}
+        for suffix, encoding in SIDECARS.items():
+            sidecar_path = Path(f"{path}{suffix}")
+            if sidecar_path.is_file():
+                variants[encoding] = sidecar_path.read_bytes()
+        kwargs.setdefault("variants", variants)
+        return cls(data, **kwargs)
+
+    async def __call__(self, request: Request) -> Response:
+        headers = MutableHeaders(
+            {"cache-control": self.cache_control, "etag": self.etag}
+        )
+        body = self.data
+        if self.variants:
+            headers["vary"] = "Accept-Encoding"
+            encoding = negotiate_encoding(
+                request.headers.get("accept-encoding", ""), self.variants
+            )
+            if encoding is not None:
+                body = self.variants[encoding]
+                headers["content-encoding"] = encoding
+                headers["etag"] = f'"{self.hash}-{encoding}"'
+
+        if etag_matches(request.headers.get("if-none-match"), headers["etag"]):
+            return NotModifiedResponse(headers)
+        return Response(body, headers=dict(headers), media_type=self.media_type)
@@ -2,6 +2,7 @@ from __future__ import annotations
 from typing import Any, Generator, Union
 
 from rapidhtml.bases import Renderable
+from rapidhtml.style.parser import AT_RULES, parse_css
 
 
 class StyleSheet(Renderable):
@@ -30,20 +31,14 @@ class StyleSheet(Renderable):
             Args:
                 css (str | dict): The Style attribute data to parser or a dictionary containing style data.
 
+            Raises:
+                CSSParseError: Raised if the CSS string is malformed.
+
             Returns:
                 StyleSheet: The StyleSheet object.
         """
         if isinstance(css, str):
-            k_v = {}
-            for statement in css.split(";"):
-                if not statement:
-                    continue
-                assert statement.count(":") == 1, f"Invalid CSS string '{statement}'"
-
-                k, v = map(lambda x: x.strip(" :;\n"), statement.split(":"))
-                k_v[k] = v
-
-            return cls(**k_v)
+            return cls(**parse_css(css))
         elif isinstance(css, dict):
             return cls(**css)
 
@@ -55,7 +50,11 @@ class StyleSheet(Renderable):
         elif isinstance(other, dict):
             other_rules = other
 
-        return StyleSheet(**{**current_rules, **other_rules})
+        rules = {**current_rules, **other_rules}
+        # At-rules without a block, such as `@import`, are kept from both
+        if AT_RULES in current_rules and AT_RULES in other_rules:
+            rules[AT_RULES] = [*current_rules[AT_RULES], *other_rules[AT_RULES]]
+        return StyleSheet(**rules)
 
     def items(self) -> Generator[tuple[str, Any], None, None]:
         for name, value in self.rules.items():
@@ -101,12 +100,17 @@ class StyleSheet(Renderable):
         """
         subnodes = []
         stylenodes = []
+        statements = []
 
         current_nodes = _nodes or self.rules
 
         for name, value in current_nodes.items():
+            # At-rules without a block, such as `@import`, are kept verbatim
+            if name == AT_RULES and isinstance(value, (list, tuple)):
+                statements.extend(value)
+
             # If the sub node is a nested style, we need to render it
-            if isinstance(value, (dict, StyleSheet)):
+            elif isinstance(value, (dict, StyleSheet)):
                 subnodes.append((name, value))
 
             # Else, it's a string, and thus, a single style element
@@ -115,12 +119,20 @@ class StyleSheet(Renderable):
             else:
                 raise TypeError(f"Invalid node type {type(value)}")
 
-        if not subnodes and not _parent:
+        if not subnodes and not statements and not _parent:
             raise ValueError("Invalid CSS!")
 
         ret_css = ""
-        if stylenodes:
+        if statements and not _parent:
+            # They must come before any other rule, e.g. `@import`
+            for statement in statements:
+                ret_css += f"{statement};\n"
+            ret_css += "\n"
+        if stylenodes or (statements and _parent):
             ret_css += f"{_parent.strip()} {{\n"
+            if _parent:
+                for statement in statements:
+                    ret_css += f"{' ' * indent}{statement};\n"
             for name, value in stylenodes:
                 name = name.rstrip(" ;:")
                 if isinstance(value, str):
@@ -133,6 +145,18 @@ class StyleSheet(Renderable):
             ret_css += "}\n\n"
 
         for subnode in subnodes:
+            if subnode[0].startswith("@") and self._is_group_rule(subnode[1], _parent):
+                # Grouping at-rules (@media, @supports, ...) wrap their contents
+                # rather than being joined onto the parent selector
+                inner_css = self.render(
+                    _nodes=subnode[1], _parent=_parent, indent=indent
+                )
+                ret_css += f"{subnode[0]} {{\n"
+                for line in inner_css.rstrip("\n").splitlines():
+                    ret_css += f"{' ' * indent}{line}\n" if line else "\n"
+                ret_css += "}\n\n"
+                continue
+
             ret_css += self.render(
                 _nodes=subnode[1],
                 _parent=(_parent.strip() + " " + subnode[0]).strip(),
@@ -140,3 +164,10 @@ class StyleSheet(Renderable):
             )
 
         return ret_css
+
+    @staticmethod
+    def _is_group_rule(nodes: dict | "StyleSheet", parent: str) -> bool:
+        """Whether an at-rule contains nested rules or is nested in a selector."""
+        if parent:
+            return True
+        return any(isinstance(value, (dict, StyleSheet)) for _, value in nodes.items())
@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import re
+
+from functools import lru_cache
+from typing import Union
+
+from rapidhtml.exceptions import CSSParseError
+
+# Characters that may change the meaning of the surrounding text
+_SPECIAL_CHARS = re.compile(r"[{};:()\[\]\"'\\/]")
+
+# Block-less at-rules, such as `@import url(a.css)`, are kept in order as a
+# list of statements under this key of their block
+AT_RULES = "@"
+
+# A parsed block is stored as a tuple of (name, value) pairs so that it can be
+# safely shared out of the LRU cache. Values are either a declaration string or
+# another frozen block.
+FrozenBlock = tuple[tuple[str, Union[str, "FrozenBlock"]], ...]
+
+
+def parse_css(css: str) -> dict:
+    """
+    Parse a CSS string into the nested dictionary format used by StyleSheet.
+
+    Declarations map property names to values, rules map selectors (or
+    at-rule preludes such as ``@media (max-width: 600px)``) to nested
+    dictionaries. At-rules without a block, such as ``@import``, are listed
+    in order under the ``"@"`` key. Parsed results are cached by input string.
+
+    Example:
+
+    .. code-block:: python
+        parse_css("a { color: red; &:hover { color: blue } }")
+        {'a': {'color': 'red', '&:hover': {'color': 'blue'}}}
+
+        Args:
+            css (str): The CSS source to parse.
+
+        Raises:
+            CSSParseError: Raised if the CSS is malformed.
+
+        Returns:
+            dict: The parsed CSS rules.
+    """
+    return _thaw(_parse_css_cached(css))
+
+
+def clear_cache() -> None:
+    """Clears the cache of parsed CSS strings."""
+    _parse_css_cached.cache_clear()
+
+
+@lru_cache(maxsize=1024)
+def _parse_css_cached(css: str) -> FrozenBlock:
+    return _freeze(_CSSTokenizer(css).parse())
+
+
+class _Statements(tuple):
+    """The frozen list of a block's at-rules without a block."""
+
+
+def _freeze(block: dict) -> FrozenBlock:
+    return tuple(
+        (
+            name,
+            _freeze(value)
+            if isinstance(value, dict)
+            else _Statements(value)
+            if isinstance(value, list)
+            else value,
+        )
+        for name, value in block.items()
+    )
+
+
+def _thaw(block: FrozenBlock) -> dict:
+    return {
+        name: list(value)
+        if isinstance(value, _Statements)
+        else _thaw(value)
+        if isinstance(value, tuple)
+        else value
+        for name, value in block
+    }
+
+
+class _CSSTokenizer:
+    """
+    Single pass tokenizer over a CSS string. Tracks quoted strings, comments
+    and bracket depth so that structural characters (``{``, ``}``, ``;`` and
+    ``:``) are only acted on at the top level of a statement.
+    """
+
+    def __init__(self, css: str) -> None:
+        self.css = css
+        self.length = len(css)
+
+    def parse(self) -> dict:
+        root: dict = {}
+        stack: list[dict] = [root]
+        buffer: list[str] = []
+        # Offsets of top level colons within the current statement
+        colons: list[int] = []
+        buffered = 0
+        depth = 0
+        css = self.css
+        i = 0
+
+        while i < self.length:
+            match = _SPECIAL_CHARS.search(css, i)
+            if match is None:
+                buffer.append(css[i:])
+                break
+
+            # Everything up to the next special character is plain text
+            start = match.start()
+            if start > i:
+                buffer.append(css[i:start])
+                buffered += start - i
+            char = css[start]
+            i = start + 1
+
+            if char == "/":
+                if not css.startswith("*", i):
+                    buffer.append(char)
+                    buffered += 1
+                    continue
+                end = css.find("*/", i + 1)
+                if end == -1:
+                    raise CSSParseError("Unterminated comment in CSS")
+                i = end + 2
+                continue
+
+            if char in "\"'":
+                end = self._find_string_end(start)
+                buffer.append(css[start : end + 1])
+                buffered += end + 1 - start
+                i = end + 1
+                continue
+
+            if char == "\\":
+                buffer.append(css[start : start + 2])
+                buffered += len(buffer[-1])
+                i = start + 2
+                continue
+
+            if char in "([":
+                depth += 1
+            elif char in ")]":
+                depth -= 1
+                if depth < 0:
+                    raise CSSParseError(f"Unbalanced '{char}' in CSS")
+            elif depth == 0:
+                if char == "{":
+                    prelude = "".join(buffer).strip()
+                    if not prelude:
+                        raise CSSParseError("Missing selector before '{'")
+                    block = stack[-1].get(prelude)
+                    if not isinstance(block, dict):
+                        block = stack[-1][prelude] = {}
+                    stack.append(block)
+                    buffer, colons, buffered = [], [], 0
+                    continue
+                if char in ";}":
+                    self._add_statement(stack[-1], buffer, colons)
+                    buffer, colons, buffered = [], [], 0
+                    if char == "}":
+                        if len(stack) == 1:
+                            raise CSSParseError("Unbalanced '}' in CSS")
+                        stack.pop()
+                    continue
+                if char == ":":
+                    colons.append(buffered)
+
+            buffer.append(char)
+            buffered += 1
+
+        if depth:
+            raise CSSParseError("Unbalanced brackets in CSS")
+        if len(stack) > 1:
+            raise CSSParseError("Unclosed block in CSS")
+        self._add_statement(root, buffer, colons)
+        return root
+
+    def _find_string_end(self, start: int) -> int:
+        quote = self.css[start]
+        i = start + 1
+        while i < self.length:
+            char = self.css[i]
+            if char == "\\":
+                i += 2
+                continue
+            if char == quote:
+                return i
+            if char == "\n":
+                break
+            i += 1
+        raise CSSParseError("Unterminated string in CSS")
+
+    @staticmethod
+    def _add_statement(block: dict, buffer: list[str], colons: list[int]) -> None:
+        statement = "".join(buffer)
+        if not statement.strip():
+            return
+
+        stripped = statement.lstrip()
+        if stripped.startswith("@"):
+            # At-rule without a block, e.g. `@import url(foo.css)`
+            block.setdefault(AT_RULES, []).append(stripped.rstrip())
+            return
+
+        if not colons:
+            raise CSSParseError(f"Invalid CSS declaration '{statement.strip()}'")
+
+        name = statement[: colons[0]].strip()
+        value = statement[colons[0] + 1 :].strip()
+        # Custom properties may contain anything, but a second top level colon
+        # in a regular declaration means the statement is malformed
+        if len(colons) > 1 and not name.startswith("--"):
+            raise CSSParseError(f"Invalid CSS declaration '{statement.strip()}'")
+        if not name:
+            raise CSSParseError(f"Missing property name in '{statement.strip()}'")
+
+        block[name] = value
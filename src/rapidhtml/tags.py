@@ -1,10 +1,33 @@
 from __future__ import annotations
 
+import re
 import html
+import codecs
+import asyncio
 import inspect
+import functools
 
 from uuid import uuid4
-from typing import Literal, Optional, Callable, Type, TYPE_CHECKING, TypeVar
+from keyword import iskeyword
+from html.parser import HTMLParser
+from types import MappingProxyType
+from operator import attrgetter, itemgetter
+from typing import (
+    Any,
+    AsyncIterable,
+    Awaitable,
+    IO,
+    Iterable,
+    Iterator,
+    Literal,
+    Mapping,
+    Optional,
+    Sequence,
+    Callable,
+    Type,
+    TYPE_CHECKING,
+    TypeVar,
+)
 
 import rapidhtml.exceptions as custom_exceptions
 
@@ -18,6 +41,7 @@ if TYPE_CHECKING:
 
 
 T = TypeVar("T")
+TagT = TypeVar("TagT", bound="BaseTag")
 BOOLEAN_ATTRS = [
     "autofocus",
     "checked",
@@ -28,6 +52,369 @@ BOOLEAN_ATTRS = [
     "webkitdirectory",
 ]
 
+# Attribute values that are the default and left out of minified HTML, by
+# tag name. `hx-swap='innerHTML'` is kept, as leaving it out would make the
+# tag inherit the `hx-swap` of its ancestors.
+DEFAULT_ATTR_VALUES = {
+    "form": {"method": "get"},
+    "input": {"type": "text"},
+    "script": {"type": "text/javascript"},
+    "style": {"type": "text/css"},
+}
+
+# Whitespace is kept as it is inside these tags when minifying
+PRESERVE_WHITESPACE_TAGS = frozenset(("pre", "textarea", "script", "style"))
+
+# Text of only whitespace is never displayed inside these tags, so it is
+# dropped when minifying
+WHITESPACE_INSENSITIVE_TAGS = frozenset(
+    (
+        "colgroup", "dl", "head", "html", "ol", "optgroup", "select", "table",
+        "tbody", "tfoot", "thead", "tr", "ul",
+    )
+)  # fmt: skip
+
+# Attribute values that can be written without quotes
+UNQUOTED_ATTR_VALUE = re.compile(r"[^\s\"'=<>`]+")
+# HTML whitespace, a no-break space is text and must be kept
+WHITESPACE = re.compile(r"[ \t\n\f\r]+")
+
+# Frozen tags may contain children of these types, raw HTML and other
+# frozen tags
+FROZEN_CHILD_TYPES = (str, int, float)
+
+# Frozen tags, keyed by class, children and attributes. The oldest entries
+# are dropped once there are more than MAX_INTERNED_TAGS.
+MAX_INTERNED_TAGS = 4096
+_interned_tags: dict[tuple, "BaseTag"] = {}
+
+# Incremented whenever a tag whose HTML is cached changes, which discards
+# every cached render, see `BaseTag.clone()`
+_render_generation = 0
+
+
+def _discard_render_caches() -> None:
+    global _render_generation
+    _render_generation += 1
+
+
+class _TagList(list):
+    # The children of a tag. Changing them once the tag's HTML is cached
+    # discards the cached renders
+    __slots__ = ("_cached",)
+
+
+class _AttrDict(dict):
+    # The attributes of a tag, see _TagList
+    __slots__ = ("_cached",)
+
+
+def _discarding(cls: type, name: str) -> None:
+    method = getattr(cls.__base__, name)
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if getattr(self, "_cached", False):
+            _discard_render_caches()
+        return method(self, *args, **kwargs)
+
+    setattr(cls, name, wrapper)
+
+
+for _name in (
+    "append",
+    "extend",
+    "insert",
+    "remove",
+    "pop",
+    "clear",
+    "sort",
+    "reverse",
+    "__setitem__",
+    "__delitem__",
+    "__iadd__",
+    "__imul__",
+):
+    _discarding(_TagList, _name)
+for _name in (
+    "__setitem__",
+    "__delitem__",
+    "__ior__",
+    "clear",
+    "pop",
+    "popitem",
+    "setdefault",
+    "update",
+):
+    _discarding(_AttrDict, _name)
+
+# Children of these types are rendered as they are, even though some of them
+# are iterable
+EAGER_CHILD_TYPES = (str, bytes, bytearray, dict, Renderable)
+
+
+def wrap_child(tag: Any) -> Any:
+    """
+    Wraps a child that is not rendered as it is. Iterables that are not
+    strings, mappings or renderables, such as generators, become
+    LazyChildren. Awaitables and async iterables become Await children.
+
+    Args:
+        tag (Any): The child to wrap.
+
+    Returns:
+        Any: The wrapped child, or the child itself.
+    """
+    if isinstance(tag, EAGER_CHILD_TYPES):
+        return tag
+    # Checked first, as tasks and futures are iterable too
+    if inspect.isawaitable(tag) or hasattr(tag, "__aiter__"):
+        return Await(tag)
+    if hasattr(tag, "__iter__"):
+        return LazyChildren(tag)
+    return tag
+
+
+class Raw(Renderable):
+    """
+    Pre-rendered HTML, placed into the output as it is. Unlike text children,
+    raw content is never escaped, so only wrap HTML from a trusted source,
+    such as a cached fragment or the output of another template engine.
+
+    The content may be given already encoded, in which case it is decoded
+    only if it is placed inside a tag, and sent as it is when returned
+    directly from a route.
+
+    Example:
+
+    .. code-block:: python
+        Div(H1("Title"), Raw(markdown.markdown(text)))
+
+    Args:
+        content (str | bytes): The HTML, or the HTML encoded as bytes.
+        encoding (str, optional): The encoding of bytes content. Defaults to
+            "utf-8".
+
+    Raises:
+        TypeError: If the content is not a string or bytes.
+    """
+
+    __slots__ = ("_html", "_encoded", "encoding")
+
+    def __init__(self, content: str | bytes, encoding: str = "utf-8") -> None:
+        self._html: Optional[str] = None
+        self._encoded: Optional[bytes] = None
+        self.encoding = encoding
+        if isinstance(content, str):
+            self._html = content
+        elif isinstance(content, (bytes, bytearray, memoryview)):
+            self._encoded = bytes(content)
+        else:
+            raise TypeError(f"Raw content must be str or bytes, not {type(content)}")
+
+    @classmethod
+    def escape(cls, text: Any) -> "Raw":
+        """
+        Escapes text once, so it can be reused without escaping it again.
+
+        Args:
+            text (Any): The text to escape.
+
+        Returns:
+            Raw: The escaped text.
+        """
+        return cls(html.escape(str(text)))
+
+    @property
+    def html(self) -> str:
+        """The HTML as a string."""
+        if self._html is None:
+            self._html = self._encoded.decode(self.encoding)
+        return self._html
+
+    def encode(self, encoding: str = "utf-8") -> bytes:
+        """
+        Returns the encoded HTML. The first encoding is kept, so a fragment
+        sent many times is only encoded once.
+
+        Args:
+            encoding (str, optional): The encoding to use. Defaults to "utf-8".
+
+        Returns:
+            bytes: The encoded HTML.
+        """
+        if self._encoded is None:
+            self._encoded = self._html.encode(encoding)
+            self.encoding = encoding
+        elif encoding != self.encoding:
+            return self.html.encode(encoding)
+        return self._encoded
+
+    def render(self) -> str:
+        return self.html
+
+    def __html__(self) -> str:
+        return self.html
+
+    def __str__(self) -> str:
+        return self.html
+
+    def __len__(self) -> int:
+        # The size of the content as it is held, used to weigh cache entries
+        if self._html is not None:
+            return len(self._html)
+        return len(self._encoded)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Raw):
+            return NotImplemented
+        return self.html == other.html
+
+    def __hash__(self) -> int:
+        return hash(self.html)
+
+    def __repr__(self) -> str:
+        content = self._html if self._html is not None else self._encoded
+        return f"Raw({content!r})"
+
+
+class LazyChildren:
+    """
+    Wraps an iterable of child tags so that it is only consumed when the
+    parent tag is rendered. A one-shot iterator, such as a generator, can only
+    be rendered once.
+
+    Lazy children are opaque until they are rendered: `select()` and cycle
+    detection on `add_tag()` do not look inside them. A lazily produced tag
+    that contains one of its ancestors raises a CyclicalTagError when the
+    tree is rendered.
+
+    Args:
+        iterable (Iterable): The iterable producing the child tags.
+    """
+
+    def __init__(self, iterable: Iterable) -> None:
+        self.iterable = iterable
+        self.consumed = False
+
+    def __iter__(self) -> Iterator:
+        if isinstance(self.iterable, Iterator):
+            if self.consumed:
+                raise RuntimeError(
+                    "Lazy children from an iterator can only be rendered once"
+                )
+            self.consumed = True
+
+        for tag in self.iterable:
+            yield wrap_child(tag)
+
+    def __repr__(self) -> str:
+        return f"LazyChildren({self.iterable!r})"
+
+
+class Await:
+    """
+    An asynchronous child, resolved by `BaseTag.resolve()` before the tree is
+    rendered. Every pending Await in a tree is resolved concurrently, so a
+    page built from several slow data sources takes as long as the slowest
+    one rather than the sum of them.
+
+    Awaitables and async generators passed directly as children are wrapped
+    in an Await without a timeout. Wrap them explicitly to set one:
+
+    .. code-block:: python
+        Div(Await(fetch_orders(), timeout=0.5, placeholder=P("Unavailable")))
+
+    The placeholder only stands in for a source that times out. An exception
+    raised by the source propagates out of `resolve()`, cancelling the other
+    children being resolved, so catch it in the source to render a fallback.
+
+    Args:
+        source (Awaitable | AsyncIterable): The awaitable producing a child,
+            or an async iterable producing several children.
+        timeout (float | None, optional): Seconds to wait for the source
+            before rendering the placeholder instead. Defaults to None.
+        placeholder (Any, optional): The child rendered if the source times
+            out, but not if it fails. Defaults to an empty string.
+
+    Attributes:
+        children (list | None): The resolved children, or None if the source
+            has not been resolved yet.
+    """
+
+    def __init__(
+        self,
+        source: Awaitable | AsyncIterable,
+        timeout: Optional[float] = None,
+        placeholder: Any = "",
+    ) -> None:
+        self.source = source
+        self.timeout = timeout
+        self.placeholder = placeholder
+        self.children: Optional[list] = None
+
+    @property
+    def resolved(self) -> bool:
+        return self.children is not None
+
+    async def _consume(self) -> list:
+        if hasattr(self.source, "__aiter__"):
+            return [tag async for tag in self.source]
+        return [await self.source]
+
+    async def resolve(self) -> None:
+        """
+        Awaits the source, falling back to the placeholder on timeout, then
+        resolves any async children of the result.
+
+        Raises:
+            Exception: Any exception raised by the source.
+        """
+        if self.resolved:
+            return
+        try:
+            children = await asyncio.wait_for(self._consume(), self.timeout)
+        except asyncio.TimeoutError:
+            children = [self.placeholder]
+        self.children = [wrap_child(tag) for tag in children]
+        await resolve_children(self.children)
+
+    def __repr__(self) -> str:
+        return f"Await({self.source!r}, timeout={self.timeout!r})"
+
+
+async def resolve_children(tags: Iterable) -> None:
+    """
+    Resolves every pending Await within some children, including those
+    nested in child tags, concurrently. Lazy children are not consumed, so
+    awaitables they produce are not resolved.
+
+    Args:
+        tags (Iterable): The children to resolve.
+    """
+    pending: list[Await] = []
+    stack = [tags]
+    while stack:
+        for tag in stack.pop():
+            if isinstance(tag, BaseTag):
+                stack.append(tag.tags)
+            elif isinstance(tag, Await):
+                if tag.resolved:
+                    stack.append(tag.children)
+                else:
+                    pending.append(tag)
+
+    if pending:
+        tasks = [asyncio.ensure_future(tag.resolve()) for tag in pending]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            # Stop the other sources once one fails or the render is cancelled
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
 
 @dataclass_transform()
 class BaseDataclass:
@@ -68,7 +455,9 @@ class BaseTag(BaseDataclass, Renderable):
     Represents a base HTML tag.
 
     Args:
-        *tags: Variable length arguments representing child tags.
+        *tags: Variable length arguments representing child tags. Iterables
+            such as generators are consumed lazily when the tag is rendered.
+            Awaitables and async generators are resolved by `resolve()`.
         callback (Callable | RapidHTMLCallback): A callback function to be added to the tag.
         **attrs: Keyword arguments representing tag attributes.
 
@@ -80,8 +469,25 @@ class BaseTag(BaseDataclass, Renderable):
     Methods:
         add_head(head): Adds a head tag to the beginning of the list of child tags.
         render(): Renders the HTML representation of the tag and its child tags.
+        iter_render(): Renders the tag in chunks, consuming lazy children as
+            it goes.
+        resolve(): Resolves the asynchronous children of the tag concurrently.
+        render_async(): Resolves the asynchronous children, then renders.
     """
 
+    # The pre-rendered HTML of a frozen tag
+    _rendered = None
+
+    # Whether the tag is part of more than one tree, see `clone()`, and its
+    # cached HTML, valid while the render generation is unchanged
+    _shared = False
+    _render_cache = None
+    _cache_generation = -1
+
+    # The RapidHTMLCallback whose pre-rendered attributes are added to the
+    # opening tag
+    _callback = None
+
     # RapidHTML attributes
     callback: Optional[Callable] = None
 
@@ -184,8 +590,8 @@ class BaseTag(BaseDataclass, Renderable):
         **attrs,
     ):
         self.tag = self.__class__.__qualname__.lower().replace("htmltag", "")
-        self.tags = list(tags)
-        self.attrs = attrs
+        self.tags = _TagList(map(wrap_child, tags))
+        self.attrs = _AttrDict(attrs)
         self.callback = callback
         if callback:
             self.add_callback(callback)
@@ -196,16 +602,235 @@ class BaseTag(BaseDataclass, Renderable):
             )
 
         self.__closing_tag = f"</{self.tag}>" if not self.__self_closing else "/>"
-        self.__uuid: str = (
-            uuid4().hex
-        )  # A unique ID used to detect cyclical references of tags
+        # A unique ID used to detect cyclical references of tags, created
+        # the first time it is needed
+        self.__uuid: Optional[str] = None
 
     def __init_subclass__(cls, self_closing: bool = False, **kwargs) -> None:
         super().__init_subclass__(**kwargs)
         cls.__self_closing = self_closing
 
+    @classmethod
+    def frozen(cls: Type[TagT], *tags: Any, **attrs) -> TagT:
+        """
+        Returns an immutable, interned instance of the tag. Identical frozen
+        tags are the same object and are rendered only once, when they are
+        created, so repeated leaves such as `Br()`, empty `Td()`s or icon
+        `Span`s cost one allocation and a string copy however often they are
+        used.
+
+        Frozen tags can only contain text, numbers and other frozen tags, and
+        their attributes must be hashable. Because they cannot be changed,
+        they can never be part of a cycle and can be shared by any number of
+        parents. Removing a frozen tag from a parent, e.g. with
+        `select(pop=True)`, only removes that reference.
+
+        Example:
+
+        .. code-block:: python
+            icon = Span.frozen(class_="icon icon-check")
+            Table(Tbody(*(Tr(Td(name), Td(icon)) for name in names)))
+
+        Args:
+            *tags: Variable length arguments representing child tags.
+            **attrs: Keyword arguments representing tag attributes.
+
+        Raises:
+            TypeError: If a child or attribute cannot be frozen.
+
+        Returns:
+            BaseTag: The shared frozen tag.
+        """
+        # Types are part of the key as 1, 1.0 and True are equal but render
+        # differently
+        key = (
+            cls,
+            tags,
+            tuple(map(type, tags)),
+            tuple(attrs.items()),
+            tuple(map(type, attrs.values())),
+        )
+        try:
+            tag = _interned_tags.get(key)
+        except TypeError:
+            raise TypeError("Frozen tags can only have hashable attributes") from None
+
+        if tag is None:
+            for child in tags:
+                if not (
+                    isinstance(child, FROZEN_CHILD_TYPES)
+                    or type(child) is Raw
+                    or getattr(child, "is_frozen", False)
+                ):
+                    raise TypeError(
+                        "Frozen tags can only contain text, numbers, raw HTML "
+                        f"and frozen tags, not {type(child)}"
+                    )
+            if "callback" in attrs:
+                raise TypeError("Frozen tags cannot have a callback")
+
+            tag = cls(*tags, **attrs)
+            tag._freeze()
+            if len(_interned_tags) >= MAX_INTERNED_TAGS:
+                _interned_tags.pop(next(iter(_interned_tags)), None)
+            _interned_tags[key] = tag
+        return tag
+
+    def _freeze(self) -> None:
+        self._rendered = self.render()
+        self.tags = tuple(self.tags)
+        self.attrs = MappingProxyType(self.attrs)
+
+    @property
+    def is_frozen(self) -> bool:
+        """
+        Whether the tag is an immutable tag created by `frozen()`.
+
+        Returns:
+            bool: True if the tag is frozen.
+        """
+        return self._rendered is not None
+
+    def _check_not_frozen(self) -> None:
+        if self._rendered is not None:
+            raise custom_exceptions.FrozenTagError(
+                f"Frozen {self.tag_name} tags cannot be modified"
+            )
+
+    def clone(self: TagT) -> TagT:
+        """
+        Returns a copy of the tag that shares its child tags with the
+        original, so cloning costs the same however large the tree is.
+
+        The shared child tags are the same objects in both trees, so changing
+        one in place, through its methods or its `tags` and `attrs`, changes
+        both. Change the copy alone with `evolve()`, `replace()` or
+        `select(pop=True)`, which copy only the tags between the root and the
+        change. The HTML of shared tags is cached the first time they are
+        rendered, so a layout cloned for every request is mostly rendered
+        from cache. Changing a tag whose HTML is cached discards the cache.
+
+        Lazy children are shared too, so a generator is still only rendered
+        once across the original and its copies.
+
+        Example:
+
+        .. code-block:: python
+            LAYOUT = Html(Body(Nav(...), Main(id="content"), Footer(...)))
+
+            def page(content):
+                return LAYOUT.replace(Main, lambda main: main.evolve(content))
+
+        Returns:
+            BaseTag: The copy of the tag.
+        """
+        if self.is_frozen:
+            return self
+
+        new = object.__new__(type(self))
+        new.__dict__.update(self.__dict__)
+        new.tags = _TagList(self.tags)
+        new.attrs = _AttrDict(self.attrs)
+        new.__uuid = None
+        new._shared = False
+        new._render_cache = None
+
+        for tag in self.tags:
+            if isinstance(tag, BaseTag):
+                tag._shared = True
+        return new
+
+    def evolve(self: TagT, *tags: Any, **attrs) -> TagT:
+        """
+        Returns a copy of the tag with more child tags and attributes, leaving
+        the original unchanged. See `clone()`.
+
+        Args:
+            *tags: Child tags appended to the copy's children.
+            **attrs: Attributes added to the copy.
+
+        Returns:
+            BaseTag: The changed copy of the tag.
+        """
+        new = self.clone()
+        if new is self:
+            new = self._thaw()
+        new.add_tag(*tags)
+        new.attrs.update(attrs)
+        return new
+
+    def _thaw(self: TagT) -> TagT:
+        # A mutable copy of a frozen tag
+        new = object.__new__(type(self))
+        new.__dict__.update(self.__dict__)
+        new.tags = _TagList(self.tags)
+        new.attrs = _AttrDict(self.attrs)
+        new.__uuid = None
+        del new._rendered
+        new.__dict__.pop("_minified", None)
+        new._shared = False
+        new._render_cache = None
+        return new
+
+    def replace(
+        self: TagT,
+        select_tag: Type["BaseTag"] | str,
+        func: Callable[["BaseTag"], Any],
+        *,
+        first_match: bool = False,
+    ) -> TagT:
+        """
+        Returns a copy of the tag in which every descendant matching
+        `select_tag` is replaced with `func(tag)`. Only the tags between the
+        root and the replaced tags are copied, all other tags are shared
+        with the original. See `clone()`.
+
+        Args:
+            select_tag (Type[BaseTag] | str): The uninstantiated subclass of
+                BaseTag or the tag name to match against.
+            func (Callable[[BaseTag], Any]): Returns the replacement for a
+                matching tag, e.g. `lambda main: main.evolve(content)`.
+            first_match (bool, optional): If True, only the first match is
+                replaced. Defaults to False.
+
+        Returns:
+            BaseTag: The changed copy of the tag.
+        """
+        new, _ = self._replace(_get_tag_name(select_tag), func, first_match)
+        return self.clone() if new is self else new
+
+    def _replace(
+        self, name: str, func: Callable, first_match: bool
+    ) -> tuple["BaseTag", bool]:
+        new_tags = None
+        found = False
+        for i, tag in enumerate(self.tags):
+            if not isinstance(tag, BaseTag):
+                continue
+            if tag.tag_name == name:
+                replacement, found = func(tag), True
+            elif not tag.is_frozen:
+                replacement, found = tag._replace(name, func, first_match)
+            else:
+                continue
+
+            if replacement is not tag:
+                if new_tags is None:
+                    new_tags = list(self.tags)
+                new_tags[i] = replacement
+            if found and first_match:
+                break
+
+        if new_tags is None:
+            return self, found
+        new = self.clone()
+        new.tags = _TagList(new_tags)
+        return new, found
+
     @property
     def _uuid(self) -> str:
+        if self.__uuid is None:
+            self.__uuid = uuid4().hex
         return self.__uuid
 
     def _validate_cyclical_references(
@@ -227,18 +852,19 @@ class BaseTag(BaseDataclass, Renderable):
 
         parents = _parents or {}
 
-        if self.__uuid in parents:
+        if self._uuid in parents:
             raise custom_exceptions.CyclicalTagError(
                 f"Cyclical reference detected! {'->'.join(parents.values())}->{self.tag_name}"
             )
-        parents[self.__uuid] = self.tag_name
+        parents[self._uuid] = self.tag_name
 
         tag_iterator = new_tags or self.tags
 
         visited_uuids = []
 
         for tag in tag_iterator:
-            if isinstance(tag, BaseTag):
+            # Frozen tags only contain frozen tags, so cannot form a cycle
+            if isinstance(tag, BaseTag) and not tag.is_frozen:
                 if tag._uuid in visited_uuids:
                     continue
                 tag._validate_cyclical_references(_parents=parents.copy())
@@ -267,21 +893,27 @@ class BaseTag(BaseDataclass, Renderable):
 
     def add_callback(self, callback: Callable | RapidHTMLCallback):
         """
-        Adds a callback function to the tag.
+        Adds a callback function to the tag. The callback's route is added to
+        the app the first time the callback is used.
 
         Args:
-            callback (Callable): The callback function to be added.
-        """
-        method = "get"
-        if isinstance(callback, RapidHTMLCallback):
-            callback, method, attrs = callback.get_data()
-            self.attrs.update(attrs)
-
-        self.callback_route = f"/python-callbacks/{id(callback)}"
+            callback (Callable | RapidHTMLCallback): The callback function to
+                be added.
 
-        self.app.add_route(self.callback_route, callback, [method])
-
-        self.attrs[f"hx-{method}"] = self.callback_route
+        Raises:
+            FrozenTagError: If the tag is frozen.
+        """
+        self._check_not_frozen()
+        if not isinstance(callback, RapidHTMLCallback):
+            # Plain functions only add the route attribute
+            callback = RapidHTMLCallback(callback, swap=None)
+
+        # The attributes are rendered by the callback, so they are not added
+        # to `attrs`
+        self._callback = callback
+        self.callback_route = callback.register(self.app)
+        if self._render_cache is not None:
+            _discard_render_caches()
 
     def add_head(self, *head: "BaseTag"):
         """
@@ -289,11 +921,15 @@ class BaseTag(BaseDataclass, Renderable):
 
         Args:
             head: The head tag to be added.
+
+        Raises:
+            FrozenTagError: If the tag is frozen.
         """
         if head:
+            self._check_not_frozen()
             existing_head = self.pop("head", None)
             if existing_head:
-                new_head = existing_head.tags + list(head)
+                new_head = list(existing_head.tags) + list(head)
             else:
                 new_head = head
             self.tags.insert(0, Head(*new_head))
@@ -310,10 +946,12 @@ class BaseTag(BaseDataclass, Renderable):
 
         Raises:
             ValueError: If the current tag does not support nesting other tags within it.
+            FrozenTagError: If the tag is frozen.
 
         """
+        self._check_not_frozen()
         if self._validate_cyclical_references(*tag):
-            self.tags.extend(tag)
+            self.tags.extend(wrap_child(child) for child in tag)
 
     def add_attr(self, **attrs) -> None:
         """
@@ -325,20 +963,97 @@ class BaseTag(BaseDataclass, Renderable):
         Returns:
             None
 
+        Raises:
+            FrozenTagError: If the tag is frozen.
+
         """
+        self._check_not_frozen()
         self.attrs.update(attrs)
 
-    def render(self):
+    def render(self, minify: bool = False) -> str:
         """
         Renders the HTML representation of the tag and its child tags.
 
+        Args:
+            minify (bool, optional): Render the smallest equivalent HTML, see
+                `render_minified()`. Defaults to False.
+
         Returns:
             str: The HTML representation of the tag and its child tags.
         """
+        if minify:
+            return self.render_minified()[0]
+        if self._rendered is not None:
+            return self._rendered
+        out: list[str] = []
+        self._render_into(out, set())
+        return "".join(out)
+
+    def render_minified(self) -> tuple[str, int]:
+        """
+        Renders the smallest HTML equivalent to `render()`. Attribute values
+        are only quoted when needed, default values such as
+        `<input type='text'>` are left out, void tags are not closed, and runs
+        of whitespace in text are collapsed to a single space, except inside
+        `Pre`, `Textarea`, `Script` and `Style` tags. Whitespace between
+        table rows, list items and other tags that never display it is
+        dropped. Raw HTML and the output of custom `render()` methods are
+        kept as they are.
+
+        Returns:
+            tuple[str, int]: The minified HTML and the number of UTF-8 bytes
+            saved compared to `render()`.
+        """
+        out: list[str] = []
+        saved = self._render_minified_into(out, set(), False)
+        return "".join(out), saved
+
+    def iter_render(self, minify: bool = False) -> Iterator[str]:
+        """
+        Renders the HTML representation of the tag in chunks. Lazy children
+        are consumed one item at a time and each item is yielded as soon as it
+        is rendered, so a large lazy body never has to be held in memory.
+
+        Args:
+            minify (bool, optional): Render the smallest equivalent HTML, see
+                `render_minified()`. Defaults to False.
+
+        Yields:
+            str: Consecutive chunks of the HTML representation.
+        """
+        return self._iter_render(set(), minify, False)
+
+    async def resolve(self) -> "BaseTag":
+        """
+        Resolves the awaitable and async generator children of the tag and
+        its child tags. Independent children are resolved concurrently.
+
+        Returns:
+            BaseTag: The tag itself, ready to be rendered.
+        """
+        await resolve_children(self.tags)
+        return self
+
+    async def render_async(self) -> str:
+        """
+        Resolves the asynchronous children of the tag, then renders it.
+
+        Returns:
+            str: The HTML representation of the tag and its child tags.
+        """
+        await self.resolve()
+        return self.render()
+
+    def _render_opening_tag(self) -> str:
         ret_html = f"<{self.tag} "
+        callback = self._callback
+        # The callback's attributes replace the tag's own of the same name
+        overridden = callback.attr_names if callback is not None else ()
 
         for key, value in self.attrs.items():
             key = key.rstrip("_")
+            if overridden and key.replace("_", "-") in overridden:
+                continue
 
             # Handle boolean attributes
             if key in BOOLEAN_ATTRS:
@@ -353,25 +1068,282 @@ class BaseTag(BaseDataclass, Renderable):
             key = key.replace("_", "-")
             ret_html += f"{key}='{value}' "
 
+        if callback is not None:
+            ret_html += callback.html_attrs
+
         if not self.__self_closing:
             ret_html = ret_html.rstrip() + ">"  # Take out trailing spaces
+        return ret_html
 
-        # Recursively render child tags
-        for tag in self.tags:
-            if isinstance(tag, Renderable):
-                ret_html += tag.render()
-            elif hasattr(tag, "__str__"):
-                if isinstance(self, Script):
-                    ret_html += str(tag)
+    def _render_minified_opening_tag(self) -> str:
+        defaults = DEFAULT_ATTR_VALUES.get(self.tag, {})
+        parts = [f"<{self.tag}"]
+
+        attrs = self.attrs.items()
+        callback = self._callback
+        if callback is not None:
+            # The callback's attributes replace the tag's own of the same
+            # name and follow them, as in `render()`
+            attrs = [
+                *(
+                    (key, value)
+                    for key, value in attrs
+                    if key.rstrip("_").replace("_", "-") not in callback.attr_names
+                ),
+                *callback.attrs.items(),
+                (f"hx_{callback.method}", callback.route),
+            ]
+        for key, value in attrs:
+            key = key.rstrip("_")
+            if key in BOOLEAN_ATTRS:
+                parts.append(key)
+                continue
+            if value in (None, True, False):
+                value = str(value).lower()
+            key = key.replace("_", "-")
+            value = str(value)
+
+            if defaults.get(key) == value:
+                continue
+            if not value:
+                # An empty value is the same as no value
+                parts.append(key)
+            elif UNQUOTED_ATTR_VALUE.fullmatch(value):
+                parts.append(f"{key}={value}")
+            else:
+                parts.append(f"{key}='{value}'")
+        return " ".join(parts) + ">"
+
+    def _render_minified_into(
+        self, out: list[str], parents: set[int], preserve: bool
+    ) -> int:
+        # Returns the number of UTF-8 bytes saved compared to `render()`. The
+        # opening tags only differ by ASCII characters, so their lengths are
+        # compared directly
+        if preserve or self._rendered is None:
+            return self._render_minified_tag_into(out, parents, preserve)
+
+        # Frozen tags cannot change, so their minified HTML is reused
+        minified = self.__dict__.get("_minified")
+        if minified is None:
+            tag_out: list[str] = []
+            saved = self._render_minified_tag_into(tag_out, parents, preserve)
+            minified = self._minified = ("".join(tag_out), saved)
+        out.append(minified[0])
+        return minified[1]
+
+    def _render_minified_tag_into(
+        self, out: list[str], parents: set[int], preserve: bool
+    ) -> int:
+        opening = self._render_minified_opening_tag()
+        out.append(opening)
+        saved = len(self._render_opening_tag()) - len(opening)
+        if self.__self_closing:
+            # Void tags have no closing "/>"
+            return saved + 2
+
+        if self.tags:
+            key = id(self)
+            parents.add(key)
+            saved += self._render_minified_children_into(
+                self.tags,
+                out,
+                parents,
+                preserve or self.tag in PRESERVE_WHITESPACE_TAGS,
+            )
+            parents.discard(key)
+        out.append(self.__closing_tag)
+        return saved
+
+    def _render_minified_children_into(
+        self, tags: Iterable, out: list[str], parents: set[int], preserve: bool
+    ) -> int:
+        drop_blank = self.tag in WHITESPACE_INSENSITIVE_TAGS
+        saved = 0
+        for tag in tags:
+            if isinstance(tag, BaseTag):
+                if id(tag) in parents:
+                    raise custom_exceptions.CyclicalTagError(
+                        f"Cyclical reference detected while rendering {tag.tag_name}"
+                    )
+                if type(tag).render is _base_render:
+                    saved += tag._render_minified_into(out, parents, preserve)
                 else:
-                    ret_html += html.escape(str(tag))
+                    out.append(tag.render())
+            elif isinstance(tag, LazyChildren):
+                saved += self._render_minified_children_into(
+                    tag, out, parents, preserve
+                )
+            elif isinstance(tag, Await):
+                if not tag.resolved:
+                    raise RuntimeError(
+                        "Async children must be resolved with `await tag.resolve()` "
+                        "before rendering"
+                    )
+                saved += self._render_minified_children_into(
+                    tag.children, out, parents, preserve
+                )
+            elif isinstance(tag, Renderable) or hasattr(tag, "__html__"):
+                out.append(self._render_text(tag))
             else:
-                raise TypeError(f"Unexpected tag type {type(tag)}. {tag}")
+                text = self._render_text(tag)
+                if not preserve:
+                    minified = WHITESPACE.sub(" ", text)
+                    if drop_blank and minified == " ":
+                        minified = ""
+                    # Only ASCII whitespace is collapsed, so characters and
+                    # bytes saved are the same
+                    saved += len(text) - len(minified)
+                    text = minified
+                out.append(text)
+        return saved
+
+    def _render_into(self, out: list[str], parents: set[int]) -> bool:
+        # Returns whether the output is static, i.e. the same every time the
+        # unchanged tree is rendered
+        if not self._shared:
+            return self._render_tag_into(out, parents)
+
+        # The HTML of shared tags is reused until a cached tag changes, as
+        # long as it does not depend on lazy, async or custom rendered children
+        if (
+            self._render_cache is not None
+            and self._cache_generation == _render_generation
+        ):
+            out.append(self._render_cache)
+            return True
+        generation = _render_generation
+        start = len(out)
+        static = self._render_tag_into(out, parents)
+        if static:
+            if type(self.tags) is not _TagList or type(self.attrs) is not _AttrDict:
+                # Changes to containers set by the user cannot be tracked
+                return False
+            self.tags._cached = self.attrs._cached = True
+            self._cache_generation = generation
+            self._render_cache = "".join(out[start:])
+            del out[start:]
+            out.append(self._render_cache)
+        return static
+
+    def _render_tag_into(self, out: list[str], parents: set[int]) -> bool:
+        out.append(self._render_opening_tag())
+        static = True
+        if self.tags:
+            # Track the ancestors being rendered, lazy children are only seen
+            # now so this is where cycles through them are caught
+            key = id(self)
+            parents.add(key)
+            static = self._render_children_into(self.tags, out, parents)
+            parents.discard(key)
+        out.append(self.__closing_tag)
+        return static
+
+    def _render_children_into(
+        self, tags: Iterable, out: list[str], parents: set[int]
+    ) -> bool:
+        escape = not isinstance(self, Script)
+        shared = self._shared
+        static = True
+        for tag in tags:
+            if type(tag) is str:
+                out.append(html.escape(tag) if escape else tag)
+            elif type(tag) is Raw:
+                out.append(tag.html)
+            elif isinstance(tag, BaseTag):
+                if tag._rendered is not None:
+                    out.append(tag._rendered)
+                    continue
+                if id(tag) in parents:
+                    raise custom_exceptions.CyclicalTagError(
+                        f"Cyclical reference detected while rendering {tag.tag_name}"
+                    )
+                if shared:
+                    # Children of a shared tag are shared as well
+                    tag._shared = True
+                if type(tag).render is _base_render:
+                    static = tag._render_into(out, parents) and static
+                else:
+                    out.append(tag.render())
+                    static = False
+            elif isinstance(tag, LazyChildren):
+                self._render_children_into(tag, out, parents)
+                static = False
+            elif isinstance(tag, Await):
+                if not tag.resolved:
+                    raise RuntimeError(
+                        "Async children must be resolved with `await tag.resolve()` "
+                        "before rendering"
+                    )
+                self._render_children_into(tag.children, out, parents)
+                static = False
+            else:
+                if isinstance(tag, Renderable):
+                    static = False
+                out.append(self._render_text(tag))
+        return static
+
+    def _render_text(self, tag: Any) -> str:
+        if isinstance(tag, Renderable):
+            return tag.render()
+        elif hasattr(tag, "__html__"):
+            # Markup from other libraries, such as markupsafe, is already safe
+            return tag.__html__()
+        elif hasattr(tag, "__str__"):
+            if isinstance(self, Script):
+                return str(tag)
+            return html.escape(str(tag))
+        raise TypeError(f"Unexpected tag type {type(tag)}. {tag}")
+
+    def _iter_render(
+        self, parents: set[int], minify: bool, preserve: bool
+    ) -> Iterator[str]:
+        if type(self).render is not _base_render:
+            yield self.render()
+            return
+        if minify:
+            preserve = preserve or self.tag in PRESERVE_WHITESPACE_TAGS
+            yield self._render_minified_opening_tag()
+            if self.__self_closing:
+                return
+        elif self._rendered is not None:
+            yield self._rendered
+            return
+        elif (
+            self._render_cache is not None
+            and self._cache_generation == _render_generation
+        ):
+            yield self._render_cache
+            return
+        else:
+            yield self._render_opening_tag()
 
-        # Close the tag
-        ret_html += self.__closing_tag
+        def render_children(tags: Iterable) -> str:
+            out: list[str] = []
+            if minify:
+                self._render_minified_children_into(tags, out, parents, preserve)
+            else:
+                self._render_children_into(tags, out, parents)
+            return "".join(out)
 
-        return ret_html
+        parents.add(id(self))
+        for tag in self.tags:
+            if isinstance(tag, LazyChildren):
+                # Each lazily produced child is rendered and yielded as a unit
+                for child in tag:
+                    yield render_children((child,))
+            elif isinstance(tag, BaseTag):
+                if id(tag) in parents:
+                    raise custom_exceptions.CyclicalTagError(
+                        f"Cyclical reference detected while rendering {tag.tag_name}"
+                    )
+                yield from tag._iter_render(parents, minify, preserve)
+            elif isinstance(tag, TableRows):
+                yield from tag.iter_render()
+            else:
+                yield render_children((tag,))
+        parents.discard(id(self))
+        yield self.__closing_tag
 
     def select(
         self,
@@ -383,6 +1355,10 @@ class BaseTag(BaseDataclass, Renderable):
     ) -> list["BaseTag"]:
         """
         Selects and returns a list of BaseTag objects that match the given tag name or BaseTag object.
+        Lazy children are not consumed, so tags inside them are never selected.
+        Frozen tags can be selected and popped from their parent, but tags are
+        never popped from inside a frozen tag. Popping from a tag shared with a
+        clone copies it first, see `clone()`.
 
         Args:
             tag (Type[BaseTag] or str): The uninstantiated subclass of BaseTag or the tag name to match against.
@@ -397,16 +1373,12 @@ class BaseTag(BaseDataclass, Renderable):
             KeyError: If no matching tags are found and pop is True.
             ValueError: If an instantiated object is passed as the tag parameter.
             TypeError: If the tag parameter is of an unexpected type.
+            FrozenTagError: If pop is True and the tag is frozen.
 
         """
-        if isinstance(select_tag, BaseTag):
-            raise ValueError("Cannot pass instantiated object to select method!")
-        elif inspect.isclass(select_tag) and issubclass(select_tag, BaseTag):
-            select_tag_name = select_tag.__name__.lower()
-        elif isinstance(select_tag, str):
-            select_tag_name = select_tag.lower()
-        else:
-            raise TypeError(f"Unexpected tag type {type(select_tag)}. {select_tag}")
+        if pop:
+            self._check_not_frozen()
+        select_tag_name = _get_tag_name(select_tag)
 
         ret_tags: list["BaseTag"] = []
         self_matches: list[tuple[int, "BaseTag"]] = []
@@ -418,7 +1390,11 @@ class BaseTag(BaseDataclass, Renderable):
                 self_matches.append((i, tag))
                 if first_match:
                     break
-            elif recurse and isinstance(tag, BaseTag):
+            elif recurse and not (pop and tag.is_frozen):
+                if pop and tag._shared:
+                    # Copy the shared tag, so the tags are only popped from
+                    # this tree
+                    tag = self.tags[i] = tag.clone()
                 sub_ret_tags = tag.select(
                     select_tag, recurse=recurse, pop=pop, first_match=first_match
                 )
@@ -466,6 +1442,19 @@ class BaseTag(BaseDataclass, Renderable):
             raise
 
 
+_base_render = BaseTag.render
+
+
+def _get_tag_name(select_tag: Type[BaseTag] | str) -> str:
+    if isinstance(select_tag, BaseTag):
+        raise ValueError("Cannot pass instantiated object to select method!")
+    elif inspect.isclass(select_tag) and issubclass(select_tag, BaseTag):
+        return select_tag.__name__.lower()
+    elif isinstance(select_tag, str):
+        return select_tag.lower()
+    raise TypeError(f"Unexpected tag type {type(select_tag)}. {select_tag}")
+
+
 class HtmlTagA(BaseTag):
     download: str = None
     href: str = None
@@ -958,11 +1947,239 @@ class Summary(BaseTag): ...
 class Sup(BaseTag): ...
 
 
+def get_record_fields(record: Any) -> Iterable[str]:
+    """
+    Returns the keys of a mapping or the attribute names of an object.
+
+    Args:
+        record (Any): A mapping or an object.
+
+    Returns:
+        Iterable[str]: The record's field names.
+    """
+    return record if isinstance(record, Mapping) else vars(record)
+
+
+# Joins the cells of a column so that they can be escaped in one call
+_CELL_SEPARATOR = "\x00"
+
+
+class TableRows(Renderable):
+    """
+    Table rows rendered directly from columns of values, without creating a
+    tag per row or cell. Cells are converted to text by the column's
+    formatter (or `str`) and HTML escaped a column at a time.
+
+    Columns may be any sliceable sequence: lists, tuples, `array.array`s or
+    NumPy arrays. Numeric arrays are not escaped at all.
+
+    Args:
+        columns (Sequence[Sequence]): The columns of the table, all of the
+            same length.
+        formatters (Sequence[Callable | None] | None, optional): A function
+            per column converting a value to text. None uses `str`. The
+            text is escaped after formatting. Defaults to None.
+        batch_size (int, optional): The number of rows rendered at a time
+            by `iter_render()`. Defaults to 1000.
+
+    Raises:
+        ValueError: If the columns or formatters have different lengths.
+    """
+
+    def __init__(
+        self,
+        columns: Sequence[Sequence],
+        formatters: Optional[Sequence[Optional[Callable[[Any], str]]]] = None,
+        batch_size: int = 1000,
+    ) -> None:
+        self.columns = list(columns)
+        self.formatters = list(formatters or [None] * len(self.columns))
+        self.batch_size = batch_size
+
+        if len(self.formatters) != len(self.columns):
+            raise ValueError("Expected one formatter per column")
+        lengths = {len(column) for column in self.columns}
+        if len(lengths) > 1:
+            raise ValueError("Table columns must all be the same length")
+        self.length = lengths.pop() if lengths else 0
+        self.row_template = "<tr>" + "<td>{}</td>" * len(self.columns) + "</tr>"
+
+    @classmethod
+    def from_records(
+        cls,
+        records: Iterable,
+        names: Sequence[str],
+        formatters: Optional[Mapping[str, Callable[[Any], str]]] = None,
+        **kwargs,
+    ) -> "TableRows":
+        """
+        Splits records into columns of rows.
+
+        Args:
+            records (Iterable): The rows, either mappings or objects with the
+                columns as attributes.
+            names (Sequence[str]): The keys or attributes of each column.
+            formatters (Mapping[str, Callable] | None, optional): Keys or
+                attributes mapped to functions converting a value to text.
+                Defaults to None.
+            **kwargs: Keyword arguments passed to TableRows.
+
+        Returns:
+            TableRows: The rows.
+        """
+        records = list(records)
+        is_mapping = bool(records) and isinstance(records[0], Mapping)
+        getter = itemgetter if is_mapping else attrgetter
+        formatters = formatters or {}
+        return cls(
+            [list(map(getter(name), records)) for name in names],
+            [formatters.get(name) for name in names],
+            **kwargs,
+        )
+
+    def __len__(self) -> int:
+        return self.length
+
+    def render(self) -> str:
+        return "".join(self.iter_render())
+
+    def iter_render(self) -> Iterator[str]:
+        """
+        Renders the rows in batches of `batch_size` rows.
+
+        Yields:
+            str: The HTML of consecutive batches of rows.
+        """
+        if not self.columns:
+            return
+        for start in range(0, self.length, self.batch_size):
+            stop = start + self.batch_size
+            cells = [
+                self._render_cells(column[start:stop], formatter)
+                for column, formatter in zip(self.columns, self.formatters)
+            ]
+            yield "".join(map(self.row_template.format, *cells))
+
+    @staticmethod
+    def _render_cells(
+        values: Sequence, formatter: Optional[Callable[[Any], str]]
+    ) -> list[str]:
+        dtype = getattr(values, "dtype", None)
+        typecode = getattr(values, "typecode", None)
+        is_numeric = (dtype is not None and dtype.kind in "biuf") or (
+            typecode is not None and typecode != "u"
+        )
+        if hasattr(values, "tolist"):
+            # NumPy arrays and `array.array`s hold unboxed values
+            values = values.tolist()
+
+        texts = list(map(formatter or str, values))
+        if is_numeric and formatter is None:
+            return texts
+
+        joined = _CELL_SEPARATOR.join(texts)
+        if joined.count(_CELL_SEPARATOR) != len(texts) - 1:
+            # A cell contains the separator, escape cell by cell instead
+            return list(map(html.escape, texts))
+        return html.escape(joined).split(_CELL_SEPARATOR)
+
+
 class Table(BaseTag):
     background: str = None
     bgcolor: str = None
     border: str = None
 
+    @classmethod
+    def from_columns(
+        cls,
+        columns: Mapping[str, Sequence],
+        *,
+        formatters: Optional[Mapping[str, Callable[[Any], str]]] = None,
+        header: bool = True,
+        **attrs,
+    ) -> "Table":
+        """
+        Builds a table from columns of values. The rows are rendered straight
+        from the columns, so no tags are created per row or cell.
+
+        Example:
+
+        .. code-block:: python
+            Table.from_columns(
+                {"Name": ["Ada", "Alan"], "Born": [1815, 1912]},
+                formatters={"Born": "{:,}".format},
+                class_="styled-table",
+            )
+
+        Args:
+            columns (Mapping[str, Sequence]): The header label of each column
+                mapped to its values.
+            formatters (Mapping[str, Callable] | None, optional): Header
+                labels mapped to functions converting a value to text.
+                Defaults to None.
+            header (bool, optional): Add a header row with the column labels.
+                Defaults to True.
+            **attrs: Keyword arguments representing table attributes.
+
+        Returns:
+            Table: The table.
+        """
+        formatters = formatters or {}
+        rows = TableRows(
+            list(columns.values()), [formatters.get(label) for label in columns]
+        )
+        return cls._from_rows(rows, list(columns), header, attrs)
+
+    @classmethod
+    def from_records(
+        cls,
+        records: Iterable,
+        columns: Optional[Sequence[str] | Mapping[str, str]] = None,
+        *,
+        formatters: Optional[Mapping[str, Callable[[Any], str]]] = None,
+        header: bool = True,
+        **attrs,
+    ) -> "Table":
+        """
+        Builds a table from records, such as dicts or model instances, by
+        splitting them into columns and calling `from_columns()`.
+
+        Args:
+            records (Iterable): The rows of the table, either mappings or
+                objects with the columns as attributes.
+            columns (Sequence[str] | Mapping[str, str] | None, optional): The
+                keys or attributes to show, or a mapping of them to header
+                labels. Defaults to every key or attribute of the first
+                record.
+            formatters (Mapping[str, Callable] | None, optional): Keys or
+                attributes mapped to functions converting a value to text.
+                Defaults to None.
+            header (bool, optional): Add a header row with the column labels.
+                Defaults to True.
+            **attrs: Keyword arguments representing table attributes.
+
+        Returns:
+            Table: The table.
+        """
+        records = list(records)
+        if columns is None:
+            columns = list(get_record_fields(records[0])) if records else []
+        if not isinstance(columns, Mapping):
+            columns = {name: name for name in columns}
+
+        rows = TableRows.from_records(records, list(columns), formatters)
+        return cls._from_rows(rows, list(columns.values()), header, attrs)
+
+    @classmethod
+    def _from_rows(
+        cls, rows: TableRows, labels: Sequence[str], header: bool, attrs: dict
+    ) -> "Table":
+        tags = []
+        if header:
+            tags.append(Thead(Tr(*(Th(label) for label in labels))))
+        tags.append(Tbody(rows))
+        return cls(*tags, **attrs)
+
 
 class Tbody(BaseTag):
     bgcolor: str = None
@@ -1057,6 +2274,246 @@ class Video(BaseTag):
 class Wbr(BaseTag, self_closing=True): ...
 
 
+class Element(BaseTag):
+    """
+    A tag without a class of its own, such as a custom element or an SVG
+    element. Created by `parse_html()` for elements it does not know.
+
+    Args:
+        tag_name (str): The name of the tag.
+        *tags: Variable length arguments representing child tags.
+        **attrs: Keyword arguments representing tag attributes.
+    """
+
+    def __init__(self, tag_name: str, *tags: Any, **attrs) -> None:
+        super().__init__(*tags, **attrs)
+        self.tag = tag_name.lower()
+        self._BaseTag__closing_tag = f"</{self.tag}>"
+
+
+# Elements that are closed by the start of one of these elements when their
+# end tag is left out
+IMPLIED_END_TAGS = {
+    "li": frozenset(("li",)),
+    "dt": frozenset(("dt", "dd")),
+    "dd": frozenset(("dt", "dd")),
+    "tr": frozenset(("tr", "td", "th")),
+    "td": frozenset(("td", "th")),
+    "th": frozenset(("td", "th")),
+    "thead": frozenset(("thead", "tbody", "tfoot", "tr", "td", "th")),
+    "tbody": frozenset(("thead", "tbody", "tfoot", "tr", "td", "th")),
+    "tfoot": frozenset(("thead", "tbody", "tfoot", "tr", "td", "th")),
+    "option": frozenset(("option",)),
+    "optgroup": frozenset(("option", "optgroup")),
+}
+
+# Elements that close an open paragraph
+CLOSES_P = frozenset(
+    (
+        "address", "article", "aside", "blockquote", "dd", "details", "div",
+        "dl", "dt", "fieldset", "figcaption", "figure", "footer", "form", "h1",
+        "h2", "h3", "h4", "h5", "h6", "header", "hr", "li", "main", "menu",
+        "nav", "ol", "p", "pre", "section", "table", "ul",
+    )
+)  # fmt: skip
+
+# Elements that never have children or an end tag
+VOID_ELEMENTS = frozenset(
+    (
+        "area", "base", "br", "col", "embed", "hr", "img", "input", "link",
+        "meta", "source", "track", "wbr",
+    )
+)  # fmt: skip
+
+# Elements whose text is kept as it is, rather than escaped again
+RAW_TEXT_ELEMENTS = frozenset(("script", "style"))
+
+# Tag name -> tag class, filled in on first use
+_tag_classes: dict[str, Type[BaseTag]] = {}
+
+
+class HTMLTagParser(HTMLParser):
+    """
+    Parses HTML into tags. Elements become instances of the matching tag
+    class, such as `Div` or `HtmlTagA`, or of `Element` if there is none.
+    Text is kept as strings, while comments, doctypes and the content of
+    `<script>` and `<style>` elements are kept as Raw HTML.
+
+    The parser is incremental: feed it chunks of a document as they arrive,
+    for example from a file or a network response, and call `close()` to get
+    the tags. Missing end tags are closed the way browsers close the common
+    cases, such as unclosed `<p>`, `<li>` and `<td>` elements, and stray end
+    tags are ignored.
+
+    Example:
+
+    .. code-block:: python
+        parser = HTMLTagParser()
+        for chunk in response.iter_text():
+            parser.feed(chunk)
+        tags = parser.close()
+    """
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self._root: list = []
+        # The open elements: [name, attributes, children]
+        self._stack: list[list] = [[None, None, self._root]]
+        # Tag name -> (class, attributes of an empty instance). New tags are
+        # copies, which is much faster than calling the constructor for
+        # every element.
+        self._prototypes: dict[str, tuple[type, dict]] = {}
+
+    def close(self) -> list:
+        """
+        Parses the rest of the document and closes the open elements.
+
+        Returns:
+            list: The top-level tags, text and raw HTML of the document.
+        """
+        super().close()
+        while len(self._stack) > 1:
+            self._end()
+        return self._root
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        implied = IMPLIED_END_TAGS.get(tag)
+        stack = self._stack
+        while len(stack) > 1:
+            name = stack[-1][0]
+            if (implied is not None and name in implied) or (
+                name == "p" and tag in CLOSES_P
+            ):
+                self._end()
+            else:
+                break
+
+        stack.append([tag, self._convert_attrs(attrs), _TagList()])
+        if tag in VOID_ELEMENTS:
+            self._end()
+
+    def handle_startendtag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_ELEMENTS:
+            # Self-closing foreign elements, such as SVG's `<path/>`
+            self._end()
+
+    def handle_endtag(self, tag: str) -> None:
+        stack = self._stack
+        if stack[-1][0] == tag:
+            self._end()
+            return
+        for i in range(len(stack) - 2, 0, -1):
+            if stack[i][0] == tag:
+                while len(stack) > i:
+                    self._end()
+                return
+
+    def handle_data(self, data: str) -> None:
+        name, _, children = self._stack[-1]
+        if name in RAW_TEXT_ELEMENTS:
+            children.append(Raw(data))
+        elif children and type(children[-1]) is str:
+            children[-1] += data
+        else:
+            children.append(data)
+
+    def handle_comment(self, data: str) -> None:
+        self._stack[-1][2].append(Raw(f"<!--{data}-->"))
+
+    def handle_decl(self, decl: str) -> None:
+        self._stack[-1][2].append(Raw(f"<!{decl}>"))
+
+    def handle_pi(self, data: str) -> None:
+        self._stack[-1][2].append(Raw(f"<?{data}>"))
+
+    def unknown_decl(self, data: str) -> None:
+        self._stack[-1][2].append(Raw(f"<![{data}]>"))
+
+    @staticmethod
+    def _convert_attrs(attrs: list[tuple[str, str | None]]) -> dict[str, Any]:
+        converted = _AttrDict()
+        for key, value in attrs:
+            # Use the names tags are created with, e.g. `class_` and `data_id`
+            key = key.replace("-", "_")
+            if iskeyword(key):
+                key += "_"
+            # Attributes are rendered in single quotes without escaping, and
+            # the parser has decoded their character references
+            converted[key] = (
+                ""
+                if value is None
+                else value.replace("&", "&amp;").replace("'", "&#39;")
+            )
+        return converted
+
+    def _end(self) -> None:
+        name, attrs, children = self._stack.pop()
+        prototype = self._prototypes.get(name)
+        if prototype is None:
+            if not _tag_classes:
+                _tag_classes.update(
+                    (tag_name.lower(), globals()[tag_name]) for tag_name in __all__
+                )
+            cls = _tag_classes.get(name)
+            empty = cls() if cls is not None else Element(name)
+            prototype = self._prototypes[name] = (type(empty), empty.__dict__)
+
+        # Parsed trees cannot contain cycles, so the checks done when tags
+        # are added can be skipped
+        cls, state = prototype
+        tag = object.__new__(cls)
+        tag.__dict__ = {**state, "tags": children, "attrs": attrs}
+        self._stack[-1][2].append(tag)
+
+
+def parse_html(
+    source: str | bytes | IO | Iterable[str | bytes],
+    encoding: str = "utf-8",
+    chunk_size: int = 64 * 1024,
+) -> list:
+    """
+    Parses HTML into tags, which can then be selected from, modified, cloned
+    and rendered like tags created in Python. See `HTMLTagParser`.
+
+    Example:
+
+    .. code-block:: python
+        [page] = parse_html(Path("legacy/index.html").read_bytes())
+        page.select(Table, recurse=True)
+
+    Args:
+        source (str | bytes | IO | Iterable[str | bytes]): The document, a
+            file opened in text or binary mode, or an iterable of chunks of
+            the document. Files and iterables are parsed a chunk at a time.
+        encoding (str, optional): The encoding of bytes input. Defaults to
+            "utf-8".
+        chunk_size (int, optional): The size of the chunks read from files.
+            Defaults to 64 KiB.
+
+    Returns:
+        list: The top-level tags, text and raw HTML of the document.
+    """
+    parser = HTMLTagParser()
+    if isinstance(source, str):
+        parser.feed(source)
+        return parser.close()
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        parser.feed(bytes(source).decode(encoding))
+        return parser.close()
+
+    if hasattr(source, "read"):
+        source = iter(functools.partial(source.read, chunk_size), source.read(0))
+    # Decode incrementally, as a chunk may end in the middle of a character
+    decoder = codecs.getincrementaldecoder(encoding)()
+    for chunk in source:
+        if not isinstance(chunk, str):
+            chunk = decoder.decode(chunk)
+        parser.feed(chunk)
+    parser.feed(decoder.decode(b"", final=True))
+    return parser.close()
+
+
 A = HtmlTagA
 B = HtmlTagB
 I = HtmlTagI  # noqa
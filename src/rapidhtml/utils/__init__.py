@@ -1,3 +1,4 @@
+import hashlib
 import inspect
 import pathlib
 
@@ -6,6 +7,11 @@ from functools import lru_cache
 
 from starlette.applications import Starlette
 
+try:
+    import xxhash
+except ImportError:  # pragma: nocover
+    xxhash = None
+
 try:
     from typing import dataclass_transform
 except ImportError:
@@ -32,6 +38,45 @@ def get_app() -> "Starlette":
                 return var
 
 
+HTMX_VERSION = "2.0.3"
+
+
+def get_htmx_path() -> pathlib.Path:
+    """Get the path of the HTMX bundle shipped with RapidHTML.
+
+    Returns:
+        pathlib.Path: The path of the minified HTMX bundle.
+    """
+    return pathlib.Path(__file__).parent.parent / "static" / "htmx.min.js"
+
+
+def get_batch_extension_path() -> pathlib.Path:
+    """Get the path of the HTMX extension batching callback requests.
+
+    Returns:
+        pathlib.Path: The path of the batch extension script.
+    """
+    return pathlib.Path(__file__).parent.parent / "static" / "batch.js"
+
+
+def get_ws_extension_path() -> pathlib.Path:
+    """Get the path of the HTMX extension decoding binary WebSocket fragments.
+
+    Returns:
+        pathlib.Path: The path of the WebSocket extension script.
+    """
+    return pathlib.Path(__file__).parent.parent / "static" / "ws.js"
+
+
+def get_default_favicon_path() -> pathlib.Path:
+    """Get the path of the default RapidHTML favicon.
+
+    Returns:
+        pathlib.Path: The path of the default RapidHTML favicon.
+    """
+    return pathlib.Path(__file__).parent.parent / "static" / "RapidHTML.svg"
+
+
 @lru_cache
 def get_default_favicon() -> bytes:
     """Get the default RapidHTML favicon.
@@ -39,6 +84,21 @@ def get_default_favicon() -> bytes:
     Returns:
         bytes: The default RapidHTML favicon.
     """
-    path = pathlib.Path(__file__).parent.parent / "static" / "RapidHTML.svg"
-    with open(path, "rb") as f:
+    with open(get_default_favicon_path(), "rb") as f:
         return f.read()
+
+
+def content_hash(data: bytes) -> str:
+    """Compute a fast, non-cryptographic hash of some content.
+
+    Uses xxhash when it is installed and falls back to blake2b otherwise.
+
+    Args:
+        data (bytes): The content to hash.
+
+    Returns:
+        str: The hexadecimal digest of the content.
+    """
+    if xxhash is not None:  # pragma: nocover
+        return xxhash.xxh3_128_hexdigest(data)
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
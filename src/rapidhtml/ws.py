@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+# The HTMX extension decoding binary fragments, see static/ws.js
+WS_EXTENSION = "rapidhtml-ws"
+
+
+@dataclass(frozen=True)
+class WSCompression:
+    """
+    Describes how WebSocket messages are compressed with the
+    permessage-deflate extension, when the client supports it.
+
+    Attributes:
+
+        level (int): The zlib compression level. Defaults to 6.
+
+        window_bits (int): The base-two logarithm of the server's compression
+            window, between 9 and 15. Smaller windows use less memory per
+            connection and compress less. Defaults to 15.
+
+        mem_level (int): The zlib memory level, between 1 and 9. Defaults to
+            8.
+
+        no_context_takeover (bool): Compress each message on its own rather
+            than with the history of the connection, saving the compression
+            window's memory between messages. Defaults to False.
+    """
+
+    level: int = 6
+    window_bits: int = 15
+    mem_level: int = 8
+    no_context_takeover: bool = False
+
+    def extension_factory(self) -> Any:
+        """
+        Creates the permessage-deflate extension negotiated with clients.
+
+        Returns:
+            ServerPerMessageDeflateFactory: The extension factory.
+        """
+        from websockets.extensions.permessage_deflate import (
+            ServerPerMessageDeflateFactory,
+        )
+
+        return ServerPerMessageDeflateFactory(
+            server_no_context_takeover=self.no_context_takeover,
+            server_max_window_bits=self.window_bits,
+            compress_settings={"level": self.level, "memLevel": self.mem_level},
+        )
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from typing import Optional
+
+from uvicorn.protocols.websockets.websockets_impl import WebSocketProtocol
+
+from rapidhtml.ws import WSCompression
+
+
+class RapidHTMLWSProtocol(WebSocketProtocol):
+    """
+    The uvicorn WebSocket protocol, negotiating permessage-deflate with the
+    settings of a WSCompression. Pass it to uvicorn with the compression
+    bound, e.g.
+    `functools.partial(RapidHTMLWSProtocol, compression=WSCompression())`.
+
+    Args:
+        *args: Variable length argument list passed to WebSocketProtocol.
+        compression (Optional[WSCompression], optional): The compression
+            settings. Defaults to WSCompression().
+        **kwargs: Arbitrary keyword arguments passed to WebSocketProtocol.
+    """
+
+    def __init__(
+        self, *args, compression: Optional[WSCompression] = None, **kwargs
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        if self.config.ws_per_message_deflate:
+            self.available_extensions = [
+                (compression or WSCompression()).extension_factory()
+            ]
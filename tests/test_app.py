@@ -1,11 +1,15 @@
+import asyncio
 import pathlib
 
 import pytest
 
+from starlette.exceptions import HTTPException
 from starlette.testclient import TestClient
 
 from rapidhtml import RapidHTML
-from rapidhtml.tags import Html, H1, Div
+from rapidhtml.batch import BATCH_PATH
+from rapidhtml.callbacks import RapidHTMLCallback
+from rapidhtml.tags import Html, H1, Div, Li, Raw, Ul
 from rapidhtml.utils import get_default_favicon
 
 
@@ -32,7 +36,51 @@ def test_app(client):
     assert response.status_code == 200
     assert "<title>RapidHTML</title>" in response.text
     assert "<h1>foobar</h1>" in response.text
-    assert "htmx.org" in response.text
+    assert f"<script src='{client.app.htmx_path}'></script>" in response.text
+
+
+def test_htmx_is_served_locally(client):
+    response = client.get(client.app.htmx_path)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/javascript")
+    assert "immutable" in response.headers["cache-control"]
+    assert b"htmx" in response.content
+
+    response = client.get(
+        client.app.htmx_path, headers={"if-none-match": response.headers["etag"]}
+    )
+    assert response.status_code == 304
+
+
+def test_early_hints(app):
+    messages = []
+
+    @app.route("/")
+    async def homepage():
+        return Html(H1("foobar"))
+
+    async def send(message):
+        messages.append(message)
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"accept", b"text/html")],
+        "extensions": {"http.response.early_hint": {}},
+    }
+    asyncio.run(app(scope, receive, send))
+
+    assert messages[0] == {
+        "type": "http.response.early_hint",
+        "links": [f"<{app.htmx_path}>; rel=preload; as=script".encode()],
+    }
+    assert messages[1]["status"] == 200
 
 
 def test_favicon(client):
@@ -50,3 +98,134 @@ def test_user_favicon():
     assert response.status_code == 200
     assert response.headers["content-type"] == "image/svg+xml"
     assert response.content == get_default_favicon()
+
+
+def test_stream(app):
+    @app.route("/rows", stream=True)
+    def rows():
+        return Html(Ul(Li(i) for i in range(1000)))
+
+    client = TestClient(app)
+    response = client.get("/rows")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "text/html; charset=utf-8"
+    assert "content-length" not in response.headers
+    assert response.text.endswith("<li>999</li></ul></html>")
+
+
+def test_async_children(app):
+    async def fetch_name():
+        await asyncio.sleep(0)
+        return "foobar"
+
+    @app.route("/async")
+    def page():
+        return Html(H1(fetch_name()))
+
+    client = TestClient(app)
+    response = client.get("/async")
+    assert response.status_code == 200
+    assert "<h1>foobar</h1>" in response.text
+
+
+def test_raw_response(app):
+    @app.route("/fragment", cache=True)
+    def fragment():
+        return Raw(b"<li>1</li>")
+
+    client = TestClient(app)
+    response = client.get("/fragment")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "text/html; charset=utf-8"
+    assert response.text == "<li>1</li>"
+
+
+def test_minify():
+    app = RapidHTML(minify=True)
+
+    @app.route("/")
+    def homepage():
+        return Html(Div(H1("  foobar  "), class_="title"))
+
+    client = TestClient(app)
+    response = client.get("/")
+    assert "<div class=title><h1> foobar </h1></div>" in response.text
+    assert app.router.minify_stats()["/"]["responses"] == 1
+    assert app.router.minify_stats()["/"]["bytes_saved"] > 0
+
+
+def test_batch_callbacks():
+    app = RapidHTML(batch_callbacks=True)
+
+    async def clock():
+        await asyncio.sleep(0.01)
+        return "12:00"
+
+    def greeting(request):
+        return Raw(f"<b>Hello {Raw.escape(request.query_params['name'])}</b>")
+
+    clock_callback = RapidHTMLCallback(clock, trigger="every 2s", batch=True)
+    greeting_callback = RapidHTMLCallback(greeting, ext="json-enc", batch=True)
+    assert clock_callback.attrs["hx_ext"] == "rapidhtml-batch"
+    assert greeting_callback.attrs["hx_ext"] == "json-enc, rapidhtml-batch"
+
+    def not_found():
+        raise HTTPException(404)
+
+    def broken():
+        raise ValueError("broken")
+
+    clock_route = clock_callback.register(app)
+    greeting_route = greeting_callback.register(app)
+    not_found_route = RapidHTMLCallback(not_found, batch=True).register(app)
+    broken_route = RapidHTMLCallback(broken, batch=True).register(app)
+
+    client = TestClient(app)
+    assert client.get(app.batch_extension_path).status_code == 200
+
+    response = client.post(
+        BATCH_PATH,
+        json=[
+            {"id": "clock", "path": clock_route},
+            {
+                "id": "greeting",
+                "path": f"{greeting_route}?name=Ada",
+                "swap": "beforeend",
+            },
+            {"id": "missing", "path": "/missing"},
+            {"id": "not-found", "path": not_found_route},
+            {"id": "broken", "path": broken_route},
+            {"id": "#invalid", "path": clock_route},
+        ],
+    )
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "no-store"
+    assert response.text == (
+        "<div hx-swap-oob='innerHTML:#clock'>12:00</div>"
+        "<div hx-swap-oob='beforeend:#greeting'><b>Hello Ada</b></div>"
+    )
+
+    assert client.post(BATCH_PATH, content=b"{").status_code == 400
+    assert client.post(BATCH_PATH, json=[{}] * 101).status_code == 400
+
+
+def test_batch_versioned_cached_route():
+    app = RapidHTML(batch_callbacks=True)
+    app.state.version = "1"
+
+    def get_version():
+        return app.state.version
+
+    @app.route("/w", cache=True, etag=get_version)
+    def widget():
+        return Raw(f"v{app.state.version}")
+
+    client = TestClient(app)
+
+    def batch():
+        return client.post(BATCH_PATH, json=[{"id": "w", "path": "/w"}]).text
+
+    assert batch() == "<div hx-swap-oob='innerHTML:#w'>v1</div>"
+    app.state.version = "2"
+    assert client.get("/w").text == "v2"
+    assert batch() == "<div hx-swap-oob='innerHTML:#w'>v2</div>"
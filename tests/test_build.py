@@ -0,0 +1,103 @@
+import gzip
+import textwrap
+
+import pytest
+
+from rapidhtml import RapidHTML
+from rapidhtml.build import build, main, output_path
+from rapidhtml.tags import Body, H1, Html, P, Raw
+
+
+def make_app(static_directory):
+    app = RapidHTML(title="Site", static_directory=static_directory)
+
+    @app.route("/")
+    def homepage():
+        return Html(Body(H1("Home"), P("Welcome   to the site " * 50)))
+
+    @app.route("/posts/{slug}")
+    def post(request):
+        return Html(Body(H1(request.path_params["slug"])))
+
+    @app.route("/feed.xml")
+    def feed():
+        return Raw("<rss></rss>")
+
+    @app.route("/api")
+    def api():
+        return {"dynamic": True}
+
+    return app
+
+
+def test_output_path(tmp_path):
+    assert output_path(tmp_path, "/") == tmp_path / "index.html"
+    assert output_path(tmp_path, "/about") == tmp_path / "about/index.html"
+    assert output_path(tmp_path, "/about/") == tmp_path / "about/index.html"
+    assert output_path(tmp_path, "/feed.xml") == tmp_path / "feed.xml"
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_build(tmp_path, workers):
+    static = tmp_path / "static"
+    static.mkdir()
+    (static / "style.css").write_text("body { color: red; }\n" * 100)
+    output = tmp_path / "build"
+
+    app = make_app(static)
+    written = build(
+        app,
+        output,
+        params={"/posts/{slug}": [{"slug": "hello"}, {"slug": "world"}]},
+        workers=workers,
+    )
+
+    index = (output / "index.html").read_text()
+    assert index.startswith("<html>")
+    assert "<title>Site</title>" in index
+    assert app.htmx_path in index
+    # Minified, with its compressed variant next to it
+    assert "Welcome to the site" in index
+    assert "Welcome   to" not in index
+    assert gzip.decompress((output / "index.html.gz").read_bytes()).decode() == index
+
+    assert "<h1>hello</h1>" in (output / "posts/hello/index.html").read_text()
+    assert "<h1>world</h1>" in (output / "posts/world/index.html").read_text()
+    assert (output / "feed.xml").read_text() == "<rss></rss>"
+    assert not (output / "api").exists()
+
+    assert (output / app.htmx_path.lstrip("/")).read_bytes() == app.htmx.data
+    assert (output / "favicon.ico").read_bytes() == app.favicon.data
+    assert (output / "static/style.css").read_text() == (
+        static / "style.css"
+    ).read_text()
+    assert (output / "static/style.css.gz").exists()
+
+    assert output / "index.html" in written
+    assert all(path.exists() for path in written)
+
+
+def test_build_command(tmp_path, monkeypatch):
+    (tmp_path / "static_site.py").write_text(
+        textwrap.dedent(
+            """
+            from rapidhtml import RapidHTML
+            from rapidhtml.tags import Html, Body, H1
+
+            app = RapidHTML()
+
+            @app.route("/about")
+            def about():
+                return Html(Body(H1("About")))
+            """
+        )
+    )
+    (tmp_path / "params.json").write_text("{}")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.syspath_prepend(tmp_path)
+
+    main(
+        ["build", "static_site:app", "-o", "out", "--params", "params.json", "-w", "1"]
+    )
+    assert "<h1>About</h1>" in (tmp_path / "out/about/index.html").read_text()
+    assert (tmp_path / "out/about/index.html.gz").exists()
@@ -0,0 +1,230 @@
+import time
+import asyncio
+
+from starlette.responses import Response
+from starlette.testclient import TestClient
+
+from rapidhtml import RapidHTML
+from rapidhtml.cache import LRUCache, SharedCache
+from rapidhtml.diskcache import DiskCache
+from rapidhtml.tags import Body, Html, P
+
+
+def test_lru_eviction():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert len(cache) == 2
+
+
+def test_max_bytes():
+    cache = LRUCache(max_bytes=10)
+    cache.set("a", "12345")
+    cache.set("b", "12345")
+    assert cache.nbytes == 10
+
+    cache.set("c", "123")
+    assert "a" not in cache
+    assert cache.nbytes == 8
+
+    # Values larger than the cache are not stored
+    cache.set("d", "x" * 11)
+    assert "d" not in cache
+
+
+def test_ttl():
+    cache = LRUCache(ttl=0.05)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+
+    time.sleep(0.06)
+    assert cache.get("a") is None
+    assert "a" not in cache
+
+
+def test_stats():
+    cache = LRUCache()
+    cache.set("a", "value")
+    cache.get("a")
+    cache.get("a")
+    cache.get("b")
+
+    assert cache.hits == 2
+    assert cache.misses == 1
+    assert cache.hit_rate == 2 / 3
+    assert cache.stats["entries"] == 1
+
+
+def test_shared_cache():
+    cache = SharedCache(max_bytes=4096, maxsize=16, name="test-shared-cache")
+    cache.set("a", {"value": 1})
+    cache.set(("b", 2), "two")
+    assert cache.get("a") == {"value": 1}
+    assert cache.get(("b", 2)) == "two"
+    assert cache.get("c") is None
+    assert len(cache) == 2
+
+    # Another process creating the same cache attaches to the same file
+    other = SharedCache(name="test-shared-cache")
+    assert other.path == cache.path
+    assert other.get("a") == {"value": 1}
+    other.set("a", 3)
+    assert cache.get("a") == 3
+
+    assert cache.pop("a") == 3
+    assert "a" not in other
+    cache.clear()
+    assert len(other) == 0
+
+
+def test_shared_cache_eviction():
+    cache = SharedCache(max_bytes=1024, maxsize=64, ttl=0.05)
+    for i in range(20):
+        cache.set(i, "x" * 100)
+    # The oldest values have been overwritten in the ring buffer
+    assert 0 not in cache
+    assert cache.get(19) == "x" * 100
+
+    cache.set("large", "x" * 1024)
+    assert "large" not in cache
+
+    time.sleep(0.06)
+    assert 19 not in cache
+
+
+def test_shared_cache_route():
+    app = RapidHTML(compression=True)
+    cache = SharedCache()
+
+    @app.route("/", cache=cache)
+    def homepage():
+        return Html(Body(P("x" * 1000)))
+
+    client = TestClient(app)
+    first = client.get("/", headers={"accept-encoding": "gzip"})
+    assert len(cache) == 1
+    # Copies of the cached response keep the compressed body
+    response = cache.get("/?")
+    assert "gzip" in response.variants
+
+    second = client.get("/", headers={"accept-encoding": "gzip"})
+    assert second.headers["content-encoding"] == "gzip"
+    assert second.text == first.text
+
+
+def test_disk_cache(tmp_path):
+    def make_app(cache):
+        app = RapidHTML(compression=True)
+        renders = []
+
+        @app.route("/", cache=cache)
+        def homepage(request):
+            renders.append(request.url.path)
+            return Html(Body(P("x" * 1000)))
+
+        @app.route("/{name}", cache=cache)
+        def page(request):
+            name = request.path_params["name"]
+            renders.append(name)
+            return Html(Body(P(name * 1000)))
+
+        return app, renders
+
+    app, renders = make_app(DiskCache(tmp_path))
+    first = TestClient(app).get("/", headers={"accept-encoding": "gzip"})
+    assert renders == ["/"]
+
+    # A restarted app serves the stored page without rendering it
+    cache = DiskCache(tmp_path)
+    assert len(cache) == 1
+    app, renders = make_app(cache)
+    client = TestClient(app)
+    response = client.get("/", headers={"accept-encoding": "gzip"})
+    assert renders == []
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.text == first.text
+    response = client.get("/", headers={"accept-encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert response.text == first.text
+
+    assert asyncio.run(app.warm_up(["/", "/a", "/b"])) == 2
+    assert renders == ["a", "b"]
+    assert len(cache) == 3
+    assert client.get("/a").text.count("a" * 1000) == 1
+    assert renders == ["a", "b"]
+
+
+def test_disk_cache_eviction(tmp_path):
+    cache = DiskCache(tmp_path, max_bytes=2500)
+    for name in ("a", "b", "c"):
+        cache.set(name, Response(name * 1000))
+    assert "a" not in cache
+    assert cache.nbytes == 2000
+    assert bytes(cache.get("c").body) == b"c" * 1000
+
+    # Entries with the same content share their files
+    cache.set("d", Response(b"c" * 1000))
+    assert cache.nbytes == 2000
+    cache.pop("c")
+    assert bytes(cache.get("d").body) == b"c" * 1000
+
+    cache.clear()
+    assert len(cache) == 0
+    assert not any((tmp_path / "objects").rglob("*.*"))
+
+
+def test_disk_cache_bounds_memory_maps(tmp_path):
+    cache = DiskCache(tmp_path, max_maps=2)
+    for name in ("a", "b", "c"):
+        cache.set(name, Response(name * 1000))
+    responses = [cache.get(name) for name in ("a", "b", "c")]
+    assert len(cache._maps) == 2
+
+    # Responses whose maps were dropped are still sent in full
+    async def send_body(response):
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        await response({"type": "http", "method": "GET", "headers": []}, None, send)
+        return bytes(messages[-1]["body"])
+
+    assert asyncio.run(send_body(responses[0])) == b"a" * 1000
+
+
+def test_disk_cache_ttl(tmp_path):
+    cache = DiskCache(tmp_path, ttl=0.1)
+    cache.set("a", Response("a"))
+    assert "a" in cache
+    time.sleep(0.15)
+    assert "a" not in cache
+    assert cache.get("a") is None
+
+
+def test_warm_up_versioned_route(tmp_path):
+    app = RapidHTML()
+    renders = []
+
+    @app.route("/", cache=DiskCache(tmp_path), etag=lambda: "1")
+    def homepage():
+        renders.append("/")
+        return Html(Body(P("home")))
+
+    assert asyncio.run(app.warm_up(["/"])) == 1
+    assert asyncio.run(app.warm_up(["/"])) == 0
+    assert "home" in TestClient(app).get("/").text
+    assert renders == ["/"]
+
+
+def test_shared_caches_created_in_a_loop():
+    caches = [SharedCache(max_bytes=1024 * (i + 1), maxsize=8) for i in range(2)]
+    assert caches[0].path != caches[1].path
+    assert caches[1].max_bytes == 2048
+    caches[0].set("a", 1)
+    assert "a" not in caches[1]
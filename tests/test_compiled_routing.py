@@ -0,0 +1,163 @@
+import pytest
+
+from starlette.convertors import Convertor, register_url_convertor
+from starlette.routing import Match, Mount
+from starlette.staticfiles import StaticFiles
+from starlette.testclient import TestClient
+
+from rapidhtml import RapidHTML
+from rapidhtml.compiled_routing import RapidHTMLCompiledRouter, RouteIndex
+from rapidhtml.routing import RapidHTMLRouter, RapidHTMLWSEndpoint
+from rapidhtml.tags import Raw
+
+
+def endpoint():
+    return Raw("")
+
+
+PATHS = [
+    "/",
+    "/about",
+    "/users/{id:int}",
+    "/users/me",
+    "/users/{name}",
+    "/users/{name}/posts/{post}",
+    "/files/{file}.txt",
+    "/docs/{rest:path}",
+    "/python-callbacks/140234",
+    "/python-callbacks/140235",
+]
+
+
+def make_router(router_class):
+    router = router_class()
+    for path in PATHS:
+        router.add_route(path, endpoint, methods=["GET"])
+    router.add_route("/users/me", endpoint, methods=["POST"])
+    router.add_websocket_route("/ws/{room}", RapidHTMLWSEndpoint)
+    router.mount("/static", StaticFiles(directory="."))
+    return router
+
+
+def linear_match(router, scope):
+    partial = None
+    for route in router.routes:
+        match, child_scope = route.matches(scope)
+        if match == Match.FULL:
+            return route, match, child_scope
+        if match == Match.PARTIAL and partial is None:
+            partial = (route, match, child_scope)
+    return partial or (None, Match.NONE, {})
+
+
+@pytest.mark.parametrize(
+    "scope_type, method, path",
+    [
+        ("http", "GET", "/"),
+        ("http", "GET", "/about"),
+        ("http", "GET", "/about/"),
+        ("http", "GET", "/users/12"),
+        ("http", "GET", "/users/me"),
+        ("http", "POST", "/users/me"),
+        ("http", "DELETE", "/users/me"),
+        ("http", "GET", "/users/ada"),
+        ("http", "GET", "/users/ada/posts/1"),
+        ("http", "GET", "/users/ada/posts"),
+        ("http", "GET", "/files/notes.txt"),
+        ("http", "GET", "/files/notes.md"),
+        ("http", "GET", "/docs/"),
+        ("http", "GET", "/docs/a/b/c"),
+        ("http", "GET", "/python-callbacks/140235"),
+        ("http", "GET", "/static/README.md"),
+        ("http", "GET", "/missing"),
+        ("websocket", None, "/ws/lobby"),
+        ("websocket", None, "/users/me"),
+    ],
+)
+def test_same_match_as_linear_scan(scope_type, method, path):
+    compiled = make_router(RapidHTMLCompiledRouter)
+    linear = make_router(RapidHTMLRouter)
+    scope = {"type": scope_type, "path": path, "root_path": "", "headers": []}
+    if method:
+        scope["method"] = method
+
+    route, match, child_scope = compiled.match(scope)
+    expected_route, expected_match, expected_scope = linear_match(linear, scope)
+    assert match == expected_match
+    if expected_route is None:
+        assert route is None
+    else:
+        assert compiled.routes.index(route) == linear.routes.index(expected_route)
+        assert child_scope.get("path_params") == expected_scope.get("path_params")
+
+
+def test_route_index():
+    router = make_router(RapidHTMLRouter)
+    index = RouteIndex(router.routes)
+    paths = [route.path for route in router.routes]
+    assert index.candidates("/python-callbacks/140234") == [
+        paths.index("/python-callbacks/140234")
+    ]
+    assert [paths[i] for i in index.candidates("/users/me")] == [
+        "/users/{id:int}",
+        "/users/me",
+        "/users/{name}",
+        "/users/me",
+    ]
+
+
+class NestedSlugConvertor(Convertor):
+    regex = "[a-z]+(?:/[a-z]+)*"
+
+    def convert(self, value):
+        return value
+
+    def to_string(self, value):
+        return value
+
+
+register_url_convertor("nested_slug", NestedSlugConvertor())
+
+
+def test_custom_convertor_can_match_several_segments():
+    app = RapidHTML(compiled_router=True)
+
+    @app.route("/docs/{slug:nested_slug}")
+    def docs(request):
+        return Raw(request.path_params["slug"])
+
+    client = TestClient(app)
+    assert client.get("/docs/guide").text == "guide"
+    assert client.get("/docs/guide/routing").text == "guide/routing"
+
+
+def test_compiled_router_app():
+    app = RapidHTML(compiled_router=True)
+    assert isinstance(app.router, RapidHTMLCompiledRouter)
+
+    @app.route("/")
+    def homepage():
+        return Raw("home")
+
+    @app.route("/items/{id:int}", methods=["GET"])
+    def item(request):
+        return Raw(f"item {request.path_params['id']}")
+
+    client = TestClient(app)
+    assert client.get("/").text == "home"
+    assert client.get("/items/3").text == "item 3"
+    assert client.post("/items/3").status_code == 405
+    assert client.get("/items/x").status_code == 404
+    response = client.get("/items/3/", follow_redirects=False)
+    assert response.status_code == 307
+    assert response.headers["location"].endswith("/items/3")
+
+    # Routes added later and replaced routes are picked up
+    app.router.add_route("/late", lambda: Raw("late"))
+    assert client.get("/late").text == "late"
+    app.router.routes = [
+        route for route in app.router.routes if getattr(route, "path", "") != "/"
+    ]
+    assert client.get("/").status_code == 404
+    app.router.routes.insert(0, Mount("/items", routes=[]))
+    assert client.get("/items/3").status_code == 404
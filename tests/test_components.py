@@ -0,0 +1,177 @@
+import asyncio
+
+import pytest
+
+from starlette.testclient import TestClient
+
+import rapidhtml
+
+from rapidhtml import RapidHTML
+from rapidhtml.cache import LRUCache
+from rapidhtml.components import PaginatedTable
+from rapidhtml.tags import Html, Body, Div, Li, Ul
+
+PEOPLE = [{"id": i, "name": f"Person {i}"} for i in range(1, 8)]
+
+
+@pytest.fixture
+def app():
+    return RapidHTML()
+
+
+def keyset_source(calls):
+    async def load_people(after, limit):
+        calls.append(after)
+        await asyncio.sleep(0)
+        start = int(after or 0)
+        return [person for person in PEOPLE if person["id"] > start][:limit]
+
+    return load_people
+
+
+def test_first_page(app):
+    people = PaginatedTable(PEOPLE, {"name": "Name"}, page_size=3, app=app)
+
+    @app.route("/")
+    def homepage():
+        return Html(Body(people.table(class_="people")))
+
+    response = TestClient(app).get("/")
+    assert response.status_code == 200
+    assert (
+        "<table class='people'><thead><tr><th>Name</th></tr></thead><tbody>"
+        "<tr><td>Person 1</td></tr><tr><td>Person 2</td></tr>"
+        "<tr><td>Person 3</td></tr>"
+    ) in response.text
+    assert "Person 4" not in response.text
+    assert f"hx-get='{people.route}?after=3'" in response.text
+    assert "hx-trigger='revealed'" in response.text
+    assert "hx-swap='outerHTML'" in response.text
+
+
+def test_keyset_pages(app):
+    calls = []
+    people = PaginatedTable(keyset_source(calls), ["id", "name"], page_size=3, app=app)
+    client = TestClient(app)
+
+    response = client.get(people.route, params={"after": "3"})
+    assert response.status_code == 200
+    assert response.text.startswith("<tr><td>4</td><td>Person 4</td></tr>")
+    assert f"hx-get='{people.route}?after=6'" in response.text
+
+    # The last page has no placeholder row
+    response = client.get(people.route, params={"after": "6"})
+    assert response.text == "<tr><td>7</td><td>Person 7</td></tr>"
+    assert calls == ["3", "6"]
+
+
+def test_invalid_cursor(app):
+    people = PaginatedTable(PEOPLE, ["name"], page_size=3, app=app)
+    client = TestClient(app)
+
+    for after in ("abc", "-2", "1.5"):
+        response = client.get(people.route, params={"after": after})
+        assert response.status_code == 400
+
+
+def test_pages_are_cached(app):
+    calls = []
+    people = PaginatedTable(
+        keyset_source(calls),
+        ["name"],
+        page_size=2,
+        cache=LRUCache(maxsize=1),
+        app=app,
+    )
+    client = TestClient(app)
+
+    client.get(people.route, params={"after": "2"})
+    client.get(people.route, params={"after": "2"})
+    assert calls == ["2"]
+
+    # The least recently used page is evicted
+    client.get(people.route, params={"after": "4"})
+    client.get(people.route, params={"after": "2"})
+    assert calls == ["2", "4", "2"]
+
+
+def test_sync_source(app):
+    people = PaginatedTable(
+        lambda after, limit: PEOPLE[:limit], ["name"], page_size=10, app=app
+    )
+    response = TestClient(app).get(people.route)
+    assert response.text.count("<tr>") == len(PEOPLE)
+
+
+def test_component_is_cached():
+    calls = []
+
+    @rapidhtml.component
+    def people_list(*people):
+        calls.append(people)
+        return Ul(*(Li(person["name"]) for person in people))
+
+    people = PEOPLE[:2]
+    page = Div(people_list(*people), people_list(*people))
+
+    assert page.render() == (
+        "<div><ul><li>Person 1</li><li>Person 2</li></ul>"
+        "<ul><li>Person 1</li><li>Person 2</li></ul></div>"
+    )
+    assert len(calls) == 1
+    assert people_list.cache.hits == 1
+    assert people_list.cache.hit_rate == 0.5
+
+    people_list(*PEOPLE[:3])
+    assert len(calls) == 2
+
+
+def test_component_cache_key_includes_types():
+    @rapidhtml.component
+    def value(value, label=""):
+        return Div(value, label)
+
+    assert value(1).render() == "<div>1</div>"
+    assert value(True).render() == "<div>True</div>"
+    assert value(1.0).render() == "<div>1.0</div>"
+    assert value(1, label=1).render() == "<div>11</div>"
+    assert value(1, label=True).render() == "<div>1True</div>"
+
+    # Including within containers
+    @rapidhtml.component
+    def show(value):
+        return Div(repr(value))
+
+    assert show((1,)).render() == "<div>(1,)</div>"
+    assert show((True,)).render() == "<div>(True,)</div>"
+    assert show(frozenset([(1.0,)])).render() == "<div>frozenset({(1.0,)})</div>"
+    assert show(frozenset([(1,)])).render() == "<div>frozenset({(1,)})</div>"
+
+
+def test_component_with_key_and_byte_limit():
+    calls = []
+
+    @rapidhtml.component(cache=LRUCache(max_bytes=30), key=lambda name: name.lower())
+    def greeting(name):
+        calls.append(name)
+        return Div(f"Hello {name}")
+
+    assert greeting("Ada").render() == "<div>Hello Ada</div>"
+    assert greeting("ADA").render() == "<div>Hello Ada</div>"
+    greeting("Alan")
+    greeting("Ada")
+    assert calls == ["Ada", "Alan", "Ada"]
+
+
+def test_async_component():
+    @rapidhtml.component
+    async def slow_greeting(name):
+        async def fetch():
+            await asyncio.sleep(0)
+            return name
+
+        return Div(fetch())
+
+    fragment = asyncio.run(slow_greeting("Ada"))
+    assert fragment.render() == "<div>Ada</div>"
+    assert asyncio.run(slow_greeting("Ada")) is fragment
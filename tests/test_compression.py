@@ -0,0 +1,81 @@
+import gzip
+
+import pytest
+
+from starlette.testclient import TestClient
+
+from rapidhtml import RapidHTML
+from rapidhtml.compression import CompressionPolicy, parse_accept_encoding
+from rapidhtml.tags import Html, Body, Div
+
+
+@pytest.fixture
+def app():
+    app = RapidHTML(compression=CompressionPolicy(encodings=("gzip",)))
+    renders = []
+
+    @app.route("/", cache=True)
+    async def homepage():
+        renders.append(1)
+        return Html(Body(*(Div(f"row {i}") for i in range(200))))
+
+    @app.route("/small")
+    async def small():
+        return Html(Body(Div("small")))
+
+    @app.route("/uncompressed", compression=False)
+    async def uncompressed():
+        return Html(Body(*(Div(f"row {i}") for i in range(200))))
+
+    app.state.renders = renders
+    return app
+
+
+def test_parse_accept_encoding():
+    assert parse_accept_encoding("gzip, br;q=0.5, zstd;q=0") == {
+        "gzip": 1.0,
+        "br": 0.5,
+        "zstd": 0.0,
+    }
+
+
+def test_select_encoding():
+    policy = CompressionPolicy(encodings=("gzip",))
+    assert policy.select_encoding("gzip, deflate") == "gzip"
+    assert policy.select_encoding("*") == "gzip"
+    assert policy.select_encoding("gzip;q=0") is None
+    assert policy.select_encoding("identity") is None
+
+
+def test_compressed_response(app):
+    client = TestClient(app)
+    response = client.get("/", headers={"accept-encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert "<div>row 199</div>" in response.text
+
+
+def test_uncompressed_response(app):
+    client = TestClient(app)
+
+    response = client.get("/", headers={"accept-encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert "<div>row 199</div>" in response.text
+
+    response = client.get("/small", headers={"accept-encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+
+    response = client.get("/uncompressed", headers={"accept-encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+
+
+def test_cached_response_reuses_variant(app):
+    client = TestClient(app)
+    client.get("/", headers={"accept-encoding": "gzip"})
+    client.get("/", headers={"accept-encoding": "gzip"})
+    assert len(app.state.renders) == 1
+
+    route = next(route for route in app.routes if route.path == "/")
+    cached_response = route.cache.get("/?")
+    assert gzip.decompress(cached_response.variants["gzip"]) == cached_response.body
@@ -1,12 +1,16 @@
 import pytest
 
+from rapidhtml.exceptions import CSSParseError
 from rapidhtml.style import StyleSheet
+from rapidhtml.style.parser import _parse_css_cached, clear_cache, parse_css
 
 
 @pytest.mark.parametrize(
     "style,expected_error",
     [
-        ("color: red:", AssertionError),
+        ("color: red:", CSSParseError),
+        ("a { color: red", CSSParseError),
+        ("content: 'unterminated", CSSParseError),
         ("color: red", ValueError),
         ({"color": "red"}, ValueError),
     ],
@@ -16,6 +20,81 @@ def test_invalid_css_str(style, expected_error):
         StyleSheet.from_style(style).render()
 
 
+def test_from_style_values_with_colons():
+    s = StyleSheet.from_style(
+        "background: url(http://example.com/a;b.png); color: rgba(0, 0, 0, 0.5);"
+    )
+
+    assert s.rules == {
+        "background": "url(http://example.com/a;b.png)",
+        "color": "rgba(0, 0, 0, 0.5)",
+    }
+
+
+def test_parse_css_nested_and_at_rules():
+    css = """
+    /* comment; with: tokens { } */
+    a { content: "a:b;{}"; &:hover { color: blue } }
+    @media (max-width: 600px) { a { color: red } }
+    """
+
+    assert parse_css(css) == {
+        "a": {"content": '"a:b;{}"', "&:hover": {"color": "blue"}},
+        "@media (max-width: 600px)": {"a": {"color": "red"}},
+    }
+
+
+def test_parse_css_is_cached():
+    clear_cache()
+    parsed = parse_css("a { color: red }")
+    parsed["a"]["color"] = "blue"
+
+    assert parse_css("a { color: red }") == {"a": {"color": "red"}}
+    info = _parse_css_cached.cache_info()
+    assert (info.hits, info.misses) == (1, 1)
+
+
+def test_render_at_rule():
+    s = StyleSheet.from_style("@media print { a { color: red } }")
+
+    assert s.render() == (
+        """@media print {
+    a {
+        color: red;
+    }
+}
+
+"""
+    )
+
+
+def test_blockless_at_rules():
+    css = "@import url(a.css); @import url(b.css); a{b:c}"
+
+    assert parse_css(css) == {
+        "@": ["@import url(a.css)", "@import url(b.css)"],
+        "a": {"b": "c"},
+    }
+    assert StyleSheet.from_style(css).render() == (
+        """@import url(a.css);
+@import url(b.css);
+
+a {
+    b: c;
+}
+
+"""
+    )
+
+
+def test_only_blockless_at_rules():
+    s = StyleSheet.from_style("@import url(a.css);")
+
+    assert s.render() == "@import url(a.css);\n\n"
+    combined = s + StyleSheet.from_style("@import url(b.css);")
+    assert combined.rules == {"@": ["@import url(a.css)", "@import url(b.css)"]}
+
+
 def test_from_css_dict():
     s = StyleSheet(ul={"color": "red", "width": 25})
 
@@ -40,3 +40,10 @@ class TestCyclicalTag:
 
         with pytest.raises(rapidhtml.exceptions.CyclicalTagError):
             tag_list[-1].add_tag(root_tag)
+
+    def test_lazy_cyclical_tag_raises_on_render(self):
+        root_tag = Div()
+        root_tag.add_tag(Div(tag for tag in [root_tag]))
+
+        with pytest.raises(rapidhtml.exceptions.CyclicalTagError):
+            root_tag.render()
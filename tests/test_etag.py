@@ -0,0 +1,101 @@
+import pytest
+
+from starlette.testclient import TestClient
+
+from rapidhtml import RapidHTML
+from rapidhtml.responses import etag_matches
+from rapidhtml.tags import Html, Body, Div
+
+
+@pytest.fixture
+def app():
+    app = RapidHTML(etag=True)
+    app.state.calls = 0
+    app.state.version = "1"
+
+    @app.route("/")
+    async def homepage():
+        return Html(Body(Div("foobar")))
+
+    async def get_version():
+        return app.state.version
+
+    @app.route("/versioned", etag=get_version)
+    async def versioned():
+        app.state.calls += 1
+        return Html(Body(Div(f"version {app.state.version}")))
+
+    @app.route("/fragment")
+    async def fragment(request):
+        return "fragment" if "hx-request" in request.headers else "page"
+
+    return app
+
+
+def test_etag_matches():
+    assert etag_matches('"abc"', 'W/"abc"')
+    assert etag_matches('W/"xyz", W/"abc"', 'W/"abc"')
+    assert etag_matches("*", 'W/"abc"')
+    assert not etag_matches('"xyz"', 'W/"abc"')
+    assert not etag_matches(None, 'W/"abc"')
+
+
+def test_not_modified(app):
+    client = TestClient(app)
+    response = client.get("/")
+    etag = response.headers["etag"]
+    assert etag.startswith('W/"')
+    assert "HX-Request" in response.headers["vary"]
+
+    response = client.get("/", headers={"if-none-match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert response.content == b""
+
+    response = client.get("/", headers={"if-none-match": 'W/"stale"'})
+    assert response.status_code == 200
+
+
+def test_version_key_skips_endpoint(app):
+    client = TestClient(app)
+    etag = client.get("/versioned").headers["etag"]
+    assert app.state.calls == 1
+
+    response = client.get("/versioned", headers={"if-none-match": etag})
+    assert response.status_code == 304
+    assert app.state.calls == 1
+
+    app.state.version = "2"
+    response = client.get("/versioned", headers={"if-none-match": etag})
+    assert response.status_code == 200
+    assert "version 2" in response.text
+
+
+def test_htmx_fragment_etag(app):
+    client = TestClient(app)
+    page_etag = client.get("/fragment").headers["etag"]
+    fragment = client.get("/fragment", headers={"hx-request": "true"})
+    assert fragment.headers["etag"] != page_etag
+
+    response = client.get(
+        "/fragment",
+        headers={"hx-request": "true", "if-none-match": fragment.headers["etag"]},
+    )
+    assert response.status_code == 304
+
+    versioned = client.get("/versioned").headers["etag"]
+    response = client.get(
+        "/versioned", headers={"hx-request": "true", "if-none-match": versioned}
+    )
+    assert response.status_code == 200
+
+
+def test_etag_disabled_by_default():
+    app = RapidHTML()
+
+    @app.route("/")
+    async def homepage():
+        return Html(Body(Div("foobar")))
+
+    response = TestClient(app).get("/")
+    assert "etag" not in response.headers
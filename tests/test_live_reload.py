@@ -3,8 +3,17 @@ import time
 import httpx
 import pytest
 import os
+import json
+import asyncio
+import importlib
+
+from pathlib import Path
+
+from starlette.routing import Route
+from starlette.testclient import TestClient
 
 from rapidhtml.app import RapidHTML, JS_RELOAD_SCRIPT
+from rapidhtml.reload import HotReloader, merge_routes
 from rapidhtml.tags import Html, Head, Title
 
 TEST_FILE_HELLO = "live_reload/hello.py"
@@ -55,3 +64,128 @@ def test_live_reload_html():
     html.add_head(*app.html_head)
 
     assert JS_RELOAD_SCRIPT in html.render()
+
+
+class FakeSocket:
+    def __init__(self):
+        self.messages = []
+
+    async def send_text(self, text):
+        self.messages.append(json.loads(text))
+
+
+def test_hot_reload(tmp_path, monkeypatch):
+    static = tmp_path / "static"
+    static.mkdir()
+    views = tmp_path / "hot_reload_views.py"
+    views.write_text(
+        "from rapidhtml.app import RapidHTML\n"
+        "app = RapidHTML(hot_reload=True)\n"
+        "@app.route('/')\n"
+        "def homepage():\n"
+        "    return {'version': 1}\n"
+        "@app.route('/fragment')\n"
+        "def fragment():\n"
+        "    return 'one'\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    module = importlib.import_module("hot_reload_views")
+    app = module.app
+    reloader = HotReloader(app, paths=[tmp_path], static_directory=static)
+    client = TestClient(app)
+    assert client.get("/").json() == {"version": 1}
+
+    home, other = FakeSocket(), FakeSocket()
+    reloader.connections = {home: "/", other: "/other"}
+    views.write_text(views.read_text().replace("'one'", "'two'"))
+    asyncio.run(reloader.reload_files([views]))
+
+    # The running app serves the reloaded routes, in the same order
+    assert client.get("/fragment").text == "two"
+    assert client.get("/").json() == {"version": 1}
+    paths = [route.path for route in app.routes]
+    assert paths.count("/fragment") == 1
+    assert paths.index("/") < paths.index("/fragment")
+    # Only the route whose code changed is re-fetched
+    assert home.messages == [{"type": "fragments", "paths": ["/fragment"]}]
+    assert other.messages == [{"type": "fragments", "paths": ["/fragment"]}]
+
+    # Pages are re-fetched when no endpoint changed
+    home.messages.clear()
+    views.write_text(views.read_text() + "VERSION = 2\n")
+    asyncio.run(reloader.reload_files([views]))
+    assert home.messages == [{"type": "page"}]
+
+    # Python files are reloaded along with other static files
+    home.messages.clear()
+    views.write_text(views.read_text().replace("'two'", "'three'"))
+    asyncio.run(reloader.reload_files([views, static / "app.js"]))
+    assert client.get("/fragment").text == "three"
+    assert home.messages == [{"type": "reload"}]
+
+    # Routes deleted from the module are removed
+    views.write_text(views.read_text().replace("@app.route('/fragment')\n", ""))
+    asyncio.run(reloader.reload_files([views]))
+    assert "/fragment" not in [route.path for route in app.routes]
+    assert client.get("/fragment").status_code == 404
+    assert client.get("/").json() == {"version": 1}
+
+    # Broken modules keep the previous routes
+    routes = list(app.routes)
+    views.write_text("raise RuntimeError")
+    asyncio.run(reloader.reload_files([views]))
+    assert app.routes == routes
+
+    home.messages.clear()
+    stylesheet = static / "css" / "site.css"
+    asyncio.run(reloader.reload_files([stylesheet]))
+    assert home.messages == [{"type": "css", "paths": ["/css/site.css"]}]
+
+    home.messages.clear()
+    asyncio.run(reloader.reload_files([static / "app.js"]))
+    assert home.messages == [{"type": "reload"}]
+
+
+def test_merge_routes():
+    def one():
+        pass
+
+    def two():
+        pass
+
+    routes = [Route("/a", one), Route("/b", one)]
+    merged = merge_routes(routes, [Route("/b", two), Route("/c", two)])
+    assert [(route.path, route.endpoint) for route in merged] == [
+        ("/a", one),
+        ("/b", two),
+        ("/c", two),
+    ]
+
+
+def test_merge_routes_drops_deleted_routes(tmp_path):
+    def one():
+        pass
+
+    def two():
+        pass
+
+    routes = [Route("/a", one), Route("/b", one)]
+    files = {Path(__file__).resolve()}
+    merged = merge_routes(routes, [Route("/b", two)], files)
+    assert [route.path for route in merged] == ["/b"]
+    # Routes added by other files are kept
+    merged = merge_routes(routes, [Route("/b", two)], {tmp_path / "views.py"})
+    assert [route.path for route in merged] == ["/a", "/b"]
+
+
+def test_hot_reload_messages_for_path_parameters():
+    def item():
+        pass
+
+    routes = [Route("/items/{id}", item)]
+    # Elements loading /items/1 cannot be found from /items/{id}
+    assert HotReloader.get_messages("/", routes, []) == [{"type": "page"}]
+    routes = [Route("/items", item)]
+    assert HotReloader.get_messages("/", routes, []) == [
+        {"type": "fragments", "paths": ["/items"]}
+    ]
@@ -0,0 +1,101 @@
+from starlette.testclient import TestClient
+
+from rapidhtml import RapidHTML
+from rapidhtml.metrics import Histogram, RenderMetrics, RenderSample, count_elements
+from rapidhtml.tags import Body, Div, Html, P, Raw
+
+
+def test_count_elements():
+    assert (
+        count_elements("<!DOCTYPE html><html><body><p>a &lt; b</p><br></body></html>")
+        == 4
+    )
+    assert count_elements("") == 0
+
+
+def test_histogram():
+    histogram = Histogram((1, 5, 10))
+    for value in (0.5, 1, 3, 7, 50):
+        histogram.observe(value)
+    assert histogram.cumulative_counts() == [
+        ("1", 2),
+        ("5", 3),
+        ("10", 4),
+        ("+Inf", 5),
+    ]
+    assert histogram.sum == 61.5
+
+
+def test_render_metrics():
+    samples = []
+    app = RapidHTML(metrics=RenderMetrics(hooks=[samples.append]), compression=True)
+
+    @app.route("/")
+    def homepage():
+        return Html(Body(Div(*(P("row") for _ in range(100)))))
+
+    @app.route("/raw")
+    def raw():
+        return Raw("<p>raw</p>")
+
+    @app.route("/json")
+    def json():
+        return {"a": 1}
+
+    client = TestClient(app)
+    response = client.get("/", headers={"accept-encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    client.get("/raw")
+    client.get("/json")
+
+    page, raw_sample, json_sample = samples
+    assert page.route == "/"
+    assert list(page.phases) == [
+        "endpoint",
+        "resolve",
+        "head",
+        "render",
+        "encode",
+        "compress",
+    ]
+    assert all(seconds >= 0 for seconds in page.phases.values())
+    # html, head, its title, link and script, body, div and the paragraphs
+    assert page.nodes == 107
+    assert page.size == len(response.text.encode())
+    assert list(raw_sample.phases) == ["endpoint", "encode", "compress"]
+    assert (raw_sample.nodes, raw_sample.size) == (1, 10)
+    assert json_sample == RenderSample("/json", json_sample.phases)
+    assert list(json_sample.phases) == ["endpoint"]
+
+    response = client.get("/metrics")
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    assert "# TYPE rapidhtml_render_phase_seconds histogram" in text
+    assert 'rapidhtml_render_phase_seconds_count{route="/",phase="render"} 1' in text
+    assert (
+        'rapidhtml_render_phase_seconds_bucket{route="/",phase="render",le="+Inf"} 1'
+        in text
+    )
+    assert 'rapidhtml_render_nodes_bucket{route="/",le="1000"} 1' in text
+    assert 'rapidhtml_render_nodes_sum{route="/"} 107.0' in text
+    assert 'rapidhtml_render_bytes_count{route="/raw"} 1' in text
+
+    # Responses returned as is, such as static assets, are not timed
+    client.get(app.htmx_path)
+    client.get("/favicon.ico")
+    client.get("/metrics")
+    assert len(samples) == 3
+    assert 'route="/metrics"' not in client.get("/metrics").text
+
+
+def test_render_metrics_disabled():
+    app = RapidHTML()
+    assert app.metrics is None
+
+    @app.route("/")
+    def homepage():
+        return Html(Body(P("hi")))
+
+    client = TestClient(app)
+    assert client.get("/").status_code == 200
+    assert client.get("/metrics").status_code == 404
@@ -0,0 +1,135 @@
+import asyncio
+
+import pytest
+
+from starlette.requests import Request
+from starlette.testclient import TestClient
+
+from rapidhtml import RapidHTML
+from rapidhtml.sse import PING, RapidHTMLSSEEndpoint, ServerSentEvent, format_event
+from rapidhtml.tags import Div, Raw
+
+
+def parse_events(text):
+    return [
+        dict(line.split(": ", 1) for line in frame.splitlines())
+        for frame in text.split("\n\n")
+        if frame and not frame.startswith(":")
+    ]
+
+
+def test_format_event():
+    assert format_event("<p>1</p>") == "data: <p>1</p>\n\n"
+    assert format_event("<p>\n1\n</p>", event="update", id="a-1", retry=500) == (
+        "event: update\nid: a-1\nretry: 500\ndata: <p>\ndata: 1\ndata: </p>\n\n"
+    )
+    assert format_event("") == "data: \n\n"
+    assert format_event("a\r\nb\rc\n") == "data: a\ndata: b\ndata: c\ndata: \n\n"
+    # Only CR and LF end lines in an event stream
+    text = "a\x0bb\x0cc\x1cd\x85e\u2028f\u2029g"
+    assert format_event(text) == f"data: {text}\n\n"
+
+    with pytest.raises(ValueError):
+        format_event("x", event="update\ndata: injected")
+    with pytest.raises(ValueError):
+        format_event("x", id="1\r")
+
+
+def test_sse_route():
+    app = RapidHTML()
+
+    @app.sse_route("/events")
+    async def greetings(request):
+        yield Div(request.query_params["name"], id="name")
+        yield ServerSentEvent(Raw("<b>bold</b>"), event="update")
+        yield "<escaped>"
+
+    client = TestClient(app)
+    response = client.get("/events?name=Ada")
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.headers["cache-control"] == "no-store"
+
+    events = parse_events(response.text)
+    assert [event["data"] for event in events] == [
+        "<div id='name'>Ada</div>",
+        "<b>bold</b>",
+        "&lt;escaped&gt;",
+    ]
+    assert events[1]["event"] == "update"
+    stream_id = events[0]["id"].rpartition("-")[0]
+    assert [event["id"] for event in events] == [
+        f"{stream_id}-1",
+        f"{stream_id}-2",
+        f"{stream_id}-3",
+    ]
+
+    # The events after the last one received are sent again, and the stream
+    # carries on with the next IDs
+    response = client.get(
+        "/events?name=Bob", headers={"last-event-id": f"{stream_id}-1"}
+    )
+    events = parse_events(response.text)
+    assert [event["data"] for event in events] == [
+        "<b>bold</b>",
+        "&lt;escaped&gt;",
+        "<div id='name'>Bob</div>",
+        "<b>bold</b>",
+        "&lt;escaped&gt;",
+    ]
+    assert [event["id"] for event in events] == [
+        f"{stream_id}-{number}" for number in (2, 3, 4, 5, 6)
+    ]
+
+    # Unknown streams start afresh
+    response = client.get("/events?name=Eve", headers={"last-event-id": "x-1"})
+    events = parse_events(response.text)
+    assert len(events) == 3
+    assert not events[0]["id"].startswith("x-")
+
+
+def test_sse_pings():
+    app = RapidHTML()
+
+    @app.sse_route("/slow", ping_interval=0.01)
+    async def slow():
+        await asyncio.sleep(0.1)
+        yield Div("done")
+
+    response = TestClient(app).get("/slow")
+    assert response.text.startswith(PING)
+    assert response.text.endswith("data: <div>done</div>\n\n")
+
+
+def test_sse_disconnect():
+    closed = []
+
+    async def forever():
+        try:
+            while True:
+                yield Div("tick")
+                await asyncio.sleep(0.01)
+        finally:
+            closed.append(True)
+
+    endpoint = RapidHTMLSSEEndpoint(forever)
+
+    async def run():
+        received = []
+
+        async def receive():
+            if len(received) < 3:
+                await asyncio.sleep(0.05)
+                return {"type": "http.request", "body": b"", "more_body": False}
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            received.append(message)
+
+        scope = {"type": "http", "method": "GET", "path": "/", "headers": []}
+        response = await endpoint(Request(scope))
+        await asyncio.wait_for(response(scope, receive, send), timeout=5)
+        return received
+
+    received = asyncio.run(run())
+    assert received[0]["status"] == 200
+    assert closed == [True]
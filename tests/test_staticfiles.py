@@ -0,0 +1,123 @@
+import asyncio
+import gzip
+
+import pytest
+
+from starlette.testclient import TestClient
+
+from rapidhtml import RapidHTML
+from rapidhtml.staticfiles import RapidHTMLStaticFiles, guess_media_type
+
+ICO_DATA = b"\x00\x00\x01\x00" + b"\x00" * 60
+CSS_DATA = b"body { color: red; }\n" * 100
+
+
+@pytest.fixture
+def static_dir(tmp_path):
+    (tmp_path / "style.css").write_bytes(CSS_DATA)
+    (tmp_path / "style.css.gz").write_bytes(gzip.compress(CSS_DATA))
+    (tmp_path / "app.0123abcd.js").write_bytes(b"console.log('hello');")
+    return tmp_path
+
+
+@pytest.fixture
+def client(static_dir):
+    return TestClient(RapidHTML(static_directory=static_dir))
+
+
+def test_guess_media_type():
+    assert guess_media_type("favicon.ico") == "image/x-icon"
+    assert guess_media_type("app.js") == "text/javascript"
+    assert guess_media_type("font.woff2") == "font/woff2"
+    assert guess_media_type("favicon", ICO_DATA) == "image/x-icon"
+
+
+def test_user_ico_favicon(tmp_path):
+    path = tmp_path / "favicon.ico"
+    path.write_bytes(ICO_DATA)
+    client = TestClient(RapidHTML(favicon_path=path))
+
+    response = client.get("/favicon.ico")
+    assert response.headers["content-type"] == "image/x-icon"
+    assert response.headers["cache-control"] == "public, max-age=86400"
+    assert response.content == ICO_DATA
+
+    response = client.get(
+        "/favicon.ico", headers={"if-none-match": response.headers["etag"]}
+    )
+    assert response.status_code == 304
+
+
+def test_static_file(client):
+    response = client.get("/static/style.css", headers={"accept-encoding": "identity"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/css")
+    assert response.headers["cache-control"] == "public, max-age=86400"
+    assert "content-encoding" not in response.headers
+    assert response.content == CSS_DATA
+
+    response = client.get(
+        "/static/style.css",
+        headers={
+            "accept-encoding": "identity",
+            "if-none-match": response.headers["etag"],
+        },
+    )
+    assert response.status_code == 304
+
+
+def test_precompressed_sidecar(client):
+    response = client.get("/static/style.css", headers={"accept-encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.content == CSS_DATA
+
+
+def test_fingerprinted_file_is_immutable(client):
+    response = client.get("/static/app.0123abcd.js")
+    assert "immutable" in response.headers["cache-control"]
+
+
+def test_range_request(client):
+    response = client.get(
+        "/static/style.css",
+        headers={"range": "bytes=0-3", "accept-encoding": "identity"},
+    )
+    assert response.status_code == 206
+    assert response.content == CSS_DATA[:4]
+
+
+def test_pathsend(static_dir):
+    static = RapidHTMLStaticFiles(directory=static_dir)
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/style.css",
+        "root_path": "",
+        "headers": [],
+        "extensions": {"http.response.pathsend": {}},
+    }
+    asyncio.run(static(scope, None, send))
+
+    assert messages[0]["status"] == 200
+    assert messages[1] == {
+        "type": "http.response.pathsend",
+        "path": str(static_dir / "style.css"),
+    }
+
+
+def test_file_infos_are_bounded(static_dir):
+    static = RapidHTMLStaticFiles(directory=static_dir, max_files=1)
+    client = TestClient(static)
+    etag = client.get("/style.css").headers["etag"]
+    client.get("/app.0123abcd.js")
+    assert len(static._file_infos) == 1
+
+    # An evicted file is hashed again
+    response = client.get("/style.css", headers={"if-none-match": etag})
+    assert response.status_code == 304
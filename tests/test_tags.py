@@ -1,9 +1,42 @@
+import io
+import dataclasses
+import time
+import array
+import asyncio
+
 import pytest
 
+import rapidhtml.exceptions
+
 from starlette.testclient import TestClient
 
 from rapidhtml import RapidHTML
-from rapidhtml.tags import Html, H1, Body, Title, BaseDataclass, Button
+from rapidhtml.callbacks import RapidHTMLCallback
+from rapidhtml.tags import (
+    Html,
+    H1,
+    parse_html,
+    HTMLTagParser,
+    Body,
+    Br,
+    Title,
+    Await,
+    BaseDataclass,
+    Button,
+    Div,
+    P,
+    Pre,
+    Li,
+    Raw,
+    Script,
+    Span,
+    Table,
+    TableRows,
+    Tbody,
+    Td,
+    Tr,
+    Ul,
+)
 
 
 def test_render():
@@ -85,13 +118,75 @@ def test_tag_callback():
     test_app = RapidHTML()
 
     test_html = Html(callback=callback)
-    assert test_html.attrs["hx-get"] == "/python-callbacks/{}".format(id(callback))
+    assert test_html.callback_route == "/python-callbacks/{}".format(id(callback))
+    assert test_html.render() == f"<html hx-get='{test_html.callback_route}'></html>"
 
     client = TestClient(test_app)
-    response = client.get(test_html.attrs["hx-get"])
+    response = client.get(test_html.callback_route)
     assert response.text == "Callback"
 
 
+def test_shared_tag_callback():
+    async def callback():
+        return "Callback"
+
+    RapidHTML()
+    app = Td().app
+    routes = len(app.routes)
+    row_callback = RapidHTMLCallback(
+        callback, trigger="click", vals={"id": 1}, headers={"X-Row": "1"}
+    )
+
+    rows = [Tr(Td(i, callback=row_callback)) for i in range(3)]
+    assert len(app.routes) == routes + 1
+    assert rows[0].render() == (
+        "<tr><td hx-trigger='click' hx-vals='{\"id\": 1}' "
+        f"hx-headers='{{\"X-Row\": \"1\"}}' hx-get='{row_callback.route}'>0</td></tr>"
+    )
+    assert rows[0].render(minify=True) == (
+        "<tr><td hx-trigger=click hx-vals='{\"id\": 1}' "
+        f'hx-headers=\'{{"X-Row": "1"}}\' hx-get={row_callback.route}>0</td></tr>'
+    )
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        row_callback.swap = "outerHTML"
+    assert len({row_callback, row_callback}) == 1
+
+
+def test_callback_overrides_tag_attrs():
+    async def callback():
+        return "Callback"
+
+    RapidHTML()
+    button = Button(
+        "go",
+        callback=RapidHTMLCallback(callback, target="#y"),
+        hx_target="#x",
+        id="b",
+    )
+    route = button._callback.route
+    # One hx-target, the callback's, in both modes
+    assert button.render() == (
+        f"<button id='b' hx-target='#y' hx-get='{route}'>go</button>"
+    )
+    assert button.render(minify=True) == (
+        f"<button id=b hx-target=#y hx-get={route}>go</button>"
+    )
+
+
+def test_callback_swap_only_when_set():
+    async def callback():
+        return "Callback"
+
+    RapidHTML()
+    assert "hx_swap" not in RapidHTMLCallback(callback).attrs
+    button = Button("go", callback=RapidHTMLCallback(callback, swap="innerHTML"))
+    route = button._callback.route
+    # An explicit innerHTML is kept so the button does not inherit a swap
+    assert button.render(minify=True) == (
+        f"<button hx-swap=innerHTML hx-get={route}>go</button>"
+    )
+
+
 def test_base_dataclass():
     class Parent(BaseDataclass):
         a: str = None
@@ -116,3 +211,367 @@ def test_base_dataclass():
 
     with pytest.raises(AttributeError):
         Child(d="d")
+
+
+def test_render_lazy_children():
+    rows = (Tr(Td(i)) for i in range(3))
+    table = Table(Tbody(rows))
+
+    expected_html = (
+        "<table><tbody><tr><td>0</td></tr><tr><td>1</td></tr>"
+        "<tr><td>2</td></tr></tbody></table>"
+    )
+    assert table.render() == expected_html
+
+
+def test_render_lazy_children_is_lazy():
+    consumed = []
+
+    def rows():
+        for i in range(2):
+            consumed.append(i)
+            yield Li(i)
+
+    tag = Ul(rows())
+    assert consumed == []
+    assert tag.render() == "<ul><li>0</li><li>1</li></ul>"
+    assert consumed == [0, 1]
+
+
+def test_render_lazy_iterator_twice():
+    tag = Ul(Li(i) for i in range(2))
+    tag.render()
+    with pytest.raises(RuntimeError):
+        tag.render()
+
+
+def test_render_reiterable_children_twice():
+    tag = Ul(range(2))
+    assert tag.render() == "<ul>01</ul>"
+    assert tag.render() == "<ul>01</ul>"
+
+
+def test_iter_render_yields_lazy_children_one_at_a_time():
+    tag = Html(Body(Ul(Li(i) for i in range(3))))
+    chunks = list(tag.iter_render())
+
+    assert "".join(chunks) == (
+        "<html><body><ul><li>0</li><li>1</li><li>2</li></ul></body></html>"
+    )
+    assert "<li>1</li>" in chunks
+
+
+async def fetch(value, delay=0.0):
+    await asyncio.sleep(delay)
+    return value
+
+
+def test_render_async_children_concurrently():
+    tag = Div(fetch(P("a"), 0.2), fetch(P("b"), 0.2), fetch(P("c"), 0.2))
+
+    start = time.perf_counter()
+    html = asyncio.run(tag.render_async())
+    elapsed = time.perf_counter() - start
+
+    assert html == "<div><p>a</p><p>b</p><p>c</p></div>"
+    assert elapsed < 0.5
+
+
+def test_render_async_generator_children():
+    async def rows():
+        for i in range(3):
+            await asyncio.sleep(0)
+            yield Li(i)
+
+    tag = Ul(rows())
+    assert asyncio.run(tag.render_async()) == "<ul><li>0</li><li>1</li><li>2</li></ul>"
+
+
+def test_render_nested_async_children():
+    tag = Div(fetch(Ul(fetch(Li("nested")))))
+    assert asyncio.run(tag.render_async()) == "<div><ul><li>nested</li></ul></div>"
+
+
+def test_render_async_child_timeout():
+    tag = Div(
+        Await(fetch(P("slow"), 1), timeout=0.05, placeholder=P("Loading")),
+        fetch(P("fast")),
+    )
+    assert asyncio.run(tag.render_async()) == "<div><p>Loading</p><p>fast</p></div>"
+
+
+def test_render_async_child_error_is_not_replaced():
+    async def fail():
+        raise ValueError("failed")
+
+    tag = Div(Await(fail(), timeout=1, placeholder=P("Loading")))
+    with pytest.raises(ValueError):
+        asyncio.run(tag.render_async())
+
+
+def test_render_task_child():
+    async def main():
+        return await Div(asyncio.ensure_future(fetch(P("task")))).render_async()
+
+    assert asyncio.run(main()) == "<div><p>task</p></div>"
+
+
+def test_failing_async_child_cancels_others():
+    cancelled = []
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("failed")
+
+    async def slow():
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def main():
+        with pytest.raises(ValueError):
+            await Div(fail(), slow()).render_async()
+        return list(cancelled)
+
+    assert asyncio.run(main()) == [True]
+
+
+def test_render_unresolved_async_child():
+    async def main():
+        tag = Div(fetch("a"))
+        with pytest.raises(RuntimeError):
+            tag.render()
+        await tag.resolve()
+        return tag.render()
+
+    assert asyncio.run(main()) == "<div>a</div>"
+
+
+def test_table_from_columns():
+    table = Table.from_columns(
+        {"Name": ["<b>Ada</b>", "Alan"], "Born": array.array("i", [1815, 1912])},
+        formatters={"Born": "{:,}".format},
+        class_="people",
+    )
+
+    expected_html = (
+        "<table class='people'><thead><tr><th>Name</th><th>Born</th></tr></thead>"
+        "<tbody><tr><td>&lt;b&gt;Ada&lt;/b&gt;</td><td>1,815</td></tr>"
+        "<tr><td>Alan</td><td>1,912</td></tr></tbody></table>"
+    )
+    assert table.render() == expected_html
+
+
+def test_table_from_columns_matches_tags():
+    values = ["a\x00<", "b", None, 3]
+    table = Table.from_columns({"Value": values}, header=False)
+    expected = Table(Tbody(*(Tr(Td(value)) for value in values)))
+    assert table.render() == expected.render()
+
+
+def test_table_from_records():
+    class Person:
+        def __init__(self, name, age):
+            self.name = name
+            self.age = age
+
+    people = [Person("Ada", 36), Person("Alan", 41)]
+    by_attribute = Table.from_records(people, {"name": "Name"})
+    by_key = Table.from_records([vars(person) for person in people])
+
+    assert by_attribute.render() == (
+        "<table><thead><tr><th>Name</th></tr></thead>"
+        "<tbody><tr><td>Ada</td></tr><tr><td>Alan</td></tr></tbody></table>"
+    )
+    assert "<th>age</th>" in by_key.render()
+    assert "<td>Alan</td><td>41</td>" in by_key.render()
+
+
+def test_table_rows_iter_render_batches():
+    rows = TableRows([range(5)], batch_size=2)
+    assert list(rows.iter_render()) == [
+        "<tr><td>0</td></tr><tr><td>1</td></tr>",
+        "<tr><td>2</td></tr><tr><td>3</td></tr>",
+        "<tr><td>4</td></tr>",
+    ]
+
+
+def test_table_rows_with_uneven_columns():
+    with pytest.raises(ValueError):
+        TableRows([[1, 2], [1]])
+
+
+def test_frozen_tags_are_interned():
+    icon = Span.frozen(class_="icon")
+    assert Span.frozen(class_="icon") is icon
+    assert Span.frozen(class_="other") is not icon
+    assert Td.frozen(1) is not Td.frozen(True)
+    assert Br.frozen() is Br.frozen()
+
+
+def test_render_frozen_tags():
+    icon = Span.frozen(class_="icon")
+    table = Tbody(Tr(Td(icon), Td.frozen(), Td(Br.frozen())), Tr(Td(icon)))
+
+    expected = Tbody(
+        Tr(Td(Span(class_="icon")), Td(), Td(Br())), Tr(Td(Span(class_="icon")))
+    )
+    assert table.render() == expected.render()
+    assert "".join(table.iter_render()) == expected.render()
+
+
+def test_frozen_tags_cannot_be_modified():
+    tag = Div.frozen(P.frozen("text"))
+
+    with pytest.raises(rapidhtml.exceptions.FrozenTagError):
+        tag.add_tag(P())
+    with pytest.raises(rapidhtml.exceptions.FrozenTagError):
+        tag.add_attr(id="foo")
+    with pytest.raises(rapidhtml.exceptions.FrozenTagError):
+        tag.pop("p")
+    assert tag.select("p") == [P.frozen("text")]
+
+
+def test_frozen_tags_can_only_contain_frozen_tags():
+    with pytest.raises(TypeError):
+        Div.frozen(P())
+    with pytest.raises(TypeError):
+        Div.frozen(hx_vals={"a": 1})
+
+
+def test_shared_frozen_tags():
+    icon = Span.frozen(class_="icon")
+    first, second = Div(icon), Div(icon)
+    parent = Div(first, second)
+    parent.add_tag(Div(icon))
+
+    # Popping a shared tag only removes it from its parent
+    assert first.pop("span") is icon
+    assert second.render() == "<div><span class='icon'></span></div>"
+
+    # Frozen tags are searched, but never popped from
+    wrapper = Div(Div.frozen(Span.frozen()))
+    with pytest.raises(KeyError):
+        wrapper.select("span", recurse=True, pop=True)
+    assert wrapper.render() == "<div><div><span></span></div></div>"
+
+
+def test_render_raw():
+    fragment = Raw("<b>bold</b> &amp;")
+    page = Div(P("<b>"), fragment, Raw("<i>".encode()))
+
+    assert page.render() == "<div><p>&lt;b&gt;</p><b>bold</b> &amp;<i></div>"
+    assert "".join(page.iter_render()) == page.render()
+    assert Div.frozen(fragment).render() == "<div><b>bold</b> &amp;</div>"
+    assert Script(Raw.escape("<"), "<").render() == "<script>&lt;<</script>"
+
+
+def test_raw_encoding():
+    fragment = Raw("caf\u00e9")
+    assert fragment.encode() is fragment.encode()
+    assert fragment.encode("latin-1") == b"caf\xe9"
+
+    encoded = Raw(b"caf\xe9", encoding="latin-1")
+    assert encoded.encode("latin-1") == b"caf\xe9"
+    assert encoded.html == "caf\u00e9"
+    assert encoded == fragment
+    assert len(Raw(b"abc")) == 3
+
+    with pytest.raises(TypeError):
+        Raw(1)
+
+
+def test_render_html_protocol():
+    class Markup(str):
+        def __html__(self):
+            return str(self)
+
+    class Fragment:
+        def __html__(self):
+            return "<hr>"
+
+    assert Div(Fragment()).render() == "<div><hr></div>"
+    assert Div(Markup("<b>"), "<b>").render() == "<div><b>&lt;b&gt;</div>"
+
+
+def test_parse_html():
+    doc = (
+        "<!DOCTYPE html><html><body><!-- nav --><p>One<p class='a' data-id=1>"
+        'Two &amp; <b>three</b><ul><li>A<li>B</ul><input disabled value="it\'s">'
+        "<my-widget>W</my-widget><style>a > b {}</style></body></html>"
+    )
+    doctype, page = parse_html(doc)
+
+    assert doctype.render() == "<!DOCTYPE html>"
+    assert isinstance(page, Html)
+    [ul] = page.select("ul", recurse=True)
+    assert [li.tags for li in ul.tags] == [["A"], ["B"]]
+    paragraphs = page.select("p", recurse=True)
+    assert {"class_": "a", "data_id": "1"} in [p.attrs for p in paragraphs]
+    assert page.render() == (
+        "<html><body><!-- nav --><p>One</p><p class='a' data-id='1'>Two &amp; "
+        "<b>three</b></p><ul><li>A</li><li>B</li></ul>"
+        "<input disabled value='it&#39;s' /><my-widget>W</my-widget>"
+        "<style>a > b {}</style></body></html>"
+    )
+
+
+def test_parse_html_attribute_round_trip():
+    doc = "<p title='&amp;lt;b&amp;gt;' data-x='a &amp;amp; b' alt='it&#39;s'>x</p>"
+    [p] = parse_html(doc)
+    assert p.render() == doc
+    assert parse_html(p.render())[0].render() == doc
+
+
+def test_parser_position():
+    parser = HTMLTagParser()
+    parser.feed("<div>\n  <p>a</p>")
+    assert parser.getpos() == (2, 10)
+
+
+def test_parse_html_incrementally():
+    doc = "<table><tr><td>café</td></tr></table>".encode()
+    chunks = [doc[i : i + 3] for i in range(0, len(doc), 3)]
+
+    [table] = parse_html(chunks)
+    assert table.render() == "<table><tr><td>café</td></tr></table>"
+    [table] = parse_html(io.BytesIO(doc), chunk_size=5)
+    assert table.render() == "<table><tr><td>café</td></tr></table>"
+
+
+def test_render_minified():
+    page = Div(
+        "  Hello \n  world ",
+        Span.frozen("a  b", class_="x y"),
+        Br(),
+        Pre("  keep\n  this "),
+        Ul(Li(1), "\n  ", Li(2)),
+        id="main",
+        hx_swap="innerHTML",
+        title="",
+    )
+
+    html, saved = page.render_minified()
+    assert html == (
+        "<div id=main hx-swap=innerHTML title> Hello world <span class='x y'>a b</span><br>"
+        "<pre>  keep\n  this </pre><ul><li>1</li><li>2</li></ul></div>"
+    )
+    assert saved == len(page.render()) - len(html)
+    assert page.render(minify=True) == html
+    assert "".join(page.iter_render(minify=True)) == html
+
+    # No-break spaces are text, not whitespace
+    text = P("a\u00a0\u00a0b")
+    assert text.render_minified() == ("<p>a\u00a0\u00a0b</p>", 0)
+    text = P("a \u00a0 b")
+    assert text.render_minified() == ("<p>a \u00a0 b</p>", 0)
+
+
+def test_render_minified_keeps_hx_swap():
+    button = Button("go", hx_get="/go", hx_swap="innerHTML")
+    page = Div(button, hx_swap="outerHTML")
+
+    # The button must not inherit outerHTML from the div
+    assert "<button hx-get=/go hx-swap=innerHTML>" in page.render(minify=True)
@@ -0,0 +1,135 @@
+from rapidhtml.tags import (
+    parse_html,
+    Html,
+    Head,
+    Title,
+    Body,
+    Div,
+    Main,
+    Nav,
+    P,
+    Span,
+    Li,
+    Ul,
+)
+
+
+def build_layout():
+    return Html(
+        Body(
+            Nav(Ul(*(Li(f"Link {i}") for i in range(3)))),
+            Main(id="content"),
+        )
+    )
+
+
+class TestClone:
+    def test_clone_shares_children(self):
+        layout = build_layout()
+        page = layout.clone()
+
+        assert page is not layout
+        assert page.tags[0] is layout.tags[0]
+        assert page.render() == layout.render()
+
+    def test_clone_is_independent(self):
+        layout = build_layout()
+        page = layout.clone()
+        page.add_tag(Div("extra"))
+        page.add_attr(lang="en")
+
+        assert "extra" not in layout.render()
+        assert "lang" not in layout.render()
+
+    def test_shared_children_are_modified_in_both_trees(self):
+        layout = build_layout()
+        page = layout.clone()
+        main = page.select(Main, recurse=True)[0]
+        main.add_tag(P("content"))
+
+        assert "<p>content</p>" in page.render()
+        assert "<p>content</p>" in layout.render()
+
+    def test_changing_original_after_clone(self):
+        p = P("a")
+        div = Div(p)
+        div.clone()
+        assert div.render() == "<div><p>a</p></div>"
+
+        p.attrs["class"] = "hot"
+        assert p.render() == "<p class='hot'>a</p>"
+        assert div.render() == "<div><p class='hot'>a</p></div>"
+        p.tags.append("b")
+        assert div.render() == "<div><p class='hot'>ab</p></div>"
+
+    def test_select_does_not_share_tags(self):
+        layout = build_layout()
+        layout.clone().select(Li, recurse=True)
+        assert not layout.tags[0].tags[0].tags[0]._shared
+
+    def test_evolve(self):
+        main = Main(id="content")
+        evolved = main.evolve(P("content"), class_="wide")
+
+        assert main.render() == "<main id='content'></main>"
+        assert (
+            evolved.render() == "<main id='content' class='wide'><p>content</p></main>"
+        )
+
+    def test_replace_copies_only_the_path(self):
+        layout = build_layout()
+        page = layout.replace(Main, lambda main: main.evolve(P("content")))
+
+        assert "<main id='content'><p>content</p></main>" in page.render()
+        assert "<main id='content'></main>" in layout.render()
+        # The navigation is not on the path to the change, so it is shared
+        assert page.tags[0].tags[0] is layout.tags[0].tags[0]
+        assert page.tags[0] is not layout.tags[0]
+
+    def test_select_pop_copies_shared_tags(self):
+        layout = Html(Body(Div(Span("a"), Span("b"))))
+        page = layout.clone()
+        page.select(Span, recurse=True, pop=True)
+
+        assert page.render() == "<html><body><div></div></body></html>"
+        assert layout.render() == (
+            "<html><body><div><span>a</span><span>b</span></div></body></html>"
+        )
+
+    def test_add_head_to_clone(self):
+        layout = Html(Head(Title("Layout")), Body())
+        page = layout.clone()
+        page.add_head(Title("Page"))
+
+        assert (
+            layout.render()
+            == "<html><head><title>Layout</title></head><body></body></html>"
+        )
+        assert "<title>Page</title>" in page.render()
+
+    def test_shared_tags_are_rendered_from_cache(self):
+        layout = build_layout()
+        page = layout.clone()
+        nav = layout.tags[0].tags[0]
+
+        html = page.render()
+        assert nav._render_cache == nav.render()
+        assert layout.clone().render() == html
+
+    def test_parsed_tags_are_cached(self):
+        [page] = parse_html("<div><p class='a'>x</p></div>")
+        page.clone().render()
+        p = page.tags[0]
+        assert p._render_cache == "<p class='a'>x</p>"
+
+        p.attrs["class_"] = "b"
+        assert page.render() == "<div><p class='b'>x</p></div>"
+
+    def test_lazy_children_are_not_cached(self):
+        layout = Html(Body(Ul(Li(i) for i in range(2))))
+        page = layout.clone()
+
+        assert (
+            page.render() == "<html><body><ul><li>0</li><li>1</li></ul></body></html>"
+        )
+        assert layout.tags[0]._render_cache is None
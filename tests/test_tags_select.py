@@ -83,3 +83,9 @@ class TestHtmlSelect:
         tag = Html(Div(), Span(), P())
         with pytest.raises(TypeError):
             tag.select(123)
+
+    def test_select_does_not_consume_lazy_children(self):
+        tag = Html(Div(), Span(P() for _ in range(2)))
+        selected_tags = tag.select("p", recurse=True)
+        assert len(selected_tags) == 0
+        assert tag.render() == "<html><div></div><span><p></p><p></p></span></html>"
@@ -1,6 +1,10 @@
+import asyncio
+
 from starlette.testclient import TestClient
 from starlette.websockets import WebSocket  # Added import
 from rapidhtml.routing import RapidHTMLWSEndpoint
+from rapidhtml.tags import Div, Raw
+from rapidhtml.ws import WSCompression
 from rapidhtml import RapidHTML
 
 
@@ -261,3 +265,80 @@ def test_ws_multiple_connections_with_decorator():
         message2 = websocket2.receive_text()
         assert message1 == "connected"
         assert message2 == "connected"
+
+
+def test_ws_send_fragments():
+    app = RapidHTML()
+
+    @app.websocket_route("/ws")
+    class Dashboard(RapidHTMLWSEndpoint):
+        async def on_connect(self, websocket: WebSocket):
+            await websocket.accept()
+            # Fragments sent in the same tick are sent in one message
+            await asyncio.gather(
+                self.send_fragments(websocket, Div("1", id="cpu")),
+                self.send_fragments(websocket, Div("2", id="memory"), "<hr>"),
+            )
+            await self.send_fragments(websocket, Raw("<p id='status'>ok</p>"))
+
+    client = TestClient(app)
+    with client.websocket_connect("/ws") as websocket:
+        assert websocket.receive_text() == (
+            "<div id='cpu'>1</div><div id='memory'>2</div><hr>"
+        )
+        assert websocket.receive_text() == "<p id='status'>ok</p>"
+
+
+def test_ws_send_fragments_waits_for_message():
+    class SlowSocket:
+        def __init__(self):
+            self.sent = []
+
+        async def send_text(self, text):
+            await asyncio.sleep(0.01)
+            self.sent.append(text)
+
+    async def main():
+        endpoint = RapidHTMLWSEndpoint({"type": "websocket"}, None, None)
+        websocket = SlowSocket()
+
+        async def send(fragment):
+            await endpoint.send_fragments(websocket, fragment)
+            return list(websocket.sent)
+
+        return await asyncio.gather(send("a"), send("b"))
+
+    # Both callers return once the combined message is sent
+    assert asyncio.run(main()) == [["ab"], ["ab"]]
+
+
+def test_ws_binary_fragments():
+    app = RapidHTML(ws_binary_fragments=True)
+    status = Raw("<p id='status'>ok</p>")
+
+    @app.websocket_route("/ws")
+    class Status(RapidHTMLWSEndpoint):
+        binary_fragments = True
+
+        async def on_connect(self, websocket: WebSocket):
+            await websocket.accept()
+            await self.send_fragments(websocket, status, Div("é", id="name"))
+
+    client = TestClient(app)
+    with client.websocket_connect("/ws") as websocket:
+        assert websocket.receive_bytes() == (
+            "<p id='status'>ok</p><div id='name'>é</div>".encode()
+        )
+    # The encoded Raw is reused for every connection
+    assert status.encode() is status.encode()
+
+    page = client.get(app.ws_extension_path)
+    assert page.status_code == 200
+    assert b"rapidhtml-ws" in page.content
+
+
+def test_ws_compression():
+    extension = WSCompression(level=9, window_bits=10).extension_factory()
+    assert extension.server_max_window_bits == 10
+    assert extension.compress_settings == {"level": 9, "memLevel": 8}
+    assert RapidHTML(ws_compression=False).ws_compression is None